@@ -0,0 +1,223 @@
+# ============================================================
+# BENCHMARK — PASSAGE À L'ÉCHELLE PAR CHAPITRE
+# Exécute les blocs du pipeline (chapitres 0 à 10) sur des CSV synthétiques
+# de plusieurs tailles (benchmarks/synthetique.py) et mesure pour chaque
+# bloc : durée, temps CPU, pic mémoire Python (tracemalloc, au-dessus de
+# la mémoire déjà occupée avant le bloc). Mesure aussi
+# les points chauds seuls (map_likert_fr_to_num, balayer_k, Sankey) et le
+# temps d'import du pipeline (voir aussi benchmarks/bench_imports.py).
+# Rapport comparable d'une exécution à l'autre : JSON + CSV ; --reference
+# signale les régressions par rapport à un rapport précédent.
+# Usage : python benchmarks/bench_chapitres.py --tailles 1000,10000,100000
+#         python benchmarks/bench_chapitres.py --reference benchmarks/resultats/bench_chapitres.json
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows : pic RSS non mesuré
+    resource = None
+
+import matplotlib
+matplotlib.use("Agg")
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+sys.path.insert(0, str(RACINE / "benchmarks"))
+
+from pipeline_imports import rapport_imports  # noqa: E402
+from synthetique import GenerateurSondage  # noqa: E402
+
+SEUIL_REGRESSION = 1.25  # durée > 1,25 × la référence -> signalée
+
+
+def chapitre(bloc: str) -> int:
+    return int(re.match(r"\d+", bloc).group())
+
+
+class Mesureur:
+    """
+    Durée, CPU et pic mémoire d'un appel : pic tracemalloc moins la mémoire déjà allouée avant l'appel
+    (produits des blocs précédents exclus). Sorties console et avertissements du pipeline masqués.
+    """
+
+    def __init__(self, memoire: bool) -> None:
+        self.memoire = memoire
+
+    def mesurer(self, fonction: Callable[[], Any]) -> tuple[Any, dict[str, float]]:
+        if self.memoire:
+            tracemalloc.reset_peak()
+            avant = tracemalloc.get_traced_memory()[0]
+        t0, c0 = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            res = fonction()
+        mesure = {"duree_s": time.perf_counter() - t0, "cpu_s": time.process_time() - c0}
+        if self.memoire:
+            mesure["pic_memoire_mo"] = (tracemalloc.get_traced_memory()[1] - avant) / 2**20
+        mesure["rss_max_mo"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                                if resource is not None else float("nan"))
+        return res, mesure
+
+
+def points_chauds(pv: Any, produits: dict[str, Any], csv: Path, mesureur: Mesureur) -> list[dict[str, Any]]:
+    """Fonctions chaudes mesurées seules, sur les données de la taille courante."""
+    from pipeline_kmeans import balayer_k
+    from pipeline_matrices import construire_matrice
+    from pipeline_multichoix import flux_sankey
+
+    lignes = []
+    brut, _ = pv.rename_robuste(pd.read_csv(csv))
+    likert = [c for c in pv.likert_5 if c in brut.columns]
+    _, m = mesureur.mesurer(lambda: [pv.map_likert_fr_to_num(brut[c]) for c in likert])
+    lignes.append({"nom": f"map_likert_fr_to_num ({len(likert)} colonnes)", **m})
+
+    df, multichoix = produits["df"], produits["multichoix"]
+    available = [c for c in pv.features if c in df.columns]
+    matrice, m = mesureur.mesurer(lambda: construire_matrice(df, available, dtype=pv.MATRICE_DTYPE))
+    lignes.append({"nom": "construire_matrice (features 4A)", **m})
+    balayage, m = mesureur.mesurer(lambda: balayer_k(
+        matrice.X, pv.KMEANS_GRILLE, random_state=pv.RANDOM_STATE, n_init=10, moteur=pv.KMEANS_MOTEUR,
+        metriques=pv.KMEANS_METRIQUES, k_fixe=pv.KMEANS_K, patience=pv.KMEANS_PATIENCE, workers=pv.KMEANS_WORKERS,
+    ))
+    lignes.append({"nom": f"balayer_k ({balayage.moteur}, {', '.join(balayage.metriques)})", **m})
+
+    cols = ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion", "Destination_Fin_Vie"]
+    if all(c in df.columns for c in cols):
+        _, m = mesureur.mesurer(lambda: flux_sankey(
+            pv.etapes_sankey(df, multichoix, cols, autres={
+                "Frequence_Achat": "Autres fréquences", "Canal_Achat": "Autres canaux",
+                "Destination_Fin_Vie": "Autres destinations",
+            }), pondere=pv.SANKEY_PONDERE,
+        ))
+        lignes.append({"nom": "etapes_sankey + flux_sankey (4 étapes)", **m})
+    return [{"type": "point_chaud", **l} for l in lignes]
+
+
+def bancs(pv: Any, csv: Path, selection: list[str], mesureur: Mesureur, avec_points_chauds: bool) -> list[dict[str, Any]]:
+    """Une ligne par bloc (dans l'ordre du DAG), une par chapitre, une par point chaud."""
+    pv.MATRICES.vider()
+    produits: dict[str, Any] = {}
+    blocs = []
+    for nom in selection:
+        _, m = mesureur.mesurer(lambda: pv.TACHES.executer([nom], produits))
+        blocs.append({"type": "bloc", "nom": nom, "chapitre": chapitre(nom), **m})
+
+    chapitres = []
+    for ch, groupe in pd.DataFrame(blocs).groupby("chapitre", sort=True):
+        ligne = {"type": "chapitre", "nom": f"chapitre {ch}", "chapitre": int(ch),
+                 "duree_s": groupe["duree_s"].sum(), "cpu_s": groupe["cpu_s"].sum(),
+                 "rss_max_mo": groupe["rss_max_mo"].max()}
+        if "pic_memoire_mo" in groupe:
+            ligne["pic_memoire_mo"] = groupe["pic_memoire_mo"].max()
+        chapitres.append(ligne)
+
+    chauds = points_chauds(pv, produits, csv, mesureur) if avec_points_chauds else []
+    return blocs + chapitres + chauds
+
+
+def comparer(res: pd.DataFrame, reference: Path) -> pd.DataFrame:
+    ref = pd.DataFrame(json.loads(reference.read_text(encoding="utf-8"))["resultats"])
+    cle = ["lignes", "type", "nom"]
+    comp = res[cle + ["duree_s"]].merge(ref[cle + ["duree_s"]], on=cle, suffixes=("", "_reference"))
+    comp["ratio"] = comp["duree_s"] / comp["duree_s_reference"]
+    return comp[comp["ratio"] > SEUIL_REGRESSION].sort_values("ratio", ascending=False)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark des chapitres du pipeline sur des données synthétiques.")
+    parser.add_argument("--tailles", default="1000,10000,100000", help="nombres de répondants, séparés par des virgules")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="blocs à mesurer (+ leur amont), ex: 0H,4A,2B ; défaut : tous")
+    parser.add_argument("--kmeans-metriques", default="auto",
+                        help="KMEANS_METRIQUES pendant le banc (auto = silhouette exacte jusqu'à 20 000 lignes, échantillon au-delà)")
+    parser.add_argument("--sans-memoire", action="store_true", help="sans tracemalloc (durées plus proches d'une vraie exécution)")
+    parser.add_argument("--sans-points-chauds", action="store_true")
+    parser.add_argument("--sans-prechauffage", action="store_true",
+                        help="mesure aussi les coûts du 1er appel (imports, polices matplotlib) sur la 1ère taille")
+    parser.add_argument("--sortie", type=Path, default=RACINE / "benchmarks" / "resultats" / "bench_chapitres",
+                        help="préfixe des rapports (.json / .csv)")
+    parser.add_argument("--reference", type=Path, help="rapport JSON précédent : signale les durées > 1,25 × la référence")
+    args = parser.parse_args(argv)
+    tailles = [int(t) for t in args.tailles.split(",")]
+    args.sortie = args.sortie.resolve()
+
+    generateur = GenerateurSondage(seed=args.seed)
+    mesureur = Mesureur(memoire=not args.sans_memoire)
+    resultats = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # le pipeline écrit dans reports/ relatif au dossier courant : on travaille dans un dossier jetable
+        os.chdir(tmp)
+        import pipeline_visualisations as pv  # noqa: E402  (après chdir : OUT_DIR / FIG_DIR dans tmp)
+        pv.CACHE_FRAME = False
+        pv.KMEANS_METRIQUES = tuple(args.kmeans_metriques.split(","))
+        selection = pv.TACHES.selection(only=args.only.split(",") if args.only else None)
+
+        csv = Path(tmp) / pv.DATA_PATH
+        if not args.sans_prechauffage:
+            # passe non mesurée : imports paresseux (plotly, sklearn …) et caches matplotlib hors des mesures
+            generateur.ecrire(csv, 500)
+            bancs(pv, csv, selection, Mesureur(memoire=False), not args.sans_points_chauds)
+        if mesureur.memoire:
+            tracemalloc.start()
+        for n in tailles:
+            t0 = time.perf_counter()
+            generateur.ecrire(csv, n)
+            print(f"OK - {n} répondants synthétiques ({time.perf_counter() - t0:.1f} s) : mesure de {len(selection)} blocs")
+            for ligne in bancs(pv, csv, selection, mesureur, not args.sans_points_chauds):
+                resultats.append({"lignes": n, **ligne})
+        if mesureur.memoire:
+            tracemalloc.stop()
+        os.chdir(RACINE)
+
+    res = pd.DataFrame(resultats)
+    meta = {
+        "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tailles": tailles, "seed": args.seed, "blocs": selection, "kmeans_metriques": args.kmeans_metriques,
+        "tracemalloc": mesureur.memoire,
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+        "machine": platform.machine(), "cpu": os.cpu_count(),
+        "imports": rapport_imports(top=10),  # démarrage : -X importtime de pipeline_visualisations
+    }
+    args.sortie.parent.mkdir(parents=True, exist_ok=True)
+    args.sortie.with_suffix(".json").write_text(
+        json.dumps({"meta": meta, "resultats": res.round(4).to_dict(orient="records")}, ensure_ascii=False, indent=1),
+        encoding="utf-8",
+    )
+    res.round(4).to_csv(args.sortie.with_suffix(".csv"), index=False)
+
+    colonnes = [c for c in ("duree_s", "cpu_s", "pic_memoire_mo") if c in res]
+    vue = res[res["type"] != "bloc"].pivot_table(index=["type", "nom"], columns="lignes", values=colonnes, sort=False)
+    print(vue.round(3).to_string())
+    print(f"OK - Rapport : {args.sortie.with_suffix('.json')} + .csv")
+
+    if args.reference is not None:
+        regressions = comparer(res, args.reference)
+        if regressions.empty:
+            print(f"OK - Aucune durée > {SEUIL_REGRESSION} × la référence")
+        else:
+            print(f"ATTENTION - {len(regressions)} mesures > {SEUIL_REGRESSION} × la référence :")
+            print(regressions.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# ============================================================
+# BENCHMARK — DÉCODAGE TEXTE -> NOMBRE
+# Compare l'ancien décodage ligne à ligne (series.apply) au décodage
+# par modalité (factorize + diffusion) sur le CSV réel répliqué.
+# Usage : python benchmarks/bench_decodage.py [--repetitions 200]
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_visualisations import (  # noqa: E402
+    DATA_PATH, LIKERT_FR, ORDINAUX, decoder_texte, likert_5, map_likert_fr_to_num, norm_text,
+    num_10, rename_robuste, safe_to_numeric,
+)
+from pipeline_derives import echelle_1_10, ff_binaire  # noqa: E402
+
+
+# --- références ligne à ligne (implémentations d'origine)
+def ancien_safe_to_numeric(series: pd.Series) -> pd.Series:
+    s = series.astype(str).str.replace(",", ".", regex=False)
+    return pd.to_numeric(s, errors="coerce")
+
+
+def ancien_decoder_texte(series: pd.Series, regles: dict[str, int]) -> pd.Series:
+    def conv(x):
+        if pd.isna(x):
+            return np.nan
+        t = norm_text(x)
+        try:
+            return float(t)
+        except ValueError:
+            pass
+        for k, v in regles.items():
+            if k in t:
+                return float(v)
+        return np.nan
+    return series.apply(conv)
+
+
+def ancien_to_scale_1_10(series: pd.Series) -> pd.Series:
+    s = series.astype(str).str.replace(",", ".", regex=False).str.strip()
+    s = pd.to_numeric(s, errors="coerce")
+    return s.clip(1, 10).round().astype("Int64")
+
+
+def ancien_ff_binary(series: pd.Series) -> pd.Series:
+    txt = series.astype(str).str.lower().str.strip()
+    out = pd.Series(np.nan, index=txt.index, dtype="float")
+    out[txt.str.contains(r"\boui\b", na=False)] = 1
+    out[txt.str.contains(r"\bnon\b", na=False)] = 0
+    return out.astype("Int64")
+
+
+def chrono(fn, *args) -> tuple[float, pd.Series]:
+    t0 = time.perf_counter()
+    res = fn(*args)
+    return time.perf_counter() - t0, res
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark décodage ligne à ligne vs par modalité.")
+    parser.add_argument("--repetitions", type=int, default=200, help="nombre de copies du CSV (428 lignes chacune)")
+    args = parser.parse_args(argv)
+
+    df, _ = rename_robuste(pd.read_csv(RACINE / DATA_PATH))
+    df = pd.concat([df] * args.repetitions, ignore_index=True)
+    print(f"Données : {len(df)} lignes")
+
+    cas = []
+    for c in num_10:
+        if c in df.columns:
+            cas.append((f"safe_to_numeric({c})", ancien_safe_to_numeric, safe_to_numeric, df[c]))
+    for c in likert_5:
+        if c in df.columns:
+            cas.append((f"likert({c})", lambda s: ancien_decoder_texte(s, LIKERT_FR), map_likert_fr_to_num, df[c]))
+    for c, regles in ORDINAUX.items():
+        if c in df.columns:
+            cas.append((f"ordinal({c})", lambda s, r=regles: ancien_decoder_texte(s, r),
+                        lambda s, r=regles: decoder_texte(s, r), df[c]))
+    cas.append(("echelle_1_10(Influence_Reseaux)", ancien_to_scale_1_10, echelle_1_10, df["Influence_Reseaux"]))
+    cas.append(("ff_binaire(Utilise_FastFashion)", ancien_ff_binary, ff_binaire, df["Utilise_FastFashion"]))
+
+    lignes = []
+    for nom, ancien, nouveau, serie in cas:
+        t_ancien, r_ancien = chrono(ancien, serie)
+        t_nouveau, r_nouveau = chrono(nouveau, serie)
+        # mêmes valeurs ; indicateurs dérivés en Int8 au lieu d'Int64
+        pd.testing.assert_series_equal(r_ancien, r_nouveau, check_dtype=False)
+        lignes.append({"cas": nom, "ancien_s": t_ancien, "par_modalite_s": t_nouveau,
+                       "acceleration": t_ancien / t_nouveau})
+
+    res = pd.DataFrame(lignes).set_index("cas")
+    print(res.round(4).to_string())
+    print(f"TOTAL : {res['ancien_s'].sum():.3f} s -> {res['par_modalite_s'].sum():.3f} s "
+          f"(x{res['ancien_s'].sum() / res['par_modalite_s'].sum():.1f}), résultats identiques")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# ============================================================
+# BENCHMARK — TEMPS DE DÉMARRAGE (IMPORTS)
+# Mesure l'import de pipeline_visualisations dans un interpréteur neuf
+# (python -X importtime, agrégé par paquet) et le temps total d'un run
+# limité à une figure (main.py --only 2A --no-cache), puis compare
+# l'import au budget BUDGET_IMPORT_S de pipeline_imports.py.
+# Code de sortie 1 si le budget est dépassé (utilisable en CI).
+# Usage : python benchmarks/bench_imports.py [--only 2A] [--repetitions 3] [--budget 0.6]
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_imports import BUDGET_IMPORT_S, rapport_imports  # noqa: E402
+
+
+def run_une_figure(blocs: str, repetitions: int) -> dict[str, Any]:
+    """
+    main.py --only <blocs> --no-cache dans un dossier jetable (liens vers notebooks/ et data/) :
+    reports/ du dépôt intact. Meilleur temps sur `repetitions` exécutions.
+    """
+    durees = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for d in ("notebooks", "data"):
+            os.symlink(RACINE / d, Path(tmp) / d)
+        env = {**os.environ, "MPLBACKEND": "Agg"}
+        for _ in range(repetitions):
+            t0 = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(RACINE / "main.py"), "--only", blocs, "--no-cache"],
+                cwd=tmp, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            durees.append(time.perf_counter() - t0)
+    return {"blocs": blocs, "duree_s": round(min(durees), 4), "durees_s": [round(d, 4) for d in durees]}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Temps d'import du pipeline et d'un run limité à une figure.")
+    parser.add_argument("--only", default="2A", help="blocs du run mesuré (défaut : 2A, une figure Sankey)")
+    parser.add_argument("--repetitions", type=int, default=3, help="mesures par cas (meilleur temps retenu)")
+    parser.add_argument("--budget", type=float, default=BUDGET_IMPORT_S, help="budget d'import (s)")
+    parser.add_argument("--top", type=int, default=10, help="modules / paquets affichés")
+    parser.add_argument("--sortie", type=Path, default=RACINE / "benchmarks" / "resultats" / "bench_imports.json")
+    args = parser.parse_args(argv)
+
+    # import mesuré plusieurs fois : le 1er passage peut inclure la lecture disque des .pyc
+    rapports = [rapport_imports(top=args.top) for _ in range(args.repetitions)]
+    imports = min(rapports, key=lambda r: r["total_s"])
+    imports["budget_s"] = args.budget
+    imports["dans_budget"] = imports["total_s"] <= args.budget
+    run = run_une_figure(args.only, args.repetitions)
+
+    print(f"Import de {imports['module']} : {imports['total_s']:.3f} s "
+          f"(budget {args.budget:.2f} s, {imports['modules_importes']} modules)")
+    print("Paquets les plus coûteux (temps propre cumulé) :")
+    for paquet, s in imports["paquets"].items():
+        print(f"  {paquet:<28} {s:7.3f} s")
+    print("Modules les plus lents (temps cumulé, -X importtime) :")
+    for m in imports["plus_lents"]:
+        print(f"  {m['module']:<40} {m['cumule_s']:7.3f} s")
+    print(f"Run --only {run['blocs']} --no-cache : {run['duree_s']:.2f} s")
+
+    args.sortie.parent.mkdir(parents=True, exist_ok=True)
+    args.sortie.write_text(json.dumps({
+        "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0], "imports": imports, "run_une_figure": run,
+    }, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"OK - Rapport : {args.sortie}")
+
+    if not imports["dans_budget"]:
+        print(f"ATTENTION - Import au-delà du budget ({imports['total_s']:.3f} s > {args.budget:.2f} s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
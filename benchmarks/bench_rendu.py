@@ -0,0 +1,153 @@
+# ============================================================
+# BENCHMARK — RENDU DES FIGURES À NOMBREUX GLYPHES
+# Compare l'ancien rendu (un patch / un plt.plot par case ou par lien)
+# au rendu par collections (PolyCollection, LineCollection) de
+# pipeline_rendu.py : durée (tracé + savefig) et nombre d'artistes.
+# Usage : python benchmarks/bench_rendu.py [--items 40] [--repetitions 3]
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.patches import Rectangle  # noqa: E402
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+import pipeline_rendu  # noqa: E402
+from pipeline_rendu import (  # noqa: E402
+    PALETTE, apply_design_system, rendu_hexbin, rendu_reseau_items, rendu_waffle,
+)
+
+
+# --- références (implémentations d'origine, un artiste par glyphe)
+def ancien_waffle(values: np.ndarray, labels: list[str], n_repondants: int, *, path: Path) -> None:
+    base_colors = [PALETTE["CERULEAN_DARK"], PALETTE["CERULEAN"], PALETTE["CERULEAN_LIGHT"],
+                   PALETTE["CERULEAN_SOFT"], PALETTE["NAVY"]]
+    colors = [base_colors[i % len(base_colors)] for i in range(len(values))]
+    n_cols = n_rows = 50
+    n_total = n_cols * n_rows
+
+    proportions = values / values.sum()
+    squares = np.floor(proportions * n_total).astype(int)
+    remainder = n_total - squares.sum()
+    if remainder > 0:
+        order = np.argsort(-(proportions * n_total - squares))
+        for i in order[:remainder]:
+            squares[i] += 1
+    grid = []
+    for i, c in enumerate(squares):
+        grid += [i] * int(c)
+    grid = grid[:n_total]
+
+    fig, ax = plt.subplots(figsize=(10, 10), facecolor="white")
+    cell = 0.92
+    for i, cat in enumerate(grid):
+        rect = Rectangle((i % n_cols, n_rows - 1 - i // n_cols), cell, cell,
+                         facecolor=colors[cat], edgecolor="white", linewidth=0.4)
+        ax.add_patch(rect)
+    ax.set_xlim(-1.5, n_cols + 1.5)
+    ax.set_ylim(-8, n_rows + 3.5)
+    ax.axis("off")
+    for i, (lab, val) in enumerate(zip(labels, values)):
+        ax.add_patch(Rectangle((0, -2.5 - i*1.2), 1.2, 0.7, facecolor=colors[i], edgecolor="none"))
+        ax.text(1.5, -2.5 - i*1.2 + 0.35, f"{lab} — {val}", va="center", fontsize=10)
+    pipeline_rendu.export_png(path)
+
+
+def ancien_reseau(noeuds: list[str], tailles: np.ndarray, aretes: pd.DataFrame, seuil: float, *, path: Path) -> None:
+    angles = np.linspace(0, 2*np.pi, len(noeuds), endpoint=False)
+    xy = np.column_stack([np.cos(angles), np.sin(angles)])
+    plt.figure(figsize=(11, 11))
+    for a, b, w in aretes[["source", "cible", "poids"]].itertuples(index=False):
+        link_color = PALETTE["CERULEAN"] if w >= 0.30 else PALETTE["CERULEAN_DARK"]
+        plt.plot([xy[a, 0], xy[b, 0]], [xy[a, 1], xy[b, 1]], linewidth=1 + 4*w, alpha=0.65, color=link_color, zorder=1)
+    plt.scatter(xy[:, 0], xy[:, 1], s=tailles, color=PALETTE["CERULEAN"], alpha=0.95, edgecolor="black", linewidth=0.8, zorder=3)
+    for k, (x, y) in zip(noeuds, xy):
+        plt.text(x*1.18, y*1.18, k, ha="center", va="center", color="black", fontsize=12, zorder=4)
+    plt.title(f"Packs de tendances (corrélation > {seuil})", fontsize=24, fontweight="bold", pad=22)
+    plt.xlim(-1.35, 1.35)
+    plt.ylim(-1.35, 1.35)
+    plt.axis("off")
+    pipeline_rendu.export_png(path)
+
+
+# --- mesure : durée totale + nombre d'artistes de la figure au moment de l'export
+_ARTISTES: list[int] = []
+_export_png = pipeline_rendu.export_png
+
+
+def _export_compte(path: Path) -> None:
+    _ARTISTES.append(len(plt.gcf().findobj()))
+    _export_png(path)
+
+
+def mesurer(fonction, args: tuple, path: Path, repetitions: int) -> tuple[float, int]:
+    durees = []
+    for _ in range(repetitions):
+        _ARTISTES.clear()
+        t0 = time.perf_counter()
+        fonction(*args, path=path)
+        durees.append(time.perf_counter() - t0)
+    return min(durees), _ARTISTES[-1]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rendu par artistes individuels vs collections.")
+    parser.add_argument("--items", type=int, default=40, help="noeuds du réseau d'items (arêtes ≈ items²/4)")
+    parser.add_argument("--repetitions", type=int, default=3, help="rendus par cas (meilleur temps retenu)")
+    args = parser.parse_args(argv)
+
+    apply_design_system()
+    # les deux versions passent par le même export (compte des artistes inclus)
+    pipeline_rendu.export_png = _export_compte
+
+    rng = np.random.default_rng(0)
+    values = np.array([120, 95, 110, 103])
+    labels = [f"Cluster {i}" for i in range(len(values))]
+
+    noeuds = [f"item {i}" for i in range(args.items)]
+    tailles = (rng.integers(1, 200, args.items) + 1) * 30.0
+    src, cib = np.triu_indices(args.items, k=1)
+    garde = rng.random(len(src)) < 0.5
+    aretes = pd.DataFrame({"source": src[garde], "cible": cib[garde],
+                           "poids": rng.uniform(0.15, 0.6, garde.sum())})
+
+    x = rng.uniform(1, 10, 85_600)
+    y = np.clip(x + rng.normal(0, 2, len(x)), 1, 10)
+
+    cas = [
+        ("waffle (2500 cases)", ancien_waffle, rendu_waffle, (values, labels, int(values.sum()))),
+        (f"réseau ({args.items} items, {len(aretes)} arêtes)", ancien_reseau, rendu_reseau_items,
+         (noeuds, tailles, aretes, 0.15)),
+        (f"hexbin ({len(x)} points)", None, rendu_hexbin, (x, y, 25, "x", "y", "hexbin")),
+    ]
+
+    lignes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for nom, ancien, nouveau, donnees in cas:
+            ligne = {"cas": nom}
+            if ancien is not None:
+                ligne["ancien_s"], ligne["ancien_artistes"] = mesurer(ancien, donnees, Path(tmp) / "a.png", args.repetitions)
+            ligne["collections_s"], ligne["collections_artistes"] = mesurer(
+                nouveau, donnees, Path(tmp) / "b.png", args.repetitions)
+            lignes.append(ligne)
+
+    res = pd.DataFrame(lignes).set_index("cas")
+    res["acceleration"] = res["ancien_s"] / res["collections_s"]
+    print(res.round(3).to_string())
+    print("hexbin : déjà une seule PolyCollection (plt.hexbin), donnée pour référence")
+
+
+if __name__ == "__main__":
+    main()
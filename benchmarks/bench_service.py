@@ -0,0 +1,120 @@
+# ============================================================
+# BENCHMARK — SERVICE LOCAL D'AGRÉGATS (main.py --serve)
+# Démarre le service (pipeline_service.py) sur un port libre de 127.0.0.1,
+# dans un dossier jetable (liens vers notebooks/ et data/), puis mesure
+# pour chaque requête type : 1re réponse (calcul), réponses suivantes
+# (cache LRU) et revalidation If-None-Match (304).
+# Code de sortie 1 si une réponse en cache dépasse le budget (défaut 100 ms).
+# Usage : python benchmarks/bench_service.py [--repetitions 20] [--budget-ms 100]
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.error import HTTPError
+
+import matplotlib
+matplotlib.use("Agg")
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+REQUETES = [
+    "/dimensions",
+    "/taux?mesure=Paradoxe&par=Age_Groupe",
+    "/taux?mesure=Paradoxe&par=Age_Groupe&Cluster=2",
+    "/taux?mesure=Sentiment_Culpabilite&par=Frequence_Achat,Genre",
+    "/adoption?question=Type_Articles_Achetes&par=Cluster",
+    "/adoption?question=Canal_Achat&par=Age_Groupe&FF=1",
+    "/sankey?etapes=Frequence_Achat,Canal_Achat,Utilise_FastFashion",
+    "/sankey?etapes=Frequence_Achat,Canal_Achat&Genre=Une%20femme",
+]
+
+
+def appeler(url: str, etag: str | None = None) -> tuple[int, float, str, str]:
+    """(statut, durée côté client en ms, ETag, X-Cache)."""
+    req = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as r:
+            r.read()
+            statut, entetes = r.status, r.headers
+    except HTTPError as e:  # 304 / 4xx
+        statut, entetes = e.code, e.headers
+    return statut, (time.perf_counter() - t0) * 1000, entetes.get("ETag", ""), entetes.get("X-Cache", "")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Latence du service local d'agrégats (à froid, en cache, 304).")
+    parser.add_argument("--repetitions", type=int, default=20, help="appels en cache par requête")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="budget d'une réponse en cache (ms)")
+    parser.add_argument("--sortie", type=Path, default=RACINE / "benchmarks" / "resultats" / "bench_service.json")
+    args = parser.parse_args(argv)
+
+    lignes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for d in ("notebooks", "data"):
+            os.symlink(RACINE / d, Path(tmp) / d)
+        os.chdir(tmp)
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import pipeline_visualisations as pv  # noqa: E402  (après chdir : reports/ dans tmp)
+            from pipeline_service import creer_serveur  # noqa: E402
+
+            pv.TACHES.executer(pv.TACHES.selection(only=["4A"]))  # modèle de personas du dossier jetable
+            t0 = time.perf_counter()
+            service = pv.charger_service()
+            chargement_s = time.perf_counter() - t0
+
+        serveur = creer_serveur(service, "127.0.0.1", 0)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{serveur.server_port}"
+        try:
+            for chemin in REQUETES:
+                statut, froid, etag, _ = appeler(base + chemin)
+                chauds = [appeler(base + chemin)[1] for _ in range(args.repetitions)]
+                statut_304, revalidation, _, _ = appeler(base + chemin, etag)
+                chauds.sort()
+                lignes.append({
+                    "requete": chemin, "statut": statut, "froid_ms": round(froid, 2),
+                    "cache_p50_ms": round(chauds[len(chauds) // 2], 2), "cache_max_ms": round(chauds[-1], 2),
+                    "revalidation_ms": round(revalidation, 2), "statut_revalidation": statut_304,
+                })
+        finally:
+            serveur.shutdown()
+            serveur.server_close()
+            os.chdir(RACINE)
+
+    print(f"Chargement du service : {chargement_s:.2f} s ({service.cube.effectifs()} répondants)")
+    print(f"{'requête':<64} {'froid':>8} {'p50':>7} {'max':>7} {'304':>7}")
+    for r in lignes:
+        print(f"{r['requete']:<64} {r['froid_ms']:8.1f} {r['cache_p50_ms']:7.2f} {r['cache_max_ms']:7.2f} "
+              f"{r['revalidation_ms']:7.2f}")
+    hors_budget = [r["requete"] for r in lignes if r["cache_max_ms"] > args.budget_ms or r["statut"] != 200]
+
+    args.sortie.parent.mkdir(parents=True, exist_ok=True)
+    args.sortie.write_text(json.dumps({
+        "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0], "chargement_s": round(chargement_s, 3), "budget_ms": args.budget_ms,
+        "requetes": lignes, "cache": {"hits": service.cache.hits, "misses": service.cache.misses},
+    }, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"OK - Rapport : {args.sortie}")
+
+    if hors_budget:
+        print(f"ATTENTION - Réponses en échec ou au-delà de {args.budget_ms:.0f} ms : {', '.join(hors_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# ============================================================
+# BENCHMARK — PLAN DE TYPES COMPACTS (pipeline_types.py)
+# Génère un export synthétique (benchmarks/synthetique.py), le normalise
+# comme 0H, puis compare le df normalisé (objets, float64) et le df
+# compact (category, Int8, boolean) : mémoire par colonne (deep) et durée
+# de groupby / value_counts typiques des chapitres.
+# Usage : python benchmarks/bench_types.py --lignes 1000000
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+sys.path.insert(0, str(RACINE / "benchmarks"))
+
+from synthetique import GenerateurSondage  # noqa: E402
+
+OPERATIONS = {
+    "groupby Frequence_Achat × Genre -> moyenne Souci_Ethique":
+        lambda df: df.groupby(["Frequence_Achat", "Genre"], observed=True)["Souci_Ethique"].mean(),
+    "groupby Situation_Pro -> effectifs":
+        lambda df: df.groupby("Situation_Pro", observed=True).size(),
+    "value_counts Canal_Achat":
+        lambda df: df["Canal_Achat"].value_counts(),
+    "groupby Utilise_FastFashion -> moyenne Sentiment_Culpabilite":
+        lambda df: df.groupby("Utilise_FastFashion", observed=True)["Sentiment_Culpabilite"].mean(),
+}
+
+
+def chrono(f, df: pd.DataFrame, repetitions: int) -> float:
+    durees = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        f(df)
+        durees.append(time.perf_counter() - t0)
+    return sorted(durees)[len(durees) // 2]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Mémoire et groupby : df normalisé vs plan de types compact.")
+    parser.add_argument("--lignes", type=int, default=1_000_000, help="taille de l'export synthétique")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repetitions", type=int, default=5, help="mesures par opération (médiane)")
+    parser.add_argument("--sortie", type=Path, default=RACINE / "benchmarks" / "resultats" / "bench_types.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / "synthetique.csv"
+        GenerateurSondage(seed=args.seed).ecrire(csv, args.lignes)
+        os.symlink(RACINE / "data", Path(tmp) / "data")
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                import pipeline_visualisations as pv  # noqa: E402  (après chdir : reports/ dans tmp)
+                from pipeline_types import compacter  # noqa: E402
+
+                df, _ = pv.preparer_vague(pd.read_csv(csv))
+                echelles = [*pv.num_10, *pv.likert_5, *(f"{c}_Rang" for c in pv.ORDINAUX)]
+                libelles = {*pv.SOURCES_DERIVES, *pv.CUBE_DIMENSIONS, *pv.MULTI_CHOIX}
+                t0 = time.perf_counter()
+                compact, rapport = compacter(df, echelles, libelles)
+                compaction_s = time.perf_counter() - t0
+        finally:
+            os.chdir(RACINE)
+
+    avant, apres = int(rapport["octets_avant"].sum()), int(rapport["octets_apres"].sum())
+    print(f"{args.lignes} lignes : {avant / 1e6:.1f} Mo -> {apres / 1e6:.1f} Mo (× {avant / apres:.1f}), "
+          f"plan appliqué en {compaction_s:.2f} s")
+    print(rapport.head(12).to_string(index=False))
+
+    operations = []
+    for nom, f in OPERATIONS.items():
+        normalise_s, compact_s = chrono(f, df, args.repetitions), chrono(f, compact, args.repetitions)
+        operations.append({"operation": nom, "normalise_s": round(normalise_s, 4), "compact_s": round(compact_s, 4)})
+        print(f"{nom:<62} {normalise_s * 1000:8.1f} ms -> {compact_s * 1000:8.1f} ms (× {normalise_s / compact_s:.1f})")
+
+    args.sortie.parent.mkdir(parents=True, exist_ok=True)
+    args.sortie.write_text(json.dumps({
+        "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0], "pandas": pd.__version__, "lignes": args.lignes,
+        "octets_avant": avant, "octets_apres": apres, "compaction_s": round(compaction_s, 3),
+        "operations": operations, "colonnes": rapport.to_dict(orient="records"),
+    }, ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+    print(f"OK - Rapport : {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
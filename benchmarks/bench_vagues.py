@@ -0,0 +1,102 @@
+# ============================================================
+# BENCHMARK — INGESTION MULTI-VAGUES (main.py --ingest)
+# Génère N vagues synthétiques (benchmarks/synthetique.py, une graine par
+# vague) dans un dossier jetable, puis mesure l'ingestion complète vers
+# l'entrepôt partitionné pour plusieurs tailles de pool (1 processus,
+# 2, 4 … jusqu'au nombre de cœurs), la réingestion sans changement
+# (vagues ignorées) et la relecture sélective d'une partie des vagues.
+# Usage : python benchmarks/bench_vagues.py --vagues 50 --lignes 20000
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+sys.path.insert(0, str(RACINE / "benchmarks"))
+
+from synthetique import GenerateurSondage  # noqa: E402
+
+
+def tailles_pool(maximum: int) -> list[int]:
+    tailles = [1]
+    while tailles[-1] * 2 < maximum:
+        tailles.append(tailles[-1] * 2)
+    return tailles + [maximum] if maximum > 1 else tailles
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Ingestion de N vagues CSV vers l'entrepôt partitionné.")
+    parser.add_argument("--vagues", type=int, default=8, help="nombre de fichiers (vagues) générés")
+    parser.add_argument("--lignes", type=int, default=20_000, help="lignes par vague")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="plus grand pool mesuré")
+    parser.add_argument("--sortie", type=Path, default=RACINE / "benchmarks" / "resultats" / "bench_vagues.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        exports = tmp / "exports"
+        exports.mkdir()
+        t0 = time.perf_counter()
+        for i in range(args.vagues):
+            GenerateurSondage(seed=i).ecrire(exports / f"vague_{i:03d}.csv", args.lignes)
+        generation_s = time.perf_counter() - t0
+
+        for d in ("notebooks", "data"):
+            os.symlink(RACINE / d, tmp / d)
+        os.chdir(tmp)
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import pipeline_visualisations as pv  # noqa: E402  (après chdir : sorties dans tmp)
+            from pipeline_vagues import charger_entrepot, cle_frame, ingerer_vagues  # noqa: E402
+
+        entrepot = tmp / "entrepot"
+        version = cle_frame(*pv.version_normalisation())
+        preparer = ("pipeline_visualisations", "preparer_vague")
+        mesures = []
+        try:
+            for w in tailles_pool(args.workers):
+                shutil.rmtree(entrepot, ignore_errors=True)
+                bilan = ingerer_vagues(exports, entrepot, preparer, version, workers=w)["ingestion"]
+                mesures.append({"workers": bilan["workers"], "duree_s": bilan["duree_s"]})
+                print(f"Ingestion {args.vagues} vagues × {args.lignes} lignes, {bilan['workers']} processus : "
+                      f"{bilan['duree_s']:.2f} s (× {mesures[0]['duree_s'] / bilan['duree_s']:.2f})")
+
+            reingestion = ingerer_vagues(exports, entrepot, preparer, version, workers=args.workers)["ingestion"]
+            print(f"Réingestion sans changement : {reingestion['duree_s']:.2f} s ({reingestion['inchanges']} vagues ignorées)")
+
+            t0 = time.perf_counter()
+            partie = charger_entrepot(entrepot, [f"vague_{i:03d}" for i in range(min(2, args.vagues))])
+            selective_s = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            tout = charger_entrepot(entrepot)
+            complete_s = time.perf_counter() - t0
+            print(f"Relecture : 2 vagues {selective_s:.3f} s ({len(partie)} lignes), "
+                  f"toutes {complete_s:.3f} s ({len(tout)} lignes)")
+        finally:
+            os.chdir(RACINE)
+
+    args.sortie.parent.mkdir(parents=True, exist_ok=True)
+    args.sortie.write_text(json.dumps({
+        "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0], "coeurs": os.cpu_count(),
+        "vagues": args.vagues, "lignes_par_vague": args.lignes, "generation_s": round(generation_s, 3),
+        "ingestion": mesures, "reingestion_s": reingestion["duree_s"],
+        "relecture_2_vagues_s": round(selective_s, 4), "relecture_complete_s": round(complete_s, 4),
+    }, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"OK - Rapport : {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# ============================================================
+# GÉNÉRATEUR DE RÉPONDANTS SYNTHÉTIQUES (MÊME SCHÉMA QUE LE CSV RÉEL)
+# But : mesurer le passage à l'échelle (1k … 10M lignes) sans exports de
+# production. Chaque ligne part d'une réponse réelle tirée au hasard
+# (corrélations conservées) dont une partie des cases est retirée dans la
+# loi marginale de la colonne (diversité). Mêmes en-têtes français, choix
+# multiples "a;b", Likert texte, décimales "7,5", valeurs manquantes.
+# Déterministe : même graine + même n -> même fichier, par morceaux de
+# TAILLE_MORCEAU lignes (mémoire bornée pour 10M lignes).
+# Usage : python benchmarks/synthetique.py 1000000 --seed 0 --sortie data/synthetique_1M.csv
+# ============================================================
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+SOURCE = RACINE / "data" / "La mode - LaMode.csv"
+
+TAILLE_MORCEAU = 100_000  # fixe : fait partie de la définition du tirage (graine par morceau)
+DEBUT_SAISIE = pd.Timestamp("2025-10-31 08:00:00")
+ECART_SAISIE_S = 30.0      # une saisie toutes les ~30 s en moyenne
+ALPHABET_CLE = np.frombuffer(b"ABCDEFGHJKLMNPQRSTUVWXYZ23456789", dtype=np.uint8)
+
+
+class GenerateurSondage:
+    """
+    Loi empirique du CSV réel :
+    - ligne modèle tirée parmi les réponses réelles, puis chaque case remplacée avec probabilité `melange`
+      par une valeur tirée dans la marginale de sa colonne (modalités et fréquences observées)
+    - échelles 1–10 : `part_decimales` de demi-points écrits à la française ("7,5"),
+      `part_manquants` de cases vides en plus des manquants d'origine
+    - identifiants, dates et temps de saisie régénérés (uniques, croissants, format du CSV)
+    """
+
+    def __init__(
+        self,
+        source: Path = SOURCE,
+        seed: int = 0,
+        melange: float = 0.35,
+        part_decimales: float = 0.03,
+        part_manquants: float = 0.02,
+    ) -> None:
+        self.reel = pd.read_csv(source)
+        self.seed = seed
+        self.melange = melange
+        self.part_decimales = part_decimales
+        self.part_manquants = part_manquants
+
+        self.colonnes = list(self.reel.columns)
+        self._valeurs = {c: self.reel[c].to_numpy(dtype=object) for c in self.colonnes}
+        self._marges = {}
+        for c in self.colonnes:
+            vc = self.reel[c].value_counts(dropna=False, normalize=True)
+            self._marges[c] = (vc.index.to_numpy(dtype=object), vc.to_numpy())
+        # échelles 1–10 : colonnes entières (manquants tolérés) dont toutes les valeurs sont dans [1, 10]
+        self.echelles = [
+            c for c in self.colonnes
+            if pd.api.types.is_numeric_dtype(self.reel[c]) and self.reel[c].notna().any()
+            and self.reel[c].dropna().between(1, 10).all() and (self.reel[c].dropna() % 1 == 0).all()
+        ]
+        self._id = next((c for c in self.colonnes if c.startswith("N°")), None)
+        self._speciales = {self._id, "Clé", "Date de saisie", "Date de dernier enregistrement", "Temps de saisie"}
+
+    def _rng(self, i_morceau: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, i_morceau])
+
+    def morceau(self, i_morceau: int, n: int) -> pd.DataFrame:
+        """Lignes [i_morceau × TAILLE_MORCEAU, + n) du fichier synthétique."""
+        rng = self._rng(i_morceau)
+        debut = i_morceau * TAILLE_MORCEAU
+        modele = rng.integers(0, len(self.reel), n)
+
+        cols: dict[str, np.ndarray] = {}
+        for c in self.colonnes:
+            if c in self._speciales:
+                continue
+            v = self._valeurs[c][modele]
+            remplace = rng.random(n) < self.melange
+            modalites, probas = self._marges[c]
+            v[remplace] = modalites[rng.choice(len(modalites), size=int(remplace.sum()), p=probas)]
+            cols[c] = v
+
+        for c in self.echelles:
+            v = cols[c]
+            presents = pd.notna(v)
+            v[presents] = v[presents].astype(float).astype(np.int64)  # "4" et non "4.0" (colonne float à cause des NaN)
+            decimales = (rng.random(n) < self.part_decimales) & presents
+            if decimales.any():
+                base = v[decimales].astype(float)
+                demi = np.clip(base + rng.choice([-0.5, 0.5], size=len(base)), 1, 10)
+                v[decimales] = [f"{x:.1f}".replace(".", ",") for x in demi]
+            v[rng.random(n) < self.part_manquants] = np.nan
+
+        # identifiants, dates, durées : régénérés (uniques / croissants d'un morceau à l'autre)
+        idx = np.arange(debut, debut + n)
+        if self._id is not None:
+            cols[self._id] = idx + 1
+        codes = ALPHABET_CLE[rng.integers(0, len(ALPHABET_CLE), (n, 8))]
+        cles = np.concatenate([codes[:, :4], np.full((n, 1), ord("-"), np.uint8), codes[:, 4:]], axis=1)
+        cols["Clé"] = np.ascontiguousarray(cles).view("S9").ravel().astype(str)
+        duree = rng.lognormal(np.log(330), 0.45, n)
+        saisie = DEBUT_SAISIE + pd.to_timedelta((idx + rng.random(n)) * ECART_SAISIE_S, unit="s")
+        cols["Date de saisie"] = saisie.strftime("%d/%m/%Y %H:%M:%S")
+        cols["Date de dernier enregistrement"] = (saisie + pd.to_timedelta(duree, unit="s")).strftime("%d/%m/%Y %H:%M:%S")
+        cols["Temps de saisie"] = np.char.replace(np.char.mod("%.6f", duree), ".", ",")
+
+        return pd.DataFrame({c: cols[c] for c in self.colonnes if c in cols})
+
+    def generer(self, n: int) -> Iterator[pd.DataFrame]:
+        for i, debut in enumerate(range(0, n, TAILLE_MORCEAU)):
+            yield self.morceau(i, min(TAILLE_MORCEAU, n - debut))
+
+    def ecrire(self, path: Path, n: int) -> Path:
+        """Écrit n lignes au format du CSV réel (séparateur ",", en-têtes d'origine), morceau par morceau."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for i, morceau in enumerate(self.generer(n)):
+            morceau.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        return path
+
+
+def generer_sondage(n: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """n répondants synthétiques en mémoire (pour les petits n ; sinon GenerateurSondage.ecrire)."""
+    return pd.concat(list(GenerateurSondage(seed=seed, **kwargs).generer(n)), ignore_index=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Génère un CSV de répondants synthétiques (schéma du CSV réel).")
+    parser.add_argument("lignes", type=int, help="nombre de répondants (ex: 1000, 1000000, 10000000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sortie", type=Path, default=None, help="CSV de sortie (défaut : data/synthetique_<n>.csv)")
+    parser.add_argument("--melange", type=float, default=0.35, help="part des cases retirées dans leur marginale")
+    parser.add_argument("--decimales", type=float, default=0.03, help="part de demi-points \"7,5\" sur les échelles 1–10")
+    parser.add_argument("--manquants", type=float, default=0.02, help="part de cases vides ajoutées sur les échelles 1–10")
+    args = parser.parse_args(argv)
+
+    sortie = args.sortie or RACINE / "data" / f"synthetique_{args.lignes}.csv"
+    t0 = time.perf_counter()
+    GenerateurSondage(
+        seed=args.seed, melange=args.melange, part_decimales=args.decimales, part_manquants=args.manquants,
+    ).ecrire(sortie, args.lignes)
+    print(f"OK - {args.lignes} répondants -> {sortie} ({sortie.stat().st_size / 1e6:.1f} Mo, "
+          f"{time.perf_counter() - t0:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,7 @@
 import runpy
-runpy.run_path("notebooks/pipeline_visualisations.py", run_name="__main__")
\ No newline at end of file
+import sys
+from pathlib import Path
+
+# les modules du pipeline (pipeline_taches, …) vivent à côté du script
+sys.path.insert(0, str(Path(__file__).resolve().parent / "notebooks"))
+runpy.run_path("notebooks/pipeline_visualisations.py", run_name="__main__")
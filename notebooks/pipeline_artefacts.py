@@ -0,0 +1,213 @@
+# ============================================================
+# REGISTRE DES ARTEFACTS — MANIFESTE D'EXÉCUTION
+# But : chaque fichier écrit (PNG, CSV, HTML, JSON, texte) passe par le
+# registre : bloc producteur, durée, taille, hash du contenu, écritures
+# multiples du même fichier. En fin d'exécution : reports/manifest.json
+# (machine) + reports/resume_exports.md (lecture), à la place d'une liste
+# de fichiers tenue à la main.
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import pandas as pd
+
+
+def hash_fichier(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+@dataclass
+class Ecriture:
+    """Une écriture de fichier. origine : "ecrit" (bloc exécuté) ou "cache" (restauré par le cache d'artefacts)."""
+    chemin: str
+    producteur: str | None
+    duree_s: float
+    octets: int
+    sha256: str
+    origine: str = "ecrit"
+    horodatage: str = ""
+
+
+class RegistreArtefacts:
+    """
+    Registre d'une exécution. Le runner déclare le bloc courant (`producteur`) ; les helpers d'écriture
+    (`ecriture`, `ecrire_csv`, `ecrire_texte`, export_png) enregistrent chaque fichier. Pour une figure
+    passée par `rendre`, la durée couvre tout le rendu (tracé + sauvegarde), pas seulement l'écriture.
+    """
+
+    def __init__(self) -> None:
+        self.ecritures: list[Ecriture] = []
+        self.blocs: dict[str, float] = {}             # bloc -> durée (s)
+        self.evites: list[tuple[str, str | None]] = []  # rendus identiques non refaits : (chemin, bloc)
+        self._bloc: str | None = None
+        self._debut_rendu: float | None = None
+
+    @property
+    def bloc_courant(self) -> str | None:
+        return self._bloc
+
+    @contextmanager
+    def producteur(self, nom: str) -> Iterator[None]:
+        precedent, self._bloc = self._bloc, nom
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.blocs[nom] = self.blocs.get(nom, 0.0) + time.perf_counter() - t0
+            self._bloc = precedent
+
+    @contextmanager
+    def rendu(self) -> Iterator[None]:
+        """Pendant un rendu de figure : les écritures sont chronométrées depuis le début du rendu."""
+        self._debut_rendu = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._debut_rendu = None
+
+    @contextmanager
+    def ecriture(self, path: Path) -> Iterator[None]:
+        t0 = self._debut_rendu if self._debut_rendu is not None else time.perf_counter()
+        yield
+        self.enregistrer(path, time.perf_counter() - t0)
+
+    def enregistrer(self, path: Path, duree_s: float, origine: str = "ecrit", producteur: str | None = None) -> None:
+        path = Path(path)
+        self.ecritures.append(Ecriture(
+            chemin=path.as_posix(),
+            producteur=producteur if producteur is not None else self._bloc,
+            duree_s=duree_s,
+            octets=path.stat().st_size,
+            sha256=hash_fichier(path),
+            origine=origine,
+            horodatage=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        ))
+
+    def restaures(self, nom: str, chemins: tuple[Path, ...]) -> None:
+        """Sorties d'un bloc restaurées par le cache d'artefacts (pas de rendu)."""
+        for p in chemins:
+            if Path(p).exists():
+                self.enregistrer(p, 0.0, origine="cache", producteur=nom)
+
+    def ajouter(self, ecritures: list[Ecriture], producteur: str | None) -> None:
+        """Écritures faites dans un processus de rendu (pool) : rattachées au bloc qui a demandé le rendu."""
+        for e in ecritures:
+            e.producteur = producteur
+            self.ecritures.append(e)
+
+    def chemins(self, nom: str) -> set[Path]:
+        """Fichiers écrits (ou rendus identiques évités) par le bloc `nom` pendant cette exécution."""
+        faits = {Path(e.chemin) for e in self.ecritures if e.producteur == nom and e.origine == "ecrit"}
+        return faits | {Path(c) for c, b in self.evites if b == nom}
+
+    def doublons(self) -> dict[str, list[str | None]]:
+        """Fichiers écrits plusieurs fois pendant l'exécution -> blocs qui les ont écrits (dans l'ordre)."""
+        par_chemin: dict[str, list[str | None]] = defaultdict(list)
+        for e in self.ecritures:
+            if e.origine == "ecrit":
+                par_chemin[e.chemin].append(e.producteur)
+        return {c: b for c, b in par_chemin.items() if len(b) > 1}
+
+    # --------------------------------------------------------
+    # Manifeste
+    # --------------------------------------------------------
+    def manifeste(self, selection: list[str] | None = None, precedent: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        Un enregistrement par fichier (dernière écriture ; durée = somme des écritures de l'exécution).
+        Les fichiers d'une exécution précédente qui existent encore sont repris (origine "precedent").
+        """
+        artefacts: dict[str, dict[str, Any]] = {}
+        for e in self.ecritures:
+            a = artefacts.setdefault(e.chemin, {"ecritures": 0, "duree_s": 0.0, "producteurs": []})
+            a.update({k: v for k, v in asdict(e).items() if k not in ("duree_s", "producteur")})
+            a["ecritures"] += 1
+            a["duree_s"] += e.duree_s
+            if e.producteur not in a["producteurs"]:
+                a["producteurs"].append(e.producteur)
+        for a in artefacts.values():
+            a["producteur"] = a["producteurs"][-1]
+            a["duree_s"] = round(a["duree_s"], 4)
+
+        for chemin, a in ((precedent or {}).get("artefacts") or {}).items():
+            if chemin not in artefacts and Path(chemin).exists():
+                artefacts[chemin] = {**a, "origine": "precedent"}
+
+        return {
+            "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "selection": selection,
+            "totaux": {
+                "fichiers": len(artefacts),
+                "octets": sum(a["octets"] for a in artefacts.values()),
+                "duree_ecritures_s": round(sum(e.duree_s for e in self.ecritures), 4),
+                "duree_blocs_s": round(sum(self.blocs.values()), 4),
+            },
+            "blocs": {n: round(d, 4) for n, d in self.blocs.items()},
+            "doublons": self.doublons(),
+            "rendus_evites": [{"chemin": c, "bloc": b} for c, b in self.evites],
+            "artefacts": dict(sorted(artefacts.items())),
+        }
+
+    @staticmethod
+    def markdown(m: dict[str, Any]) -> str:
+        t = m["totaux"]
+        md = [
+            "# Résumé des exports\n",
+            f"Exécution du {m['genere_le']} — {t['fichiers']} fichiers, {t['octets'] / 1e6:.2f} Mo, "
+            f"blocs : {t['duree_blocs_s']:.2f} s (détail machine : reports/manifest.json)\n",
+            "| Fichier | Bloc | Durée (s) | Taille (Ko) | Écritures | Origine |",
+            "|---|---|---:|---:|---:|---|",
+        ]
+        # les plus coûteux d'abord (temps, puis disque)
+        for chemin, a in sorted(m["artefacts"].items(), key=lambda kv: (-kv[1]["duree_s"], -kv[1]["octets"])):
+            md.append(f"| {chemin} | {a['producteur'] or '-'} | {a['duree_s']:.3f} | {a['octets'] / 1024:.1f} "
+                      f"| {a['ecritures']} | {a['origine']} |")
+        if m["doublons"]:
+            md += ["", "## Écritures multiples du même fichier", ""]
+            md += [f"- {c} : {', '.join(b or '-' for b in blocs)}" for c, blocs in m["doublons"].items()]
+        if m["rendus_evites"]:
+            md += ["", "## Rendus identiques non refaits", ""]
+            md += [f"- {r['chemin']} (bloc {r['bloc']})" for r in m["rendus_evites"]]
+        if m["blocs"]:
+            md += ["", "## Temps par bloc", ""]
+            md += [f"- {n} : {d:.3f} s" for n, d in sorted(m["blocs"].items(), key=lambda kv: -kv[1])]
+        return "\n".join(md) + "\n"
+
+    def ecrire_manifeste(self, json_path: Path, md_path: Path, selection: list[str] | None = None) -> dict[str, Any]:
+        json_path, md_path = Path(json_path), Path(md_path)
+        precedent = None
+        if json_path.exists():
+            try:
+                precedent = json.loads(json_path.read_text(encoding="utf-8"))
+            except ValueError:
+                precedent = None
+        m = self.manifeste(selection, precedent)
+        json_path.write_text(json.dumps(m, ensure_ascii=False, indent=1), encoding="utf-8")
+        md_path.write_text(self.markdown(m), encoding="utf-8")
+        return m
+
+
+# registre unique du processus (chaque worker de rendu a le sien, renvoyé au processus principal)
+ARTEFACTS = RegistreArtefacts()
+
+
+def ecrire_csv(df: pd.DataFrame, path: Path, **kwargs: Any) -> None:
+    with ARTEFACTS.ecriture(path):
+        df.to_csv(path, **kwargs)
+
+
+def ecrire_texte(path: Path, texte: str) -> None:
+    with ARTEFACTS.ecriture(path):
+        Path(path).write_text(texte, encoding="utf-8")
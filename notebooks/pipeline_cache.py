@@ -0,0 +1,171 @@
+# ============================================================
+# CACHE D'ARTEFACTS ADRESSÉ PAR LE CONTENU
+# But : ne pas régénérer un PNG / CSV si rien de ce qu'il utilise n'a changé.
+# Clé d'un bloc = code du bloc + fonctions pipeline_* qu'il atteint (appels
+# transitifs : _finaliser_* -> rendu_* -> export_png) + source des modules
+# d'aide traversés + paramètres déclarés + hash des colonnes réellement lues.
+# Si la clé existe déjà dans le store : on restaure les fichiers (et les
+# produits comme df_cluster) au lieu de relancer le bloc.
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import pickle
+import shutil
+import sys
+import time
+from pathlib import Path
+from types import CodeType, FunctionType
+from typing import Any
+
+import pandas as pd
+
+from pipeline_artefacts import ARTEFACTS, hash_fichier
+from pipeline_taches import Tache
+
+
+CACHE_DIR = Path(".cache") / "pipeline"
+
+
+def hash_valeur(valeur: Any, colonnes: tuple[str, ...] = ()) -> str:
+    """Hash stable d'une entrée : seulement les colonnes déclarées si c'est un DataFrame, `empreinte()` si fournie."""
+    h = hashlib.sha256()
+    if isinstance(valeur, pd.DataFrame):
+        cols = [c for c in colonnes if c in valeur.columns] if colonnes else list(valeur.columns)
+        sub = valeur[cols]
+        h.update(repr([(c, str(sub[c].dtype)) for c in cols]).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(sub, index=True).values.tobytes())
+    elif callable(getattr(valeur, "empreinte", None)):
+        # objets dont le pickle varie après un aller-retour par le cache (ex: Cube, MatriceFeatures) : hash de leur contenu
+        h.update(valeur.empreinte().encode("utf-8"))
+    else:
+        h.update(pickle.dumps(valeur, protocol=4))
+    return h.hexdigest()
+
+
+def _noms(code: CodeType) -> set[str]:
+    """Noms globaux lus par `code` et par ses fonctions internes (lambdas, compréhensions, closures)."""
+    noms = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, CodeType):
+            noms |= _noms(c)
+    return noms
+
+
+def _module_pipeline(obj: Any) -> str | None:
+    """Module pipeline_* qui définit `obj` (fonction, classe, module, ou type d'une instance), sinon None."""
+    if inspect.ismodule(obj):
+        nom = obj.__name__
+    elif inspect.isfunction(obj) or inspect.isclass(obj):
+        nom = obj.__module__
+    else:
+        nom = type(obj).__module__
+    return nom if nom and nom.startswith("pipeline_") else None
+
+
+def dependances_code(fn: FunctionType) -> tuple[list[FunctionType], list[str]]:
+    """
+    Fonctions pipeline_* atteintes depuis `fn` (appels transitifs : _finaliser_* -> rendu_* -> export_png …,
+    `fn` comprise, ordre stable) et modules d'aide traversés (autres que celui de `fn`).
+    """
+    racine = fn.__module__
+    vues: dict[FunctionType, str] = {}
+    modules: set[str] = set()
+    a_voir = [fn]
+    while a_voir:
+        f = a_voir.pop()
+        if f in vues:
+            continue
+        vues[f] = f"{f.__module__}.{f.__qualname__}"
+        for nom in _noms(f.__code__):
+            obj = f.__globals__.get(nom)
+            module = _module_pipeline(obj) if obj is not None else None
+            if module is None and not (inspect.isfunction(obj) and obj.__module__ == racine):
+                continue
+            if inspect.isfunction(obj):
+                a_voir.append(obj)
+            if module is not None and module != racine:
+                modules.add(module)
+    return sorted(vues, key=vues.get), sorted(modules)
+
+
+def version_code(tache: Tache) -> str:
+    """Source du bloc + des fonctions pipeline_* qu'il atteint + source complète des modules d'aide traversés."""
+    fonctions, modules = dependances_code(tache.fonction)
+    morceaux = [tache.version]
+    morceaux += [inspect.getsource(f) for f in fonctions]
+    morceaux += [inspect.getsource(sys.modules[m]) for m in modules if m in sys.modules]
+    return hashlib.sha256("\n".join(morceaux).encode("utf-8")).hexdigest()
+
+
+class CacheArtefacts:
+    """Store local : CACHE_DIR/<clé>/{meta.json, produits.pkl, fichiers…}."""
+
+    def __init__(self, racine: Path = CACHE_DIR) -> None:
+        self.racine = Path(racine)
+        self._en_attente: list[tuple[Tache, str, dict[Path, int | None], dict[str, Any]]] = []
+        self.hits: list[str] = []
+        self.misses: list[str] = []
+
+    def cle(self, tache: Tache, entrees: dict[str, Any]) -> str:
+        h = hashlib.sha256()
+        h.update(tache.nom.encode("utf-8"))
+        h.update(version_code(tache).encode("utf-8"))
+        h.update(json.dumps(tache.params, sort_keys=True, default=str).encode("utf-8"))
+        for nom in tache.entrees:
+            h.update(nom.encode("utf-8"))
+            h.update(hash_valeur(entrees[nom], tache.colonnes).encode("utf-8"))
+        return h.hexdigest()[:32]
+
+    def restaurer(self, tache: Tache, cle: str) -> dict[str, Any] | None:
+        """Hit : recopie les fichiers manquants/modifiés et renvoie les produits. Miss : None."""
+        dossier = self.racine / cle
+        meta_path = dossier / "meta.json"
+        if not meta_path.exists():
+            self.misses.append(tache.nom)
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        for f in meta["fichiers"]:
+            cible = Path(f["path"])
+            if not cible.exists() or hash_fichier(cible) != f["sha256"]:
+                cible.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(dossier / f["sha256"], cible)
+        produits: dict[str, Any] = {}
+        if (dossier / "produits.pkl").exists():
+            with open(dossier / "produits.pkl", "rb") as fh:
+                produits = pickle.load(fh)
+        self.hits.append(tache.nom)
+        return produits
+
+    @staticmethod
+    def etat_sorties(tache: Tache) -> dict[Path, int | None]:
+        """mtime des sorties avant exécution (pour savoir ensuite ce que le bloc a réellement écrit)."""
+        return {p: (p.stat().st_mtime_ns if p.exists() else None) for p in tache.sorties}
+
+    def preparer(self, tache: Tache, cle: str, avant: dict[Path, int | None], produits: dict[str, Any]) -> None:
+        """Miss : mémorise le bloc ; le stockage a lieu dans `valider` (après le rendu parallèle)."""
+        self._en_attente.append((tache, cle, avant, produits))
+
+    def valider(self) -> None:
+        """
+        Écrit dans le store les fichiers réellement (ré)écrits par les blocs exécutés
+        (y compris une figure identique déjà rendue par un autre bloc : rendu évité, fichier à jour).
+        """
+        for tache, cle, avant, produits in self._en_attente:
+            dossier = self.racine / cle
+            dossier.mkdir(parents=True, exist_ok=True)
+            fichiers = []
+            ecrits = ARTEFACTS.chemins(tache.nom)
+            for p in tache.sorties:
+                if p.exists() and (p.stat().st_mtime_ns != avant.get(p) or p in ecrits):
+                    sha = hash_fichier(p)
+                    shutil.copyfile(p, dossier / sha)
+                    fichiers.append({"path": p.as_posix(), "sha256": sha})
+            if produits:
+                with open(dossier / "produits.pkl", "wb") as fh:
+                    pickle.dump(produits, fh, protocol=4)
+            meta = {"bloc": tache.nom, "cree": time.time(), "fichiers": fichiers}
+            (dossier / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        self._en_attente.clear()
@@ -0,0 +1,197 @@
+# ============================================================
+# CUBE D'AGRÉGATS (OLAP) — COMPTES, SOMMES, SOMMES DES CARRÉS
+# But : la plupart des figures sont un groupby / crosstab sur quelques
+# dimensions (cluster, fréquence, canal, FF, âge …). Le cube lit les lignes
+# des répondants une seule fois :
+# - base = agrégats par combinaison observée de toutes les dimensions
+#   (codes entiers, manquant = -1), + une base "éclatée" par question à
+#   choix multiples (une ligne par modalité cochée)
+# - cuboïdes : toutes les combinaisons jusqu'à l'ordre `ordre`, déduites
+#   de la base par agrégation (roll-up), sans relire les répondants
+# Taux, moyennes et variances se lisent ensuite dans les cuboïdes
+# (mêmes colonnes n / somme / somme_carres que pipeline_donnees.moments).
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from pipeline_multichoix import MultiHot
+
+
+STATS = ("n", "somme", "somme_carres")
+TOUS = "*"  # colonnes ("*", "n") = lignes, ("*", <question multiple>) = lignes ayant coché au moins une modalité
+
+
+@dataclass
+class Cube:
+    """
+    Cube d'agrégats. `dimensions` = simples puis multiples (ordre de déclaration) ;
+    une combinaison ne peut contenir qu'une dimension multiple (sinon double compte).
+    """
+    dimensions: tuple[str, ...]
+    multiples: tuple[str, ...]
+    mesures: tuple[str, ...]
+    ordre: int
+    modalites: dict[str, pd.Index]
+    bases: dict[str | None, pd.DataFrame]  # None : base simple ; nom : base éclatée de la question multiple
+    cuboides: dict[tuple[str, ...], pd.DataFrame] = field(default_factory=dict)
+
+    def _cle(self, par: Iterable[str]) -> tuple[str, ...]:
+        par = list(par)
+        inconnues = [d for d in par if d not in self.dimensions]
+        if inconnues:
+            raise KeyError(f"Dimensions absentes du cube : {inconnues} ({', '.join(self.dimensions)})")
+        if sum(d in self.multiples for d in par) > 1:
+            raise ValueError(f"Une seule dimension à choix multiples par tranche : {par}")
+        return tuple(d for d in self.dimensions if d in par)
+
+    def _cuboide(self, cle: tuple[str, ...]) -> pd.DataFrame:
+        """Cuboïde précalculé, ou roll-up de la base (mémorisé) au-delà de l'ordre du cube."""
+        if cle not in self.cuboides:
+            multiple = next((d for d in cle if d in self.multiples), None)
+            self.cuboides[cle] = _rouler(self.bases[multiple], cle)
+        return self.cuboides[cle]
+
+    def _tranche(self, par: Iterable[str]) -> pd.DataFrame:
+        """Cuboïde de `par` (dans l'ordre demandé), libellés des modalités à la place des codes."""
+        par = list(par)
+        res = self._cuboide(self._cle(par))
+        if not par:
+            return res
+        if len(par) > 1:
+            res = res.reorder_levels(par).sort_index()
+        niveaux = [self.modalites[d].take(res.index.get_level_values(d)) for d in par]
+        index = pd.Index(niveaux[0], name=par[0]) if len(par) == 1 else pd.MultiIndex.from_arrays(niveaux, names=par)
+        return res.set_axis(index)
+
+    # --------------------------------------------------------
+    # Lectures
+    # --------------------------------------------------------
+    def effectifs(self, par: Iterable[str] = (), parmi: str | None = None) -> pd.Series | int:
+        """Nombre de lignes par groupe ; `parmi` = question multiple : seulement les lignes qui y ont répondu."""
+        res = self._tranche(par)[(TOUS, parmi or "n")]
+        return int(res.iloc[0]) if not list(par) else res.rename(None)
+
+    def moments(self, mesure: str, par: Iterable[str] = ()) -> pd.DataFrame | pd.Series:
+        """n / somme / somme des carrés de `mesure` par groupe (pour moyenne() / variance())."""
+        res = self._tranche(par)[mesure]
+        return res.iloc[0] if not list(par) else res
+
+    def moyennes(self, mesures: Iterable[str], par: Iterable[str]) -> pd.DataFrame:
+        """Moyenne de chaque mesure par groupe (valeurs manquantes ignorées, comme groupby().mean())."""
+        t = self._tranche(par)
+        return pd.DataFrame({m: t[(m, "somme")] / t[(m, "n")] for m in mesures})
+
+    def taux(self, dimension: str, par: Iterable[str] = (), parmi: str | None = None) -> pd.DataFrame | pd.Series:
+        """
+        Part (0–1) de chaque modalité de `dimension` dans chaque groupe de `par` :
+        - dimension simple : parmi les lignes où elle est renseignée (crosstab normalize="index")
+        - dimension multiple : parmi toutes les lignes du groupe (ou celles qui ont répondu, `parmi`)
+        """
+        par = list(par)
+        comptes = self.effectifs([*par, dimension])
+        if par:
+            comptes = comptes.unstack(dimension, fill_value=0)
+        if dimension not in self.multiples:
+            total = comptes.sum(axis=1) if par else comptes.sum()
+        else:
+            total = self.effectifs(par, parmi=parmi)
+            if par:
+                comptes = comptes.reindex(total.index, fill_value=0)  # groupes sans aucune modalité cochée
+        return comptes.div(total, axis=0) if par else comptes / total
+
+    def empreinte(self) -> str:
+        """Hash du contenu (bases + modalités) : clé de cache stable, cuboïdes mémorisés ou non."""
+        h = hashlib.sha256(repr((self.dimensions, self.multiples, self.mesures, self.ordre)).encode("utf-8"))
+        for d in self.dimensions:
+            h.update(repr(self.modalites[d].tolist()).encode("utf-8"))
+        for q, base in self.bases.items():
+            h.update(repr((q, base.columns.tolist(), base.index.names)).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(base, index=True).values.tobytes())
+        return h.hexdigest()
+
+    def taille(self) -> int:
+        """Nombre de cellules (lignes de toutes les bases + cuboïdes)."""
+        return sum(len(b) for b in self.bases.values()) + sum(len(c) for c in self.cuboides.values())
+
+
+def _rouler(base: pd.DataFrame, par: tuple[str, ...]) -> pd.DataFrame:
+    """Agrège la base sur `par` ; lignes dont une dimension de `par` manque (-1) exclues, comme groupby."""
+    if not par:
+        return base.sum().to_frame().T
+    garde = np.ones(len(base), dtype=bool)
+    for d in par:
+        garde &= base.index.get_level_values(d) >= 0
+    return base[garde].groupby(level=list(par), sort=True).sum()
+
+
+def construire_cube(
+    dimensions: pd.DataFrame,
+    mesures: pd.DataFrame | None = None,
+    multiples: dict[str, MultiHot] | None = None,
+    ordre: int = 2,
+) -> Cube:
+    """
+    Une passe sur les lignes : codes des dimensions (factorize trié, manquant = -1), puis agrégats
+    (lignes, et n / somme / somme des carrés de chaque mesure) par combinaison observée.
+    `multiples` : encodages multi-hot (0I) alignés sur les mêmes lignes, une base éclatée chacun.
+    Tous les cuboïdes jusqu'à `ordre` dimensions sont ensuite précalculés depuis les bases.
+    """
+    multiples = dict(multiples or {})
+    mesures = pd.DataFrame(index=dimensions.index) if mesures is None else mesures
+    simples = list(dimensions.columns)
+    n = len(dimensions)
+
+    codes: dict[str, np.ndarray] = {}
+    modalites: dict[str, pd.Index] = {}
+    for d in simples:
+        c, m = pd.factorize(dimensions[d], sort=True)
+        codes[d], modalites[d] = c.astype(np.int32), pd.Index(m, name=d)
+
+    # faits : une colonne par statistique, une ligne par répondant
+    valeurs = mesures.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan).reshape(n, -1)
+    presents = ~np.isnan(valeurs)
+    v = np.where(presents, valeurs, 0.0)
+    faits: dict[tuple[str, str], np.ndarray] = {(TOUS, "n"): np.ones(n, dtype=np.int64)}
+    lignes_multiples = {}
+    for q, mh in multiples.items():
+        pos = mh.index.get_indexer(dimensions.index)
+        if (pos < 0).any():
+            raise KeyError(f"Lignes absentes de l'encodage multi-choix {q}")
+        lignes_multiples[q] = mh.matrice[pos].tocoo()
+        faits[(TOUS, q)] = (mh.n_choix[pos] > 0).astype(np.int64)
+    for i, m in enumerate(mesures.columns):
+        faits[(m, "n")] = presents[:, i].astype(np.int64)
+        faits[(m, "somme")] = v[:, i]
+        faits[(m, "somme_carres")] = v[:, i] ** 2
+    faits_df = pd.DataFrame(faits)
+    faits_df.columns = pd.MultiIndex.from_tuples(faits_df.columns)
+
+    def agreger(lignes: np.ndarray | None, extra: dict[str, np.ndarray]) -> pd.DataFrame:
+        f = faits_df if lignes is None else faits_df.take(lignes).reset_index(drop=True)  # clés alignées par position
+        cles = {d: codes[d] if lignes is None else codes[d][lignes] for d in simples} | extra
+        if not cles:
+            return f.sum().to_frame().T
+        return f.groupby([pd.Series(c, name=d) for d, c in cles.items()], sort=True).sum()
+
+    bases: dict[str | None, pd.DataFrame] = {None: agreger(None, {})}
+    for q, coo in lignes_multiples.items():
+        # une ligne de faits par (répondant, modalité cochée) ; la modalité devient une dimension
+        modalites[q] = pd.Index(multiples[q].vocabulaire, name=q)
+        bases[q] = agreger(coo.row, {q: coo.col.astype(np.int32)})
+
+    cube = Cube(
+        dimensions=tuple(simples + list(multiples)), multiples=tuple(multiples),
+        mesures=tuple(mesures.columns), ordre=ordre, modalites=modalites, bases=bases,
+    )
+    for k in range(ordre + 1):
+        for combinaison in combinations(cube.dimensions, k):
+            if sum(d in cube.multiples for d in combinaison) <= 1:
+                cube._cuboide(combinaison)
+    return cube
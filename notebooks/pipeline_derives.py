@@ -0,0 +1,133 @@
+# ============================================================
+# INDICATEURS DÉRIVÉS — CALCULÉS UNE FOIS, PARTAGÉS PAR LES CHAPITRES
+# But : une seule définition de "fast fashion oui/non", "éthique élevée",
+# "paradoxe", des groupes d'âge et des échelles 1–10 (chapitres 1 et 6
+# calculaient chacun leur version, sur le df complet).
+# - colonnes typées : FF Int8 (1/0/NA), Ethique_Haute / Paradoxe bool,
+#   Age_Groupe catégorielle, échelles Int8 (même nom que la colonne source)
+# - chaque décodage texte est fait une fois par modalité distincte
+# - MagasinDerives : recalcul seulement si les colonnes sources changent
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from pipeline_donnees import decoder_par_modalite, safe_to_numeric
+
+
+AGE_BORNES = [0, 18, 24, 34, 44, 54, 64, 120]
+AGE_LIBELLES = ["<18", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+
+SOURCES = ("Utilise_FastFashion", "Souci_Ethique", "Age")  # + les échelles demandées
+
+
+def _premiere_colonne(series: pd.Series | pd.DataFrame) -> pd.Series:
+    # colonnes dupliquées mal gérées : 1ère valeur non manquante de la ligne
+    if isinstance(series, pd.DataFrame):
+        return series.bfill(axis=1).iloc[:, 0]
+    return series
+
+
+def echelle_1_10(series: pd.Series | None) -> pd.Series:
+    """
+    Convertit une série vers une échelle 1–10 robuste :
+    - gère '7,5' (virgule FR)
+    - gère textes parasites
+    - clip [1,10]
+    - arrondi à l'entier le plus proche (Int8, NA si illisible)
+    Conversion faite une fois par valeur distincte, puis diffusée.
+    """
+    if series is None:
+        return pd.Series(dtype="Int8")
+
+    def conv(u: pd.Series) -> pd.Series:
+        u = u.astype(str).str.replace(",", ".", regex=False).str.strip()
+        u = pd.to_numeric(u, errors="coerce")
+        u = u.clip(1, 10)
+        return u.round().astype("Int8")
+    return decoder_par_modalite(_premiere_colonne(series), conv)
+
+
+def ff_binaire(series: pd.Series | None) -> pd.Series:
+    """Fast fashion : mot "oui" -> 1, sinon mot "non" -> 0, sinon NA (Int8)."""
+    if series is None:
+        return pd.Series(dtype="Int8")
+
+    def conv(u: pd.Series) -> pd.Series:
+        txt = u.astype(str).str.lower().str.strip()
+        out = np.select(
+            [txt.str.contains(r"\boui\b", na=False), txt.str.contains(r"\bnon\b", na=False)],
+            [1, 0],
+            default=-1,
+        )
+        return pd.Series(out, index=txt.index).astype("Int8").mask(out < 0)
+    return decoder_par_modalite(_premiere_colonne(series), conv).rename(None)
+
+
+def groupe_age(age: pd.Series) -> pd.Series:
+    """Tranches d'âge du chapitre 1 (catégorielle ordonnée, NA si âge manquant)."""
+    return pd.cut(pd.to_numeric(age, errors="coerce"), bins=AGE_BORNES, labels=AGE_LIBELLES, include_lowest=True)
+
+
+def calculer_derives(df: pd.DataFrame, seuil_ethique: float, echelles: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Indicateurs alignés sur df.index (colonnes sources absentes : indicateur absent) :
+    - FF : 1 = achète de la fast fashion, 0 = non, NA = réponse non interprétable
+    - Ethique_Haute : Souci_Ethique >= seuil (False si manquant)
+    - Paradoxe : Ethique_Haute ET FF == 1
+    - Age_Groupe : tranches AGE_LIBELLES
+    - une colonne Int8 par échelle 1–10 demandée (même nom que la source)
+    """
+    d = pd.DataFrame(index=df.index)
+    if "Utilise_FastFashion" in df.columns:
+        d["FF"] = ff_binaire(df["Utilise_FastFashion"])
+    if "Souci_Ethique" in df.columns:
+        d["Ethique_Haute"] = (safe_to_numeric(df["Souci_Ethique"]) >= seuil_ethique).to_numpy(bool)
+    if "FF" in d and "Ethique_Haute" in d:
+        d["Paradoxe"] = d["Ethique_Haute"] & d["FF"].eq(1).fillna(False).to_numpy(bool)
+    if "Age" in df.columns:
+        d["Age_Groupe"] = groupe_age(df["Age"])
+    for c in echelles:
+        if c in df.columns:
+            d[c] = echelle_1_10(df[c])
+    return d
+
+
+class MagasinDerives:
+    """
+    Dernier jeu d'indicateurs calculé, mémorisé avec le hash de ses colonnes sources :
+    même df (ou mêmes valeurs sources) -> même DataFrame ; colonnes sources modifiées -> recalcul.
+    Une seule entrée : en mode flux, chaque morceau remplace le précédent.
+    """
+
+    def __init__(self, seuil_ethique: float, echelles: Iterable[str] = ()) -> None:
+        self.seuil_ethique = seuil_ethique
+        self.echelles = tuple(echelles)
+        self._cle: str | None = None
+        self._derives: pd.DataFrame | None = None
+        self.calculs = 0
+
+    def sources(self, df: pd.DataFrame) -> list[str]:
+        return [c for c in (*SOURCES, *self.echelles) if c in df.columns]
+
+    def _hash(self, df: pd.DataFrame) -> str:
+        cols = self.sources(df)
+        h = hashlib.sha256(repr((self.seuil_ethique, cols)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(df[cols], index=True).values.tobytes())
+        return h.hexdigest()
+
+    def obtenir(self, df: pd.DataFrame) -> pd.DataFrame:
+        cle = self._hash(df)
+        if cle != self._cle:
+            self._derives = calculer_derives(df, self.seuil_ethique, self.echelles)
+            self._cle = cle
+            self.calculs += 1
+        return self._derives
+
+    def vider(self) -> None:
+        self._cle = None
+        self._derives = None
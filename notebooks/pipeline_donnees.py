@@ -0,0 +1,204 @@
+# ============================================================
+# STOCKAGE COLONNAIRE DU DATAFRAME NORMALISÉ
+# But : ne faire read_csv + rename_robuste + préparation numérique/Likert
+# qu'une seule fois par fichier source. Le df propre est écrit colonne par
+# colonne (.npy typés + dictionnaire des modalités pour les textes) et relu
+# en mémoire mappée (mmap) aux exécutions suivantes.
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from pipeline_cache import CACHE_DIR
+
+
+FRAMES_DIR = CACHE_DIR / "frames"
+
+
+def cle_frame(*morceaux: Any) -> str:
+    """Clé du df normalisé (ex: hash du CSV brut + mapping rename_robuste + version du code)."""
+    h = hashlib.sha256()
+    for m in morceaux:
+        h.update(json.dumps(m, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def _est_texte(s: pd.Series) -> bool:
+    valeurs = s.dropna()
+    return s.dtype == object and valeurs.map(type).eq(str).all()
+
+
+def sauver_frame(df: pd.DataFrame, dossier: Path) -> None:
+    """
+    Écrit df en colonnes :
+    - numériques / booléens : un .npy par colonne (dtype d'origine)
+    - textes : codes entiers (-1 = manquant) + modalités dans meta.json
+    - autres (types mixtes) : .npy objet (pickle), rare
+    """
+    dossier = Path(dossier)
+    tmp = dossier.with_name(dossier.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    colonnes = []
+    for i, c in enumerate(df.columns):
+        s = df[c]
+        fichier = f"col_{i:04d}.npy"
+        if s.dtype.kind in "biuf":
+            np.save(tmp / fichier, s.to_numpy())
+            colonnes.append({"nom": c, "type": "numerique", "fichier": fichier})
+        elif _est_texte(s):
+            codes, modalites = pd.factorize(s, use_na_sentinel=True)
+            dtype = np.int8 if len(modalites) < 127 else np.int16 if len(modalites) < 32767 else np.int32
+            np.save(tmp / fichier, codes.astype(dtype))
+            colonnes.append({"nom": c, "type": "texte", "fichier": fichier, "modalites": list(modalites)})
+        else:
+            np.save(tmp / fichier, s.to_numpy(dtype=object), allow_pickle=True)
+            colonnes.append({"nom": c, "type": "objet", "fichier": fichier})
+
+    meta = {"n_lignes": len(df), "colonnes": colonnes}
+    if not isinstance(df.index, pd.RangeIndex):
+        np.save(tmp / "index.npy", df.index.to_numpy())
+        meta["index"] = "index.npy"
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    # remplacement "atomique" : jamais de cache à moitié écrit
+    shutil.rmtree(dossier, ignore_errors=True)
+    tmp.rename(dossier)
+
+
+def frame_existe(dossier: Path) -> bool:
+    return (Path(dossier) / "meta.json").exists()
+
+
+def charger_frame(dossier: Path, colonnes: list[str] | None = None, mmap: bool = True) -> pd.DataFrame:
+    """
+    Relit un df écrit par `sauver_frame` (éventuellement seulement certaines colonnes).
+    Colonnes numériques en mémoire mappée (lecture seule, pas de copie) ; textes décodés
+    en object comme après read_csv (même comportement pour les blocs en aval).
+    """
+    dossier = Path(dossier)
+    meta = json.loads((dossier / "meta.json").read_text(encoding="utf-8"))
+    mode = "r" if mmap else None
+
+    data: dict[str, Any] = {}
+    for col in meta["colonnes"]:
+        if colonnes is not None and col["nom"] not in colonnes:
+            continue
+        chemin = dossier / col["fichier"]
+        if col["type"] == "numerique":
+            data[col["nom"]] = np.load(chemin, mmap_mode=mode)
+        elif col["type"] == "texte":
+            codes = np.load(chemin, mmap_mode=mode)
+            modalites = np.array(col["modalites"] + [np.nan], dtype=object)
+            data[col["nom"]] = modalites[codes]  # code -1 -> dernier élément (NaN)
+        else:
+            data[col["nom"]] = np.load(chemin, allow_pickle=True)
+
+    index = np.load(dossier / meta["index"]) if "index" in meta else pd.RangeIndex(meta["n_lignes"])
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+# ============================================================
+# MODE FLUX : LECTURE PAR MORCEAUX + AGRÉGATS FUSIONNABLES
+# But : produire les blocs "comptage" (1A/1B/1C, 6B/6E, 9A) sans jamais
+# avoir le df complet en mémoire. Chaque morceau passe par la même
+# normalisation, chaque bloc le réduit en agrégats (comptes, sommes,
+# sommes des carrés, tableaux croisés) qu'on additionne morceau après morceau.
+# ============================================================
+def lire_par_morceaux(
+    path: Path,
+    preparer: Callable[[pd.DataFrame], pd.DataFrame],
+    taille: int = 100_000,
+) -> Iterator[pd.DataFrame]:
+    """read_csv en morceaux de `taille` lignes, chacun normalisé par `preparer`."""
+    with pd.read_csv(path, chunksize=taille) as lecteur:
+        for morceau in lecteur:
+            yield preparer(morceau)
+
+
+def moments(valeurs: pd.Series, par: pd.Series | None = None) -> pd.DataFrame | pd.Series:
+    """n / somme / somme des carrés (éventuellement par groupe) : moyenne et variance fusionnables."""
+    v = valeurs.astype("float")
+    d = pd.DataFrame({"n": v.notna().astype("int64"), "somme": v.fillna(0), "somme_carres": v.fillna(0) ** 2})
+    if par is None:
+        return d.sum()
+    return d.groupby(par, observed=False).sum()
+
+
+def moyenne(m: pd.DataFrame | pd.Series) -> pd.Series | float:
+    return m["somme"] / m["n"]
+
+
+def variance(m: pd.DataFrame | pd.Series) -> pd.Series | float:
+    """Variance corrigée (ddof=1), comme pandas .var()."""
+    return (m["somme_carres"] - m["somme"] ** 2 / m["n"]) / (m["n"] - 1)
+
+
+class Agregats:
+    """
+    Agrégats d'un bloc sur un morceau ; `fusionner` additionne terme à terme :
+    - nombres : addition
+    - Series / DataFrame (comptes, moments, crosstabs) : addition alignée (modalités absentes = 0)
+    """
+
+    def __init__(self, **valeurs: Any) -> None:
+        self.valeurs: dict[str, Any] = dict(valeurs)
+
+    def __getitem__(self, nom: str) -> Any:
+        return self.valeurs[nom]
+
+    def fusionner(self, autre: Agregats | None) -> Agregats:
+        if autre is None:
+            return self
+        for nom, v in autre.valeurs.items():
+            if nom not in self.valeurs:
+                self.valeurs[nom] = v
+            elif isinstance(v, (pd.Series, pd.DataFrame)):
+                self.valeurs[nom] = self.valeurs[nom].add(v, fill_value=0)
+            else:
+                self.valeurs[nom] = self.valeurs[nom] + v
+        return self
+
+
+# ============================================================
+# DÉCODAGE PAR MODALITÉ
+# Les réponses d'enquête ont très peu de valeurs distinctes : on convertit
+# chaque modalité une seule fois, puis on diffuse via les codes (factorize).
+# Travail texte en O(modalités) au lieu de O(lignes).
+# ============================================================
+def decoder_par_modalite(series: pd.Series, conv: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Applique `conv` (Series -> Series de même longueur) aux seules valeurs distinctes
+    de `series` (NaN compris, traité comme une modalité) et diffuse le résultat.
+    """
+    codes, modalites = pd.factorize(series, use_na_sentinel=False)
+    valeurs = conv(pd.Series(modalites))
+    return valeurs.take(codes).set_axis(series.index).rename(series.name)
+
+
+def texte_ou_defaut(series: pd.Series, defaut: str = "Non spécifié") -> pd.Series:
+    """Réponse texte nettoyée (strip), manquante -> `defaut` ; par modalité distincte (objet ou catégorielle)."""
+    return decoder_par_modalite(series, lambda u: u.astype(object).fillna(defaut).astype(str).str.strip())
+
+
+def safe_to_numeric(series: pd.Series) -> pd.Series:
+    # gère virgules FR "7,5" (une conversion par modalité distincte) ; colonne déjà numérique : inchangée,
+    # sauf entier nullable (Int8 du plan de types compact) -> numpy : entier si complète, float64 sinon,
+    # et booléen (0/1, Oui/Non compactés) -> 0.0 / 1.0, manquant = NaN
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and series.dtype.kind in "iu":
+        return series.astype(np.float64 if series.hasnans else series.dtype.numpy_dtype)
+    if series.dtype.kind == "b":
+        return series.astype(np.float64)
+    if series.dtype.kind in "iuf":
+        return series
+    return decoder_par_modalite(
+        series, lambda u: pd.to_numeric(u.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+    )
@@ -0,0 +1,104 @@
+# ============================================================
+# IMPORTS PARESSEUX + BUDGET DE DÉMARRAGE
+# But : ne charger matplotlib / seaborn / plotly / scikit-learn que dans
+# les blocs qui s'en servent (un run --only 2A ne paie pas sklearn).
+# - `ModuleParesseux("matplotlib.pyplot")` : module chargé au 1er attribut lu
+# - rapport_imports() : équivalent de `python -X importtime`, agrégé,
+#   comparé à BUDGET_IMPORT_S (benchmarks/bench_imports.py)
+# ============================================================
+from __future__ import annotations
+
+import importlib
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+
+BUDGET_IMPORT_S = 0.6  # import de pipeline_visualisations (hors cache disque froid)
+
+
+class ModuleParesseux:
+    """
+    Remplaçant d'un module, importé au premier accès à un attribut (`plt.figure` …).
+    `apres` est appelé une fois, juste après l'import (ex: design system matplotlib).
+    """
+
+    def __init__(self, nom: str, apres: Callable[[], None] | None = None) -> None:
+        self._nom = nom
+        self._apres = apres
+        self._module: ModuleType | None = None
+
+    def _charger(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._nom)
+            if self._apres is not None:
+                self._apres()
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._charger(), attr)
+
+    def __repr__(self) -> str:
+        etat = "chargé" if self._module is not None else "non chargé"
+        return f"<module paresseux {self._nom} ({etat})>"
+
+
+# ------------------------------------------------------------
+# Rapport -X importtime
+# ------------------------------------------------------------
+_LIGNE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def analyser_importtime(sortie: str) -> list[dict[str, Any]]:
+    """Lignes de `-X importtime` -> [{module, propre_s, cumule_s, niveau}] (niveau 0 = import demandé)."""
+    modules = []
+    for ligne in sortie.splitlines():
+        m = _LIGNE.match(ligne)
+        if m:
+            modules.append({
+                "module": m.group(4),
+                "propre_s": int(m.group(1)) / 1e6,
+                "cumule_s": int(m.group(2)) / 1e6,
+                "niveau": (len(m.group(3)) - 1) // 2,
+            })
+    return modules
+
+
+def rapport_imports(module: str = "pipeline_visualisations", top: int = 15) -> dict[str, Any]:
+    """
+    Import de `module` dans un interpréteur neuf (python -X importtime) : durée totale, paquets de
+    premier niveau les plus coûteux (numpy, pandas, matplotlib …), comparaison au budget.
+    """
+    dossier = Path(__file__).resolve().parent
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(dossier), os.environ.get("PYTHONPATH", "")])}
+    env["MPLBACKEND"] = "Agg"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=dossier.parent, check=True,
+    )
+    modules = analyser_importtime(proc.stderr)
+    total = next((m["cumule_s"] for m in reversed(modules) if m["module"] == module), sum(m["propre_s"] for m in modules))
+
+    # coût par paquet racine (numpy, pandas …) : somme des temps propres de ses sous-modules
+    paquets: dict[str, float] = {}
+    for m in modules:
+        racine = m["module"].split(".")[0]
+        paquets[racine] = paquets.get(racine, 0.0) + m["propre_s"]
+    return {
+        "module": module,
+        "total_s": round(total, 4),
+        "budget_s": BUDGET_IMPORT_S,
+        "dans_budget": total <= BUDGET_IMPORT_S,
+        "modules_importes": len(modules),
+        "paquets": {p: round(s, 4) for p, s in sorted(paquets.items(), key=lambda kv: -kv[1])[:top]},
+        "plus_lents": [
+            {k: round(v, 4) if isinstance(v, float) else v for k, v in m.items()}
+            for m in sorted(modules, key=lambda m: -m["cumule_s"])[:top]
+        ],
+    }
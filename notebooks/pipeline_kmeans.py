@@ -0,0 +1,185 @@
+# ============================================================
+# SÉLECTION DU NOMBRE DE CLUSTERS (K-MEANS)
+# But : évaluer la grille de k en parallèle (un processus par k), arrêter
+# le balayage quand le critère ne progresse plus, et garder les modèles
+# ajustés : le k retenu réutilise son ajustement au lieu d'un second fit.
+# Moteur "minibatch" (MiniBatchKMeans) pour les grands effectifs ;
+# métriques de qualité au choix (voir pipeline_qualite.py).
+# ============================================================
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from pipeline_qualite import COLONNES, SENS, choisir_metrique, evaluer
+
+
+if TYPE_CHECKING:
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+
+SEUIL_MINIBATCH = 50_000  # moteur "auto" : MiniBatchKMeans au-delà de ce nombre de lignes
+
+
+def choisir_moteur(moteur: str, n: int) -> str:
+    if moteur == "auto":
+        return "minibatch" if n > SEUIL_MINIBATCH else "kmeans"
+    if moteur not in ("kmeans", "minibatch"):
+        raise ValueError(f"Moteur inconnu : {moteur} (auto, kmeans, minibatch)")
+    return moteur
+
+
+def creer_modele(moteur: str, k: int, random_state: int, n_init: int) -> KMeans | MiniBatchKMeans:
+    from sklearn.cluster import KMeans, MiniBatchKMeans  # import différé (coûteux) : seulement si un bloc fait du k-means
+
+    if moteur == "minibatch":
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=n_init, batch_size=4096)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+
+
+@dataclass
+class Essai:
+    """Un k de la grille : modèle ajusté + scores (colonne -> valeur) + durée."""
+    k: int
+    modele: Any
+    inertia: float
+    scores: dict[str, float]
+    duree_s: float
+
+
+def _ajuster(
+    X: np.ndarray, k: int, moteur: str, metriques: list[str], random_state: int, n_init: int, threads: int | None,
+) -> Essai:
+    from threadpoolctl import threadpool_limits
+
+    t0 = time.perf_counter()
+    # en parallèle : on borne les threads OpenMP/BLAS de chaque processus (pas de sur-souscription)
+    with threadpool_limits(limits=threads):
+        modele = creer_modele(moteur, k, random_state, n_init)
+        labels = modele.fit_predict(X)
+        scores: dict[str, float] = {}
+        for m in metriques:
+            scores.update(evaluer(X, labels, m, random_state=random_state))
+    return Essai(k, modele, float(modele.inertia_), scores, time.perf_counter() - t0)
+
+
+@dataclass
+class Balayage:
+    """Résultat du balayage : essais dans l'ordre de k, k retenu, k non évalués (arrêt anticipé)."""
+    moteur: str
+    metriques: list[str]
+    essais: list[Essai]
+    k_retenu: int
+    critere: str
+    non_evalues: list[int] = field(default_factory=list)
+    workers: int = 1
+    duree_s: float = 0.0
+
+    def modele(self, k: int | None = None) -> Any:
+        """Modèle ajusté du k demandé (par défaut le k retenu), sans nouveau fit."""
+        k = self.k_retenu if k is None else k
+        for e in self.essais:
+            if e.k == k:
+                return e.modele
+        raise KeyError(f"k={k} non évalué (non_evalues={self.non_evalues})")
+
+    def tableau(self) -> pd.DataFrame:
+        """k / inertia / une colonne par score (format de kmeans_elbow_silhouette.csv)."""
+        return pd.DataFrame([{"k": e.k, "inertia": e.inertia, **e.scores} for e in self.essais])
+
+    def resume(self) -> dict[str, Any]:
+        return {
+            "moteur": self.moteur,
+            "metriques": self.metriques,
+            "critere": self.critere,
+            "k_retenu": self.k_retenu,
+            "k_evalues": [e.k for e in self.essais],
+            "k_non_evalues": self.non_evalues,
+            "workers": self.workers,
+            "duree_totale_s": round(self.duree_s, 4),
+            "durees_s": {str(e.k): round(e.duree_s, 4) for e in self.essais},
+        }
+
+
+def _meilleur(essais: list[Essai], colonne: str) -> int:
+    """Position du meilleur essai selon `colonne` (sens de la métrique : Davies-Bouldin = plus petit)."""
+    return int(np.argmax([SENS[colonne] * e.scores[colonne] for e in essais]))
+
+
+def _arret(essais: list[Essai], patience: int | None, colonne: str) -> bool:
+    """Vrai si le critère n'a pas dépassé son meilleur niveau depuis `patience` k consécutifs."""
+    if patience is None or len(essais) <= patience:
+        return False
+    return _meilleur(essais, colonne) < len(essais) - patience
+
+
+def balayer_k(
+    X: np.ndarray,
+    ks: range | list[int],
+    *,
+    random_state: int,
+    n_init: int = 10,
+    moteur: str = "auto",
+    metriques: tuple[str, ...] | list[str] = ("silhouette",),
+    k_fixe: int | None = None,
+    patience: int | None = None,
+    workers: int | None = None,
+) -> Balayage:
+    """
+    Ajuste un modèle par k de `ks` (en parallèle sur `workers` processus ; None = un par cœur, 1 = série).
+    - metriques : "silhouette" (exacte, par tuiles), "silhouette_echantillon" (+ IC), "calinski_harabasz",
+      "davies_bouldin" ou "auto" ; la 1ère sert de critère (choix de k, arrêt anticipé)
+    - k_fixe : k imposé (choix métier) ; sinon meilleur k selon le critère
+    - patience : arrêt anticipé quand le critère ne progresse plus depuis `patience` k (k restants annulés)
+    Chaque k garde le même random_state / n_init qu'un fit isolé : mêmes résultats qu'en série.
+    """
+    ks = list(ks)
+    moteur = choisir_moteur(moteur, len(X))
+    metriques = list(dict.fromkeys(choisir_metrique(m, len(X)) for m in metriques))
+    colonne = COLONNES[metriques[0]]
+    if workers is None:
+        workers = min(len(ks), os.cpu_count() or 1)
+    workers = max(1, min(workers, len(ks)))
+    t0 = time.perf_counter()
+
+    essais: list[Essai] = []
+    if workers == 1:
+        for k in ks:
+            essais.append(_ajuster(X, k, moteur, metriques, random_state, n_init, None))
+            if _arret(essais, patience, colonne):
+                break
+    else:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_ajuster, X, k, moteur, metriques, random_state, n_init, threads) for k in ks]
+            for fut in futures:
+                essais.append(fut.result())
+                if _arret(essais, patience, colonne):
+                    for reste in futures:
+                        reste.cancel()  # les k pas encore démarrés ne tournent pas
+                    break
+
+    if k_fixe is not None:
+        if k_fixe not in [e.k for e in essais]:
+            essais.append(_ajuster(X, k_fixe, moteur, metriques, random_state, n_init, None))
+            essais.sort(key=lambda e: e.k)
+        k_retenu, critere = k_fixe, "fixe"
+    else:
+        k_retenu, critere = essais[_meilleur(essais, colonne)].k, colonne
+
+    return Balayage(
+        moteur=moteur,
+        metriques=metriques,
+        essais=essais,
+        k_retenu=k_retenu,
+        critere=critere,
+        non_evalues=[k for k in ks if k not in {e.k for e in essais}],
+        workers=workers,
+        duree_s=time.perf_counter() - t0,
+    )
@@ -0,0 +1,138 @@
+# ============================================================
+# MATRICES DE FEATURES PARTAGÉES (K-MEANS, PCA, ARBRE …)
+# But : construire une seule fois la matrice X d'un jeu de features
+# (conversion numérique, imputation par médianes, standardisation) sous
+# forme de tableau contigu float64/float32, et la servir à tous les
+# modèles. La PCA de 4C projette exactement la matrice du clustering.
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from pipeline_donnees import safe_to_numeric
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler
+
+
+SEUIL_PCA_RANDOMISEE = 50_000       # au-delà : solveur SVD randomisé
+SEUIL_PCA_INCREMENTALE = 1_000_000  # au-delà : IncrementalPCA par lots (mémoire bornée)
+
+
+@dataclass
+class MatriceFeatures:
+    """
+    X prêt pour les modèles (C-contigu, `dtype` demandé) + ce qu'il faut pour le reproduire :
+    `brut` = valeurs imputées en unités d'origine (float64), `medianes` / `scaler` (None si non demandés).
+    Ligne i de X = ligne `index[i]` du df source.
+    """
+    X: np.ndarray
+    brut: np.ndarray
+    index: pd.Index
+    features: list[str]
+    medianes: pd.Series | None = None
+    scaler: StandardScaler | None = None
+    types: dict[str, Any] | None = None  # dtypes d'origine (ex: int64 pour l'âge) restitués par frame()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def frame(self) -> pd.DataFrame:
+        """Valeurs imputées (unités d'origine) en DataFrame, comme `d` dans 4A."""
+        d = pd.DataFrame(self.brut, index=self.index, columns=self.features)
+        return d.astype(self.types) if self.types else d
+
+    def empreinte(self) -> str:
+        """Hash du contenu (X, index, features) : clé de cache stable après un aller-retour par le pickle."""
+        h = hashlib.sha256(repr((self.features, str(self.X.dtype), self.X.shape)).encode("utf-8"))
+        h.update(np.ascontiguousarray(self.X).tobytes())
+        h.update(pd.util.hash_pandas_object(self.index.to_series(), index=False).values.tobytes())
+        return h.hexdigest()
+
+
+def construire_matrice(
+    df: pd.DataFrame,
+    features: list[str],
+    *,
+    imputer: bool = True,
+    standardiser: bool = True,
+    dtype: Any = np.float64,
+) -> MatriceFeatures:
+    """
+    Conversion numérique (safe_to_numeric), imputation par la médiane de chaque feature (option),
+    suppression des lignes encore incomplètes, standardisation (option, StandardScaler).
+    """
+    d = pd.DataFrame({c: safe_to_numeric(df[c]) for c in features}, index=df.index)
+    medianes = d.median(numeric_only=True) if imputer else None
+    if imputer:
+        d = d.fillna(medianes)
+    d = d.dropna()
+
+    brut = d.to_numpy(dtype=np.float64)
+    scaler = None
+    X = brut
+    if standardiser and len(d):
+        from sklearn.preprocessing import StandardScaler  # import différé : blocs 4A et suivants seulement
+
+        scaler = StandardScaler()
+        X = scaler.fit_transform(d)
+    return MatriceFeatures(
+        X=np.ascontiguousarray(X, dtype=dtype), brut=brut, index=d.index, features=list(features),
+        medianes=medianes, scaler=scaler, types=d.dtypes.to_dict(),
+    )
+
+
+class MagasinMatrices:
+    """
+    Matrices mémorisées par (contenu des colonnes lues, features, options) :
+    deux blocs qui demandent la même matrice sur les mêmes données partagent le même X.
+    """
+
+    def __init__(self) -> None:
+        self._memo: dict[tuple, MatriceFeatures] = {}
+
+    @staticmethod
+    def _cle(df: pd.DataFrame, features: list[str], *options: Any) -> tuple:
+        h = hashlib.sha256(pd.util.hash_pandas_object(df[features], index=True).values.tobytes()).hexdigest()
+        return (h, tuple(features), *options)
+
+    def obtenir(
+        self,
+        df: pd.DataFrame,
+        features: list[str],
+        *,
+        imputer: bool = True,
+        standardiser: bool = True,
+        dtype: Any = np.float64,
+    ) -> MatriceFeatures:
+        cle = self._cle(df, features, imputer, standardiser, np.dtype(dtype).str)
+        if cle not in self._memo:
+            self._memo[cle] = construire_matrice(
+                df, features, imputer=imputer, standardiser=standardiser, dtype=dtype,
+            )
+        return self._memo[cle]
+
+    def vider(self) -> None:
+        self._memo.clear()
+
+
+def projeter_pca(X: np.ndarray, n_components: int, random_state: int) -> tuple[Any, np.ndarray]:
+    """
+    PCA adaptée à la taille : SVD complète (petit n), randomisée (grand n),
+    IncrementalPCA par lots au-delà (X peut être une mémoire mappée). Renvoie (modèle, projection).
+    """
+    from sklearn.decomposition import PCA, IncrementalPCA
+
+    n = len(X)
+    if n > SEUIL_PCA_INCREMENTALE:
+        pca = IncrementalPCA(n_components=n_components, batch_size=max(10 * X.shape[1], 100_000))
+    elif n > SEUIL_PCA_RANDOMISEE:
+        pca = PCA(n_components=n_components, svd_solver="randomized", random_state=random_state)
+    else:
+        pca = PCA(n_components=n_components, random_state=random_state)
+    return pca, pca.fit_transform(X)
@@ -0,0 +1,195 @@
+# ============================================================
+# ENCODAGE MULTI-HOT DES QUESTIONS À CHOIX MULTIPLES
+# But : découper "A;B;C" une seule fois (par combinaison distincte) et
+# garder une matrice indicatrice creuse (CSR, lignes × modalités) + le
+# vocabulaire. Comptes, comptes par groupe et co-occurrences deviennent des
+# produits de matrices au lieu de split/explode/get_dummies dans chaque bloc.
+# ============================================================
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+@dataclass(frozen=True)
+class MultiHot:
+    """Réponses multi-choix : matrice 0/1 (CSR, int8) alignée sur `index`, colonnes = `vocabulaire` (trié)."""
+    matrice: sparse.csr_matrix
+    vocabulaire: list[str]
+    index: pd.Index
+
+    @property
+    def n_choix(self) -> np.ndarray:
+        """Nombre de modalités cochées par ligne (0 = manquant / vide)."""
+        return np.diff(self.matrice.indptr)
+
+    def _x(self) -> sparse.csr_matrix:
+        return self.matrice.astype(np.int64)
+
+    def sous_ensemble(self, index: pd.Index) -> MultiHot:
+        """Lignes de `index` ; modalités absentes de ce sous-ensemble retirées (comme get_dummies)."""
+        pos = self.index.get_indexer(index)
+        if (pos < 0).any():
+            raise KeyError("Lignes absentes de l'encodage multi-choix")
+        m = self.matrice[pos]
+        garde = np.flatnonzero(np.asarray(m.sum(axis=0)).ravel() > 0)
+        return MultiHot(m[:, garde].tocsr(), [self.vocabulaire[j] for j in garde], pd.Index(index))
+
+    def avec_vide(self, libelle: str) -> MultiHot:
+        """Ajoute une modalité `libelle` cochée par les lignes sans aucune réponse."""
+        vides = (self.n_choix == 0).astype(np.int8)
+        if not vides.any():
+            return self
+        m = sparse.hstack([self.matrice, sparse.csr_matrix(vides[:, None])], format="csr")
+        return MultiHot(m, self.vocabulaire + [libelle], self.index)
+
+    def top_n(self, n: int, autre: str) -> MultiHot:
+        """
+        Garde les `n` modalités les plus cochées ; `autre` = indicatrice "au moins une des autres modalités"
+        (0/1 comme le reste de la matrice, même si la ligne en cochait plusieurs).
+        """
+        comptes = np.asarray(self._x().sum(axis=0)).ravel()
+        if len(comptes) <= n:
+            return self
+        garde = np.sort(np.argsort(-comptes, kind="stable")[:n])
+        reste = np.setdiff1d(np.arange(len(comptes)), garde)
+        autre_coche = (np.asarray(self.matrice[:, reste].sum(axis=1)).ravel() > 0).astype(np.int8)
+        m = sparse.hstack([self.matrice[:, garde], sparse.csr_matrix(autre_coche[:, None])], format="csr")
+        return MultiHot(m, [self.vocabulaire[j] for j in garde] + [autre], self.index)
+
+    def comptes(self, vide: str | None = None) -> pd.Series:
+        """Nombre de lignes par modalité (+ lignes sans réponse sous le libellé `vide`)."""
+        c = pd.Series(np.asarray(self._x().sum(axis=0)).ravel(), index=self.vocabulaire)
+        n_vide = int((self.n_choix == 0).sum())
+        if vide is not None and n_vide:
+            c[vide] = c.get(vide, 0) + n_vide
+        return c
+
+    def moments(self, valeurs: pd.Series) -> pd.DataFrame:
+        """n / somme / somme des carrés de `valeurs` par modalité (Xᵀ1, Xᵀv, Xᵀv²)."""
+        v = valeurs.reindex(self.index).astype("float").fillna(0).to_numpy()
+        xt = self._x().T
+        m = pd.DataFrame(
+            {"n": xt @ np.ones(len(v), dtype=np.int64), "somme": xt @ v, "somme_carres": xt @ (v ** 2)},
+            index=self.vocabulaire,
+        )
+        return m[m["n"] > 0]
+
+    def par_groupe(self, groupes: pd.Series) -> pd.DataFrame:
+        """Nombre de lignes cochant chaque modalité, par groupe (Gᵀ X) ; groupes triés comme groupby."""
+        g = groupes.reindex(self.index)
+        codes, niveaux = pd.factorize(g, sort=True)
+        ok = codes >= 0
+        G = sparse.csr_matrix(
+            (np.ones(ok.sum(), dtype=np.int64), (codes[ok], np.flatnonzero(ok))),
+            shape=(len(niveaux), len(codes)),
+        )
+        return pd.DataFrame(
+            (G @ self._x()).toarray(), index=pd.Index(niveaux, name=groupes.name), columns=self.vocabulaire,
+        )
+
+    def aretes(self, mesure: str = "phi", seuil: float | None = None, top_k: int | None = None) -> pd.DataFrame:
+        """
+        Graphe de co-occurrence sans matrice dense : seules les paires (i < j) cochées ensemble
+        au moins une fois (triangle supérieur creux de XᵀX) sont évaluées.
+        mesure : "phi" (corrélation des indicatrices), "lift" (c·N / nᵢnⱼ), "jaccard" (c / (nᵢ+nⱼ-c)).
+        Garde les paires avec mesure > seuil, puis les top_k plus fortes.
+        Colonnes : source, cible (positions dans le vocabulaire), cooc, poids.
+        """
+        x = self._x()
+        n = x.shape[0]
+        c = sparse.triu(x.T @ x, k=1).tocoo()
+        ni = np.asarray(x.sum(axis=0)).ravel().astype(float)
+        i, j, cij = c.row, c.col, c.data.astype(float)
+
+        if mesure == "phi":
+            # corrélation de Pearson des indicatrices (coefficient phi), paires non nulles seulement
+            p = ni / n
+            sd = np.sqrt(p * (1 - p))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                poids = (cij / n - p[i] * p[j]) / (sd[i] * sd[j])
+        elif mesure == "lift":
+            poids = cij * n / (ni[i] * ni[j])
+        elif mesure == "jaccard":
+            poids = cij / (ni[i] + ni[j] - cij)
+        else:
+            raise ValueError(f"Mesure inconnue : {mesure} (phi, lift, jaccard)")
+
+        garde = np.isfinite(poids)
+        if seuil is not None:
+            garde &= poids > seuil
+        a = pd.DataFrame({"source": i[garde], "cible": j[garde], "cooc": c.data[garde], "poids": poids[garde]})
+        if top_k is not None:
+            a = a.nlargest(top_k, "poids", keep="first")
+        return a.sort_values(["source", "cible"], ignore_index=True)
+
+
+def encoder_simple(series: pd.Series) -> MultiHot:
+    """Question à choix unique -> MultiHot one-hot (codes de factorize, modalités triées ; NaN = aucune)."""
+    codes, modalites = pd.factorize(series, sort=True, use_na_sentinel=True)
+    ok = codes >= 0
+    m = sparse.csr_matrix(
+        (np.ones(ok.sum(), dtype=np.int8), (np.flatnonzero(ok), codes[ok])),
+        shape=(len(codes), len(modalites)),
+    )
+    return MultiHot(m, [str(x) for x in modalites], series.index)
+
+
+def flux_sankey(etapes: list[MultiHot], pondere: bool = True) -> tuple[list[str], list[int], list[int], list[float]]:
+    """
+    Liens d'un Sankey à N étapes (chaque étape = MultiHot aligné sur les mêmes lignes, ≥ 1 choix par ligne).
+    Un répondant = toutes les combinaisons de ses choix (un chemin par combinaison) :
+    - pondere=True  : chaque répondant pèse 1 au total (chemin = 1 / Π k_étape)
+    - pondere=False : chaque chemin pèse 1 (équivalent des explode successifs)
+    Flux entre deux étapes consécutives = Aᵀ diag(v) B, sans jamais matérialiser les chemins.
+    Nœuds = (étape, modalité) : identifiants = décalage de l'étape + code de la modalité.
+    """
+    x = [e.matrice.astype(np.float64) for e in etapes]
+    k = [np.asarray(m.sum(axis=1)).ravel() for m in x]
+    if any((ki == 0).any() for ki in k):
+        raise ValueError("Chaque ligne doit avoir au moins un choix par étape (voir MultiHot.avec_vide)")
+    produit_k = np.prod(k, axis=0)
+
+    labels: list[str] = []
+    decalages = []
+    for e in etapes:
+        decalages.append(len(labels))
+        labels += e.vocabulaire
+
+    sources: list[int] = []
+    targets: list[int] = []
+    values: list[float] = []
+    for s in range(len(etapes) - 1):
+        v = 1.0 / (k[s] * k[s + 1])
+        if not pondere:
+            v = v * produit_k
+        flux = (x[s].multiply(v[:, None]).T @ x[s + 1]).tocoo()
+        sources += (flux.row + decalages[s]).tolist()
+        targets += (flux.col + decalages[s + 1]).tolist()
+        values += flux.data.tolist()
+    return labels, sources, targets, values
+
+
+def encoder_multi(series: pd.Series, sep: str = ";") -> MultiHot:
+    """
+    "A;B;C" -> MultiHot. Le découpage ne se fait qu'une fois par combinaison distincte
+    (factorize), puis on diffuse les lignes de la petite matrice combinaisons × modalités.
+    Modalités nettoyées (strip), vides ignorées, doublons dans une réponse comptés une fois.
+    """
+    codes, combinaisons = pd.factorize(series, use_na_sentinel=True)
+    listes = [sorted({t.strip() for t in str(c).split(sep) if t.strip()}) for c in combinaisons]
+    vocabulaire = sorted({t for lst in listes for t in lst})
+    position = {t: j for j, t in enumerate(vocabulaire)}
+
+    # combinaisons × modalités, + une ligne vide (code -1 = NaN)
+    lignes = np.repeat(np.arange(len(listes)), [len(lst) for lst in listes])
+    colonnes = np.fromiter((position[t] for lst in listes for t in lst), dtype=np.int64, count=len(lignes))
+    u = sparse.csr_matrix(
+        (np.ones(len(lignes), dtype=np.int8), (lignes, colonnes)),
+        shape=(len(listes) + 1, len(vocabulaire)),
+    )
+    codes = np.where(codes < 0, len(listes), codes)
+    return MultiHot(u[codes], vocabulaire, series.index)
@@ -0,0 +1,322 @@
+# ============================================================
+# MODÈLE PERSONAS PERSISTÉ + SCORING DE NOUVEAUX RÉPONDANTS
+# But : garder ce que 4A apprend (médianes d'imputation, standardisation,
+# liste des features, centroïdes K-Means) dans un artefact JSON versionné,
+# et attribuer un persona à de nouvelles lignes sans réajuster :
+# imputation + standardisation + centroïde le plus proche, vectorisé.
+# Les ids de clusters restent stables d'un réajustement à l'autre
+# (appariement des nouveaux centroïdes avec ceux du modèle précédent).
+# Mode incrémental : les nouvelles réponses mettent à jour standardisation
+# et centroïdes sans réajustement complet (voir EtatIncremental).
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from pipeline_artefacts import ARTEFACTS
+from pipeline_donnees import safe_to_numeric
+
+
+VERSION_FORMAT = 1
+MODELE_PERSONAS_PATH = Path("reports") / "modele_personas.json"
+ETAT_INCREMENTAL_PATH = Path("reports") / "personas_incremental.json"
+
+
+@dataclass
+class ModelePersonas:
+    """
+    Centroïdes dans l'espace standardisé : ligne i = cluster i.
+    `moyennes` / `echelles` = StandardScaler (mean_, scale_) ; `medianes` = imputation de 4A.
+    """
+    features: list[str]
+    medianes: list[float]
+    moyennes: list[float]
+    echelles: list[float]
+    centroides: list[list[float]]
+    meta: dict[str, Any] = field(default_factory=dict)
+    version_format: int = VERSION_FORMAT
+
+    @classmethod
+    def depuis_ajustement(
+        cls, features: list[str], medianes: pd.Series, scaler: Any, kmeans: Any, **meta: Any,
+    ) -> ModelePersonas:
+        return cls(
+            features=list(features),
+            medianes=[float(medianes[c]) for c in features],
+            moyennes=[float(v) for v in scaler.mean_],
+            echelles=[float(v) for v in scaler.scale_],
+            centroides=np.asarray(kmeans.cluster_centers_, dtype=float).tolist(),
+            meta=dict(meta),
+        )
+
+    @property
+    def k(self) -> int:
+        return len(self.centroides)
+
+    @property
+    def identifiant(self) -> str:
+        """Hash du contenu (hors méta) : change dès que le modèle change."""
+        contenu = {k: v for k, v in asdict(self).items() if k != "meta"}
+        return hashlib.sha256(json.dumps(contenu, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def centroides_bruts(self) -> np.ndarray:
+        """Centroïdes dans les unités d'origine (comparables entre deux ajustements)."""
+        return np.asarray(self.centroides) * np.asarray(self.echelles) + np.asarray(self.moyennes)
+
+    def imputer(self, df: pd.DataFrame) -> np.ndarray:
+        """Même préparation que 4A : conversion numérique puis imputation par les médianes apprises (unités d'origine)."""
+        X = np.empty((len(df), len(self.features)))
+        for j, c in enumerate(self.features):
+            col = safe_to_numeric(df[c]).to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan)
+            X[:, j] = np.where(np.isnan(col), self.medianes[j], col)
+        return X
+
+    def matrice(self, df: pd.DataFrame) -> np.ndarray:
+        """Lignes imputées puis standardisées (espace des centroïdes)."""
+        return (self.imputer(df) - np.asarray(self.moyennes)) / np.asarray(self.echelles)
+
+    def affecter(self, Z: np.ndarray) -> np.ndarray:
+        """Cluster du centroïde le plus proche pour des lignes déjà standardisées."""
+        C = np.asarray(self.centroides)
+        d2 = (C ** 2).sum(axis=1)[None, :] - 2 * (Z @ C.T)  # ‖x‖² constant par ligne : inutile pour l'argmin
+        return d2.argmin(axis=1)
+
+    def predire(self, df: pd.DataFrame) -> pd.Series:
+        """Cluster du centroïde le plus proche (distance euclidienne, comme KMeans.predict)."""
+        return pd.Series(self.affecter(self.matrice(df)), index=df.index, name="Cluster")
+
+    def reordonner(self, ordre: np.ndarray) -> ModelePersonas:
+        """Nouveau modèle dont le cluster i est l'ancien cluster ordre[i]."""
+        centroides = np.asarray(self.centroides)[ordre].tolist()
+        return ModelePersonas(self.features, self.medianes, self.moyennes, self.echelles, centroides,
+                              dict(self.meta), self.version_format)
+
+    def sauver(self, path: Path) -> None:
+        path = Path(path)
+        contenu = asdict(self)
+        contenu["identifiant"] = self.identifiant
+        contenu["meta"].setdefault("cree_le", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        tmp = path.with_name(path.name + ".tmp")
+        with ARTEFACTS.ecriture(path):
+            tmp.write_text(json.dumps(contenu, ensure_ascii=False, indent=1), encoding="utf-8")
+            tmp.replace(path)
+
+    @classmethod
+    def charger(cls, path: Path) -> ModelePersonas:
+        contenu = json.loads(Path(path).read_text(encoding="utf-8"))
+        if contenu.get("version_format") != VERSION_FORMAT:
+            raise ValueError(f"Format de modèle non supporté : {contenu.get('version_format')} (attendu {VERSION_FORMAT})")
+        contenu.pop("identifiant", None)
+        return cls(**contenu)
+
+
+def apparier_clusters(nouveau: ModelePersonas, precedent: ModelePersonas | None) -> np.ndarray:
+    """
+    Permutation `ordre` telle que nouveau.reordonner(ordre) garde les ids du modèle précédent :
+    appariement des centroïdes (unités d'origine) par coût minimal (algorithme hongrois).
+    Identité si pas de modèle précédent comparable (autres features / autre k).
+    """
+    if precedent is None or precedent.features != nouveau.features or precedent.k != nouveau.k:
+        return np.arange(nouveau.k)
+    from scipy.optimize import linear_sum_assignment
+
+    a, b = precedent.centroides_bruts(), nouveau.centroides_bruts()
+    cout = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+    _, ordre = linear_sum_assignment(cout)
+    return ordre
+
+
+def charger_si_existe(path: Path) -> ModelePersonas | None:
+    try:
+        return ModelePersonas.charger(path)
+    except (FileNotFoundError, ValueError, TypeError, KeyError):
+        return None
+
+
+@lru_cache(maxsize=4)
+def _modele_en_cache(path: str, mtime_ns: int) -> ModelePersonas:
+    return ModelePersonas.charger(Path(path))
+
+
+def score_respondents(df: pd.DataFrame, path: Path = MODELE_PERSONAS_PATH) -> pd.Series:
+    """
+    Persona (id de cluster) de chaque ligne de `df` (colonnes aux noms canoniques, cf. rename_robuste),
+    sans réajustement. Le modèle est relu seulement si le fichier a changé.
+    """
+    path = Path(path)
+    modele = _modele_en_cache(str(path.resolve()), path.stat().st_mtime_ns)
+    return modele.predire(df)
+
+
+# ------------------------------------------------------------
+# Mode incrémental (réponses arrivant au fil de l'eau)
+# ------------------------------------------------------------
+def empreintes_lignes(df: pd.DataFrame, colonnes: list[str]) -> np.ndarray:
+    """
+    Identité de chaque réponse (uint64) : hash de la ligne normalisée sur `colonnes`, indépendant des
+    types (objet / category, int / Int8 / float64) ; colonne absente du lot = valeur manquante.
+    """
+    canon = {}
+    for c in colonnes:
+        s = df[c] if c in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+        canon[c] = s.astype("float64") if s.dtype.kind in "iufb" else s.astype("string")
+    return pd.util.hash_pandas_object(pd.DataFrame(canon, index=df.index), index=False).to_numpy()
+
+
+IDENTITES_MAX = 100_000  # clés / empreintes retenues par l'état (les plus récentes) ; au-delà, seul le filigrane couvre
+
+
+@dataclass
+class EtatIncremental:
+    """
+    Statistiques suffisantes du modèle, additives lot après lot (unités d'origine, lignes imputées) :
+    - n / somme / somme_carres par feature -> moyenne et écart-type de la standardisation (ddof=0)
+    - sommes / effectifs par cluster -> centroïdes = moyenne des lignes affectées à chaque cluster
+    Règle de mise à jour du mini-batch K-Means (pas 1/effectif par centre) : affecter le lot avec le
+    modèle courant, puis ajouter ses sommes. Les centres sont déplacés, jamais renumérotés : ids stables.
+    Les médianes d'imputation restent celles du dernier ajustement complet (4A).
+    """
+    features: list[str]
+    medianes: list[float]
+    n: int
+    somme: list[float]
+    somme_carres: list[float]
+    sommes: list[list[float]]
+    effectifs: list[int]
+    filigrane: str | None = None  # dernière "Date de saisie" intégrée (ISO)
+    # identité des réponses déjà intégrées (IDENTITES_MAX plus récentes) : clé du répondant si l'export
+    # en a une, sinon empreinte des réponses (empreintes_lignes) pour les lignes sans date lisible
+    colonne_cle: str | None = None
+    cles: list[str] | None = None
+    colonnes_empreinte: list[str] | None = None
+    empreintes: list[int] | None = None
+    meta: dict[str, Any] = field(default_factory=dict)
+    version_format: int = VERSION_FORMAT
+
+    @classmethod
+    def initialiser(
+        cls, modele: ModelePersonas, X: np.ndarray, labels: np.ndarray, filigrane: str | None = None,
+        lignes: pd.DataFrame | None = None, colonnes_empreinte: list[str] | None = None,
+        colonne_cle: str | None = None,
+    ) -> EtatIncremental:
+        """
+        État de départ après un ajustement complet : X = lignes imputées (unités d'origine), labels = ids stables,
+        `lignes` = réponses normalisées correspondantes (empreintes sur `colonnes_empreinte`, toutes par défaut ;
+        clés lues dans `colonne_cle` si elle existe).
+        """
+        etat = cls(
+            features=list(modele.features), medianes=list(modele.medianes), n=0,
+            somme=[0.0] * len(modele.features), somme_carres=[0.0] * len(modele.features),
+            sommes=[[0.0] * len(modele.features) for _ in range(modele.k)], effectifs=[0] * modele.k,
+            filigrane=filigrane, meta=dict(modele.meta),
+        )
+        etat._ajouter(X, labels)
+        if lignes is not None:
+            if colonne_cle is not None and colonne_cle in lignes.columns:
+                etat.colonne_cle, etat.cles = colonne_cle, []
+            etat.colonnes_empreinte = [c for c in (lignes.columns if colonnes_empreinte is None else colonnes_empreinte)
+                                       if c != etat.colonne_cle]
+            etat.empreintes = []
+            etat._retenir(lignes)
+        return etat
+
+    def _retenir(self, lignes: pd.DataFrame) -> None:
+        """Ajoute les identités des lignes intégrées ; seules les IDENTITES_MAX plus récentes sont gardées."""
+        if self.cles is not None and self.colonne_cle in lignes.columns:
+            cles = lignes[self.colonne_cle].dropna().astype(str).tolist()
+            self.cles = [*self.cles, *cles][-IDENTITES_MAX:]
+        if self.empreintes is not None:
+            empreintes = empreintes_lignes(lignes, self.colonnes_empreinte).tolist()
+            self.empreintes = [*self.empreintes, *empreintes][-IDENTITES_MAX:]
+
+    def trier_lot(self, df: pd.DataFrame, dates: pd.Series | None = None) -> pd.DataFrame:
+        """
+        Pour chaque ligne d'un lot : règle d'identité appliquée et `nouvelle` (pas encore intégrée).
+        - "cle"       : clé du répondant renseignée -> nouvelle si clé inconnue (homonymes de réponses distincts)
+        - "date"      : sinon, date lisible et filigrane -> nouvelle si postérieure au filigrane
+        - "empreinte" : sinon, empreinte des réponses -> nouvelle si inconnue
+        - "aucune"    : état sans empreintes (antérieur à leur introduction) -> écartée
+        """
+        regle = pd.Series("aucune", index=df.index, dtype=object)
+        nouvelle = pd.Series(False, index=df.index)
+        reste = pd.Series(True, index=df.index)
+        if self.cles is not None and self.colonne_cle in df.columns:
+            cles = df[self.colonne_cle]
+            avec = cles.notna()
+            regle[avec] = "cle"
+            nouvelle[avec] = ~cles[avec].astype(str).isin(set(self.cles)).to_numpy()
+            reste &= ~avec
+        if dates is not None and self.filigrane is not None:
+            avec = reste & dates.notna()
+            regle[avec] = "date"
+            nouvelle[avec] = (dates[avec] > pd.Timestamp(self.filigrane)).to_numpy()
+            reste &= ~avec
+        if self.empreintes is not None and reste.any():
+            connues = np.isin(empreintes_lignes(df[reste], self.colonnes_empreinte),
+                              np.asarray(self.empreintes, dtype=np.uint64))
+            regle[reste] = "empreinte"
+            nouvelle[reste] = ~connues
+        return pd.DataFrame({"regle": regle, "nouvelle": nouvelle})
+
+    def _ajouter(self, X: np.ndarray, labels: np.ndarray) -> None:
+        k = len(self.effectifs)
+        self.n += len(X)
+        self.somme = (np.asarray(self.somme) + X.sum(axis=0)).tolist()
+        self.somme_carres = (np.asarray(self.somme_carres) + (X ** 2).sum(axis=0)).tolist()
+        par_cluster = np.zeros((k, X.shape[1]))
+        np.add.at(par_cluster, labels, X)
+        self.sommes = (np.asarray(self.sommes) + par_cluster).tolist()
+        self.effectifs = (np.asarray(self.effectifs) + np.bincount(labels, minlength=k)).tolist()
+
+    def moyennes_par_cluster(self) -> pd.DataFrame:
+        """Moyenne des features par cluster (= centroïdes en unités d'origine), format personas_moyennes_par_cluster."""
+        return pd.DataFrame(
+            np.asarray(self.sommes) / np.asarray(self.effectifs)[:, None],
+            index=pd.Index(range(len(self.effectifs)), name="Cluster"), columns=self.features,
+        )
+
+    def modele(self) -> ModelePersonas:
+        moyennes = np.asarray(self.somme) / self.n
+        variances = np.maximum(np.asarray(self.somme_carres) / self.n - moyennes ** 2, 0)
+        echelles = np.sqrt(variances)
+        echelles[echelles == 0] = 1.0  # comme StandardScaler
+        centroides = (self.moyennes_par_cluster().to_numpy() - moyennes) / echelles
+        return ModelePersonas(
+            self.features, self.medianes, moyennes.tolist(), echelles.tolist(), centroides.tolist(),
+            {**self.meta, "n_lignes": self.n, "incremental": True},
+        )
+
+    def mettre_a_jour(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Intègre un lot de nouvelles réponses ; renvoie leur cluster (affecté avec le modèle d'avant le lot).
+        Les identités du lot rejoignent l'état : une relance du même fichier ne les recompte pas.
+        """
+        modele = self.modele()
+        X = modele.imputer(df)
+        labels = modele.affecter((X - np.asarray(modele.moyennes)) / np.asarray(modele.echelles))
+        self._ajouter(X, labels)
+        self._retenir(df)
+        return pd.Series(labels, index=df.index, name="Cluster")
+
+    def sauver(self, path: Path) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with ARTEFACTS.ecriture(path):
+            tmp.write_text(json.dumps(asdict(self), ensure_ascii=False, indent=1), encoding="utf-8")
+            tmp.replace(path)
+
+    @classmethod
+    def charger(cls, path: Path) -> EtatIncremental:
+        contenu = json.loads(Path(path).read_text(encoding="utf-8"))
+        if contenu.get("version_format") != VERSION_FORMAT:
+            raise ValueError(f"Format d'état non supporté : {contenu.get('version_format')} (attendu {VERSION_FORMAT})")
+        return cls(**contenu)
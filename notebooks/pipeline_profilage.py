@@ -0,0 +1,207 @@
+# ============================================================
+# PROFILAGE PAR BLOC — TEMPS, MÉMOIRE, LIGNES, ÉCRITURES
+# But : savoir quel bloc est lent ou gourmand en mémoire. Le runner du DAG
+# entoure chaque bloc d'une mesure :
+# - niveau "leger" (défaut, coût négligeable) : durée, temps CPU, lignes
+#   des entrées, hausse du pic RSS, fichiers écrits (registre des artefacts)
+# - niveau "memoire" (défaut si CI est défini) : + pic tracemalloc du bloc
+# - cProfile en option, par bloc : .prof + piles pour flamegraph
+# Exports : reports/profil.json + reports/profil.folded (format "piles
+# repliées" : flamegraph.pl, speedscope, inferno).
+# ============================================================
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from pipeline_artefacts import ARTEFACTS, RegistreArtefacts, ecrire_texte
+
+try:
+    import resource
+except ImportError:  # Windows : pas de getrusage, pic RSS non mesuré
+    resource = None
+
+
+NIVEAUX = ("leger", "memoire")
+
+
+def niveau_par_defaut() -> str:
+    """Exécutions de type CI (variable CI définie) : mémoire mesurée ; sinon niveau léger."""
+    return "memoire" if os.environ.get("CI") else "leger"
+
+
+def _rss_max_mo() -> float:
+    """Pic RSS du processus (Mo) ; 0 là où `resource` n'existe pas (Windows)."""
+    if resource is None:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Ko sous Linux
+
+
+def _lignes(entrees: dict[str, Any]) -> dict[str, int]:
+    """Taille des entrées tabulaires (DataFrame, matrice …) ; dictionnaires (multichoix) ignorés."""
+    return {
+        nom: len(v) for nom, v in entrees.items()
+        if v is not None and not isinstance(v, dict) and hasattr(v, "__len__")
+    }
+
+
+class Profileur:
+    """
+    Mesures par bloc, cumulées si un bloc est mesuré plusieurs fois (mode flux : un passage par morceau).
+    `cprofile` : blocs profilés par cProfile ("*" = tous).
+    """
+
+    def __init__(self, niveau: str = "leger", cprofile: set[str] | None = None) -> None:
+        if niveau not in NIVEAUX:
+            raise ValueError(f"Niveau de profilage inconnu : {niveau} ({', '.join(NIVEAUX)})")
+        self.niveau = niveau
+        self.cprofile = cprofile or set()
+        self.mesures: dict[str, dict[str, Any]] = {}
+        self.profils: dict[str, pstats.Stats] = {}
+        self._demarre_tracemalloc = False
+        if niveau == "memoire" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._demarre_tracemalloc = True
+
+    def _profile(self, nom: str) -> bool:
+        return "*" in self.cprofile or nom in self.cprofile
+
+    @contextmanager
+    def bloc(self, nom: str, entrees: dict[str, Any] | None = None) -> Iterator[dict[str, Any]]:
+        """Mesure d'un bloc ; le dict renvoyé peut être complété par le runner (ex: cache=True)."""
+        m = self.mesures.setdefault(nom, {"bloc": nom, "appels": 0, "duree_s": 0.0, "cpu_s": 0.0,
+                                          "lignes": {}, "rss_max_hausse_mo": 0.0})
+        for e, n in _lignes(entrees or {}).items():
+            m["lignes"][e] = m["lignes"].get(e, 0) + n
+        memoire = tracemalloc.is_tracing() and self.niveau == "memoire"
+        if memoire:
+            tracemalloc.reset_peak()
+            avant = tracemalloc.get_traced_memory()[0]
+        profil = cProfile.Profile() if self._profile(nom) else None
+        rss0, t0, c0 = _rss_max_mo(), time.perf_counter(), time.process_time()
+        if profil is not None:
+            profil.enable()
+        try:
+            yield m
+        finally:
+            if profil is not None:
+                profil.disable()
+                stats = pstats.Stats(profil)
+                if nom in self.profils:
+                    self.profils[nom].add(stats)
+                else:
+                    self.profils[nom] = stats
+            m["appels"] += 1
+            m["duree_s"] += time.perf_counter() - t0
+            m["cpu_s"] += time.process_time() - c0
+            m["rss_max_hausse_mo"] += _rss_max_mo() - rss0
+            if memoire:
+                pic = (tracemalloc.get_traced_memory()[1] - avant) / 2**20
+                m["pic_memoire_mo"] = max(m.get("pic_memoire_mo", 0.0), pic)
+
+    # --------------------------------------------------------
+    # Exports
+    # --------------------------------------------------------
+    def resultats(self, artefacts: RegistreArtefacts | None = None) -> dict[str, Any]:
+        """Mesures + fichiers écrits par bloc (à appeler après la fin des rendus parallèles)."""
+        blocs = []
+        for nom, m in self.mesures.items():
+            b = {**m, "duree_s": round(m["duree_s"], 4), "cpu_s": round(m["cpu_s"], 4),
+                 "rss_max_hausse_mo": round(m["rss_max_hausse_mo"], 2)}
+            if "pic_memoire_mo" in b:
+                b["pic_memoire_mo"] = round(b["pic_memoire_mo"], 2)
+            if artefacts is not None:
+                ecrites = [e for e in artefacts.ecritures if e.producteur == nom and e.origine == "ecrit"]
+                b["ecritures"] = len(ecrites)
+                b["octets_ecrits"] = sum(e.octets for e in ecrites)
+                b["duree_ecritures_s"] = round(sum(e.duree_s for e in ecrites), 4)
+            blocs.append(b)
+        return {
+            "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "niveau": self.niveau,
+            "cprofile": sorted(self.profils),
+            "rss_max_mo": round(_rss_max_mo(), 1),
+            "duree_totale_s": round(sum(m["duree_s"] for m in self.mesures.values()), 4),
+            "blocs": blocs,
+        }
+
+    def piles(self) -> list[str]:
+        """
+        Piles repliées ("pipeline;4A;fonction;… microsecondes") : une ligne par bloc non profilé,
+        l'arbre d'appels cProfile (temps propre réparti selon les appelants) pour les blocs profilés.
+        """
+        lignes = []
+        for nom, m in self.mesures.items():
+            if nom in self.profils:
+                lignes += [f"pipeline;{nom};{pile} {us}" for pile, us in _replier(self.profils[nom])]
+            else:
+                lignes.append(f"pipeline;{nom} {max(1, round(m['duree_s'] * 1e6))}")
+        return lignes
+
+    def exporter(self, dossier: Path, artefacts: RegistreArtefacts | None = None) -> dict[str, Any]:
+        """reports/profil.json + reports/profil.folded (+ reports/profil/<bloc>.prof pour les blocs sous cProfile)."""
+        dossier = Path(dossier)
+        res = self.resultats(artefacts)
+        ecrire_texte(dossier / "profil.json", json.dumps(res, ensure_ascii=False, indent=1))
+        ecrire_texte(dossier / "profil.folded", "\n".join(self.piles()) + "\n")
+        if self.profils:
+            (dossier / "profil").mkdir(parents=True, exist_ok=True)
+            for nom, stats in self.profils.items():
+                with ARTEFACTS.ecriture(dossier / "profil" / f"{nom}.prof"):
+                    stats.dump_stats(dossier / "profil" / f"{nom}.prof")
+        if self._demarre_tracemalloc:
+            tracemalloc.stop()
+            self._demarre_tracemalloc = False
+        return res
+
+
+def _libelle(fonction: tuple[str, int, str]) -> str:
+    fichier, ligne, nom = fonction
+    if fichier == "~":  # fonctions C : "<built-in method …>"
+        return re.sub(r"[;\s]+", "_", nom)
+    return f"{nom} ({Path(fichier).name}:{ligne})".replace(";", "_").replace(" ", "_")
+
+
+def _replier(stats: pstats.Stats, profondeur_max: int = 60, seuil_s: float = 5e-5) -> list[tuple[str, int]]:
+    """
+    Arbre d'appels approché depuis les arêtes appelant -> appelé de cProfile : le temps d'une fonction
+    est réparti entre ses appelants au prorata du temps cumulé de chaque arête (méthode de flameprof).
+    Les sous-chemins de moins de `seuil_s` ne sont pas développés : le nombre de chemins d'un graphe
+    d'appels explose sinon, alors que leur temps total est borné par celui du parent.
+    """
+    donnees = stats.stats  # fonction -> (cc, nc, tt, ct, appelants{appelant: (cc, nc, tt, ct)})
+    appeles: dict[Any, list[tuple[Any, float]]] = {}
+    for f, (_, _, _, _, appelants) in donnees.items():
+        for a, arete in appelants.items():
+            appeles.setdefault(a, []).append((f, arete[3]))
+    racines = [f for f, v in donnees.items() if not v[4] or all(a not in donnees for a in v[4])]
+
+    piles: dict[str, float] = {}
+
+    def descendre(f: Any, part: float, chemin: tuple[str, ...], vus: frozenset) -> None:
+        # part = fraction de l'activité de f attribuée à ce chemin
+        tt = donnees[f][2]
+        chemin = chemin + (_libelle(f),)
+        if tt * part > 0:
+            cle = ";".join(chemin)
+            piles[cle] = piles.get(cle, 0.0) + tt * part
+        if len(chemin) >= profondeur_max:
+            return
+        for g, ct_arete in appeles.get(f, []):
+            ct_g = donnees[g][3]
+            if g in vus or ct_g <= 0 or part * ct_arete < seuil_s:
+                continue  # récursion (temps déjà dans le cumul de l'appel extérieur) ou chemin négligeable
+            descendre(g, part * min(1.0, ct_arete / ct_g), chemin, vus | {g})
+
+    for r in racines:
+        descendre(r, 1.0, (), frozenset({r}))
+    return [(p, max(1, round(s * 1e6))) for p, s in sorted(piles.items()) if s * 1e6 >= 0.5]
@@ -0,0 +1,173 @@
+# ============================================================
+# QUALITÉ D'UN CLUSTERING — SILHOUETTE À MÉMOIRE BORNÉE
+# But : évaluer k sur des exports de plusieurs vagues (10⁵–10⁶ lignes)
+# sans matrice n×n des distances :
+# - silhouette exacte par tuiles de distances (mémoire bornée, temps O(n²))
+# - estimation sur échantillon stratifié par cluster + intervalle de confiance
+#   (coût indépendant de n : points et références tirés par cluster)
+# - Calinski-Harabasz / Davies-Bouldin : O(n), via les centroïdes
+# ============================================================
+from __future__ import annotations
+
+import numpy as np
+
+
+MEMOIRE_MO = 64              # budget d'une tuile de distances (Mo)
+SEUIL_SILHOUETTE_EXACTE = 20_000  # métrique "auto" : échantillon au-delà
+
+# métrique -> colonne principale (sélection de k / arrêt anticipé) et sens (+1 = plus grand est meilleur)
+COLONNES = {
+    "silhouette": "silhouette",
+    "silhouette_echantillon": "silhouette_estimee",
+    "calinski_harabasz": "calinski_harabasz",
+    "davies_bouldin": "davies_bouldin",
+}
+SENS = {"silhouette": 1, "silhouette_estimee": 1, "calinski_harabasz": 1, "davies_bouldin": -1}
+
+
+def choisir_metrique(metrique: str, n: int) -> str:
+    if metrique == "auto":
+        return "silhouette" if n <= SEUIL_SILHOUETTE_EXACTE else "silhouette_echantillon"
+    if metrique not in COLONNES:
+        raise ValueError(f"Métrique inconnue : {metrique} ({', '.join(['auto', *COLONNES])})")
+    return metrique
+
+
+def silhouette_lignes(
+    X: np.ndarray,
+    labels: np.ndarray,
+    lignes: np.ndarray | None = None,
+    references: np.ndarray | None = None,
+    memoire_mo: float = MEMOIRE_MO,
+) -> np.ndarray:
+    """
+    s(i) (distance euclidienne) des `lignes` demandées (toutes par défaut), les distances moyennes
+    à chaque cluster étant calculées sur les points `references` (tous par défaut = silhouette exacte).
+    Distances calculées par tuiles (≤ memoire_mo) et réduites aussitôt en sommes par cluster
+    (tuile @ indicatrices des clusters) : jamais de matrice lignes × n.
+    Même convention que sklearn : s = 0 pour un cluster singleton.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    lignes = np.arange(n) if lignes is None else np.asarray(lignes)
+    references = np.arange(n) if references is None else np.asarray(references)
+    niveaux, codes = np.unique(np.asarray(labels), return_inverse=True)
+    k = len(niveaux)
+
+    # position de chaque point parmi les références (-1 = absent) : distance à soi-même exclue
+    pos_ref = np.full(n, -1, dtype=np.int64)
+    pos_ref[references] = np.arange(len(references))
+    Xr = X[references]
+    carres_r = np.einsum("ij,ij->i", Xr, Xr)
+    indic = np.zeros((len(references), k))
+    indic[np.arange(len(references)), codes[references]] = 1.0
+    tailles = indic.sum(axis=0)
+
+    # tuile ≈ memoire_mo (≈ 2 tableaux tuile en float64 vivent en même temps)
+    cases = max(1, int(memoire_mo * 2**20 // (2 * 8)))
+    bloc_l = min(len(lignes), 1024)
+    bloc_c = max(1, cases // bloc_l)
+
+    sommes = np.zeros((len(lignes), k))
+    for dl in range(0, len(lignes), bloc_l):
+        idx = lignes[dl:dl + bloc_l]
+        xb = X[idx]
+        cb = np.einsum("ij,ij->i", xb, xb)
+        p = pos_ref[idx]
+        for dc in range(0, len(references), bloc_c):
+            fin = min(dc + bloc_c, len(references))
+            d = xb @ Xr[dc:fin].T
+            d *= -2
+            d += carres_r[None, dc:fin]
+            d += cb[:, None]
+            np.maximum(d, 0, out=d)
+            np.sqrt(d, out=d)
+            soi = np.flatnonzero((p >= dc) & (p < fin))
+            d[soi, p[soi] - dc] = 0.0  # distance à soi-même exactement nulle
+            sommes[dl:dl + bloc_l] += d @ indic[dc:fin]
+
+    r = np.arange(len(lignes))
+    c = codes[lignes]
+    propre = tailles[c] - (pos_ref[lignes] >= 0)  # autres points du cluster parmi les références
+    a = sommes[r, c] / np.maximum(propre, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moy = sommes / tailles
+    moy[r, c] = np.inf
+    b = moy.min(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.nan_to_num((b - a) / np.maximum(a, b))
+    s[propre == 0] = 0.0
+    return s
+
+
+def silhouette_par_blocs(X: np.ndarray, labels: np.ndarray, memoire_mo: float = MEMOIRE_MO) -> float:
+    """Silhouette moyenne exacte (= sklearn.metrics.silhouette_score), mémoire bornée, O(n²) en temps."""
+    return float(silhouette_lignes(X, labels, memoire_mo=memoire_mo).mean())
+
+
+def _tirage_stratifie(
+    inverse: np.ndarray, tailles: np.ndarray, alloc: np.ndarray, rng: np.random.Generator,
+) -> list[np.ndarray]:
+    return [rng.choice(np.flatnonzero(inverse == h), size=m, replace=False) for h, m in enumerate(alloc)]
+
+
+def silhouette_echantillon(
+    X: np.ndarray,
+    labels: np.ndarray,
+    taille: int = 5_000,
+    references: int = 2_000,
+    niveau: float = 0.95,
+    random_state: int | None = None,
+    min_par_cluster: int = 30,
+    memoire_mo: float = MEMOIRE_MO,
+) -> dict[str, float]:
+    """
+    Estimation de la silhouette moyenne en O(taille × k × references), indépendante de n :
+    - points évalués : échantillon stratifié par cluster (allocation proportionnelle, ≥ min_par_cluster)
+    - distances moyennes à chaque cluster : sur `references` points tirés par cluster (tous si moins)
+    Estimateur stratifié Σ Wₕ ȳₕ, variance Σ Wₕ² (1 - mₕ/Nₕ) sₕ²/mₕ -> intervalle de confiance normal
+    (incertitude de l'échantillon des points évalués ; références exactes quand Nₕ ≤ references).
+    """
+    labels = np.asarray(labels)
+    n = len(labels)
+    niveaux, inverse, tailles = np.unique(labels, return_inverse=True, return_counts=True)
+    if taille >= n and references >= tailles.max():
+        s = silhouette_par_blocs(X, labels, memoire_mo)
+        return {"silhouette_estimee": s, "silhouette_ic_bas": s, "silhouette_ic_haut": s}
+
+    rng = np.random.default_rng(random_state)
+    alloc = np.minimum(tailles, np.maximum(np.round(taille * tailles / n).astype(int), min_par_cluster))
+    lignes = _tirage_stratifie(inverse, tailles, alloc, rng)
+    refs = np.concatenate(_tirage_stratifie(inverse, tailles, np.minimum(tailles, references), rng))
+
+    s = silhouette_lignes(X, labels, np.concatenate(lignes), refs, memoire_mo)
+    groupes = np.split(s, np.cumsum(alloc)[:-1])
+    moyennes = np.array([g.mean() for g in groupes])
+    variances = np.array([g.var(ddof=1) if len(g) > 1 else 0.0 for g in groupes])
+
+    poids = tailles / n
+    estimation = float(poids @ moyennes)
+    erreur = float(np.sqrt(np.sum(poids ** 2 * (1 - alloc / tailles) * variances / alloc)))
+    from scipy import stats
+
+    z = stats.norm.ppf(0.5 + niveau / 2)
+    return {
+        "silhouette_estimee": estimation,
+        "silhouette_ic_bas": estimation - z * erreur,
+        "silhouette_ic_haut": estimation + z * erreur,
+    }
+
+
+def evaluer(X: np.ndarray, labels: np.ndarray, metrique: str, random_state: int | None = None) -> dict[str, float]:
+    """Scores d'une métrique (déjà résolue par `choisir_metrique`), colonnes prêtes pour le tableau du balayage."""
+    if metrique == "silhouette":
+        return {"silhouette": silhouette_par_blocs(X, labels)}
+    if metrique == "silhouette_echantillon":
+        return silhouette_echantillon(X, labels, random_state=random_state)
+    if metrique in ("calinski_harabasz", "davies_bouldin"):
+        from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
+    if metrique == "calinski_harabasz":
+        return {"calinski_harabasz": float(calinski_harabasz_score(X, labels))}
+    if metrique == "davies_bouldin":
+        return {"davies_bouldin": float(davies_bouldin_score(X, labels))}
+    raise ValueError(f"Métrique inconnue : {metrique}")
@@ -0,0 +1,579 @@
+# ============================================================
+# RENDU DES FIGURES — DESIGN SYSTEM + FONCTIONS DE RENDU
+# But : chaque figure = une fonction qui reçoit uniquement sa petite table
+# agrégée (pivot `pct`, série `grp`, …) et écrit son PNG. Les blocs du
+# pipeline appellent `rendre(...)` : exécution immédiate (mode série) ou
+# envoi à un ProcessPoolExecutor (mode parallèle, backend Agg).
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from pipeline_artefacts import ARTEFACTS, Ecriture
+from pipeline_imports import ModuleParesseux
+
+# matplotlib / seaborn chargés à la 1ère figure (pas au démarrage) ; le design system est appliqué à ce moment-là
+plt = ModuleParesseux("matplotlib.pyplot", apres=lambda: apply_design_system())
+mcolors = ModuleParesseux("matplotlib.colors")
+mcollections = ModuleParesseux("matplotlib.collections")
+mpatches = ModuleParesseux("matplotlib.patches")
+
+
+# [0B] Palette cerulean + colormap cerulean
+PALETTE = {
+    "CERULEAN_DARK":  "#005B82",  # cerulean foncé
+    "CERULEAN":       "#007BA7",  # cerulean classic
+    "CERULEAN_LIGHT": "#4FB6E1",  # clair
+    "CERULEAN_SOFT":  "#A7D8F0",  # très clair
+    "NAVY":           "#083D5B",  # contraste bleu nuit
+    "GRID":           "#D6EAF5",  # grid léger bleu
+    "GRIS_CLAIR":     "#E9ECEF",
+    "NOIR":           "#0B1D26",
+}
+
+_CMAP = None
+
+
+def cerulean_cmap():
+    """Colormap cerulean (construite au 1er appel : import de matplotlib différé)."""
+    global _CMAP
+    if _CMAP is None:
+        _CMAP = mcolors.LinearSegmentedColormap.from_list(
+            "cerulean_cmap",
+            ["#F3FBFF", PALETTE["CERULEAN_SOFT"], PALETTE["CERULEAN_LIGHT"], PALETTE["CERULEAN"], PALETTE["CERULEAN_DARK"]],
+            N=256
+        )
+    return _CMAP
+
+
+def __getattr__(nom: str) -> Any:
+    # compatibilité : `from pipeline_rendu import CERULEAN_CMAP`
+    if nom == "CERULEAN_CMAP":
+        return cerulean_cmap()
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+
+# [0C] Design system
+def apply_design_system() -> None:
+    """Applique un thème global Matplotlib cohérent (appelé automatiquement au chargement de pyplot)."""
+    from cycler import cycler
+
+    plt.rcParams.update({
+        # canvas
+        "figure.facecolor": "white",
+        "axes.facecolor": "white",
+
+        # contours & texte
+        "axes.edgecolor": PALETTE["CERULEAN_DARK"],
+        "axes.labelcolor": PALETTE["CERULEAN_DARK"],
+        "text.color": PALETTE["CERULEAN_DARK"],
+        "xtick.color": PALETTE["CERULEAN_DARK"],
+        "ytick.color": PALETTE["CERULEAN_DARK"],
+
+        # grid “soft”
+        "axes.grid": True,
+        "grid.color": PALETTE["GRID"],
+        "grid.linestyle": "-",
+        "grid.linewidth": 0.8,
+
+        # typographie (simple mais propre)
+        "axes.titlesize": 18,
+        "axes.titleweight": "bold",
+        "axes.labelsize": 12,
+        "xtick.labelsize": 11,
+        "ytick.labelsize": 11,
+
+        # légende
+        "legend.frameon": True,
+        "legend.framealpha": 0.95,
+        "legend.edgecolor": PALETTE["GRID"],
+    })
+
+    # cycle de couleurs (évite couleurs random)
+    plt.rcParams["axes.prop_cycle"] = cycler(color=[
+        PALETTE["CERULEAN_DARK"],
+        PALETTE["CERULEAN"],
+        PALETTE["CERULEAN_LIGHT"],
+        PALETTE["NAVY"],
+    ])
+
+def set_editorial_axes(ax: plt.Axes, title: str | None = None, xlabel: str | None = None, ylabel: str | None = None) -> None:
+    """Uniformise un axe (respiration + style)."""
+    if title:
+        ax.set_title(title, pad=18, fontweight="bold")
+    if xlabel is not None:
+        ax.set_xlabel(xlabel)
+    if ylabel is not None:
+        ax.set_ylabel(ylabel)
+
+    # enlève le “cadre” trop lourd en haut/droite
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+
+    # grid légère uniquement en y (souvent plus chic)
+    ax.grid(True, axis="y", alpha=0.35)
+    ax.grid(False, axis="x")
+
+    # marge interne (évite éléments collés)
+    ax.margins(x=0.05, y=0.08)
+
+
+def export_png(path: Path) -> None:
+    """Export propre: marges + bbox pour éviter titres collés."""
+    # IMPORTANT: tight_layout AVANT savefig
+    plt.tight_layout(pad=1.6)
+    with ARTEFACTS.ecriture(path):
+        plt.savefig(path, dpi=240, bbox_inches="tight")
+    plt.close()
+
+
+def _savefig(path: Path):
+    try:
+        export_png(path)
+    except Exception:
+        plt.tight_layout()
+        with ARTEFACTS.ecriture(path):
+            plt.savefig(path, dpi=200, bbox_inches="tight")
+        plt.close()
+
+
+# ------------------------------------------------------------
+# Orchestration : série (par défaut) ou process pool
+# ------------------------------------------------------------
+_POOL: ProcessPoolExecutor | None = None
+_JOBS: list[tuple[Path, Future, str | None]] = []  # (fichier, rendu en cours, bloc demandeur)
+_RENDUS: set[tuple[str, Path, str]] = set()          # (fonction, fichier, hash des données) déjà rendus
+
+
+def _init_worker() -> None:
+    """Chaque worker : backend Agg + même design system que le processus principal."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    apply_design_system()
+
+
+def demarrer_rendu_parallele(workers: int) -> None:
+    """Active le mode parallèle : les appels à `rendre` sont envoyés au pool."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def terminer_rendu_parallele() -> list[Path]:
+    """Attend toutes les figures en cours (propage la 1ère erreur) et ferme le pool."""
+    global _POOL
+    if _POOL is None:
+        return []
+    try:
+        faits = []
+        for path, fut, bloc in _JOBS:
+            ARTEFACTS.ajouter(fut.result(), bloc)
+            faits.append(path)
+        return faits
+    finally:
+        _JOBS.clear()
+        _POOL.shutdown()
+        _POOL = None
+
+
+def _rendre_en_worker(fonction: Callable[..., None], path: Path, args: tuple, kwargs: dict) -> list[Ecriture]:
+    """Exécuté dans un worker : rend la figure et renvoie ses écritures au registre du processus principal."""
+    ARTEFACTS.ecritures.clear()
+    with ARTEFACTS.rendu():
+        fonction(*args, path=path, **kwargs)
+    return list(ARTEFACTS.ecritures)
+
+
+def _signature(fonction: Callable[..., None], path: Path, args: tuple, kwargs: dict) -> tuple[str, Path, str]:
+    donnees = hashlib.sha256(pickle.dumps((args, sorted(kwargs.items())), protocol=4)).hexdigest()
+    return (f"{fonction.__module__}.{fonction.__qualname__}", Path(path), donnees)
+
+
+def rendre(fonction: Callable[..., None], path: Path, *args: Any, **kwargs: Any) -> None:
+    """
+    Rend une figure : tout de suite (série) ou via le pool (parallèle).
+    Même fonction + même fichier + mêmes données qu'un rendu déjà fait dans l'exécution :
+    pas de second rendu, noté comme évité dans le manifeste.
+    """
+    signature = _signature(fonction, path, args, kwargs)
+    if signature in _RENDUS and (_POOL is not None or Path(path).exists()):
+        ARTEFACTS.evites.append((Path(path).as_posix(), ARTEFACTS.bloc_courant))
+        return
+    _RENDUS.add(signature)
+
+    if _POOL is None:
+        with ARTEFACTS.rendu():
+            fonction(*args, path=path, **kwargs)
+    else:
+        # même fichier déjà en cours avec d'autres données : on attend pour éviter deux écritures concurrentes
+        for p, fut, _ in _JOBS:
+            if p == path:
+                fut.result()
+        _JOBS.append((path, _POOL.submit(_rendre_en_worker, fonction, path, args, kwargs), ARTEFACTS.bloc_courant))
+
+
+# ------------------------------------------------------------
+# Fonctions de rendu (une par type de figure)
+# ------------------------------------------------------------
+
+# [1A]
+def rendu_grand_paradoxe(counts: pd.Series, *, path: Path) -> None:
+    plt.figure(figsize=(12, 6))
+    plt.barh(counts.index, counts.values, edgecolor="black")
+    plt.gca().invert_yaxis()
+    plt.title("Le Grand Paradoxe : discours vs réalité", fontweight="bold")
+    plt.xlabel("%")
+    plt.ylabel("")
+    export_png(path)
+
+
+# [1B]
+def rendu_paradoxe_par_age(grp: pd.Series, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    plt.plot(grp.index.astype(str), grp.values, marker="o")
+    plt.title("Taux de paradoxe (Souci éthique élevé, mais achat de fast fashion) par âge", fontweight="bold")
+    plt.ylabel("% du groupe")
+    plt.xlabel("Groupe d'âge")
+    plt.grid(True, linestyle="--", alpha=0.4)
+    export_png(path)
+
+
+# [1C]
+def rendu_paradoxe_par_canal(grp: pd.Series, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    plt.barh(grp.index, grp.values, edgecolor="black")
+    plt.gca().invert_yaxis()
+    plt.title("Paradoxe éthique par canal d'achat", fontweight="bold")
+    plt.xlabel("% (Souci éthique élevé + fast fashion)")
+    export_png(path)
+
+
+# [1D] + [6D]
+def rendu_boxplot_culpabilite(data: list[np.ndarray], labels: list[str], titre: str, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    bp = plt.boxplot(
+        data,
+        labels=labels,
+        patch_artist=True,
+        showfliers=False,
+        widths=0.55
+    )
+
+    # Couleurs (ta palette existante)
+    bp["boxes"][0].set_facecolor(PALETTE["CERULEAN_DARK"])
+    bp["boxes"][0].set_edgecolor(PALETTE["CERULEAN_DARK"])
+    bp["boxes"][1].set_facecolor(PALETTE["CERULEAN_LIGHT"])
+    bp["boxes"][1].set_edgecolor(PALETTE["CERULEAN_DARK"])
+
+    for median in bp["medians"]:
+        median.set_color("white")
+        median.set_linewidth(2.2)
+
+    plt.ylim(1, 10)
+    plt.ylabel("Culpabilité (1–10)")
+    plt.title(titre, fontweight="bold")
+    export_png(path)
+
+
+# [1E] + [6C]
+def rendu_hexbin(x: np.ndarray, y: np.ndarray, gridsize: int, xlabel: str, ylabel: str, titre: str, *,
+                 path: Path) -> None:
+    plt.figure(figsize=(10, 6))
+    hb = plt.hexbin(x, y, gridsize=gridsize, cmap=cerulean_cmap(), mincnt=1)
+    cb = plt.colorbar(hb)
+    cb.set_label("Densité (nombre de réponses)")
+    plt.xlim(1, 10)
+    plt.ylim(1, 10)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(titre, fontweight="bold")
+    export_png(path)
+
+
+# [3A]
+def rendu_reseau_items(
+    noeuds: list[str], tailles: np.ndarray, aretes: pd.DataFrame, seuil: float, *, path: Path,
+) -> None:
+    """
+    Noeuds sur un cercle ; toutes les arêtes (source/cible = positions dans `noeuds`, poids)
+    dans une seule LineCollection : un artiste quel que soit le nombre de liens.
+    """
+    angles = np.linspace(0, 2*np.pi, len(noeuds), endpoint=False)
+    xy = np.column_stack([np.cos(angles), np.sin(angles)])
+
+    w = aretes["poids"].to_numpy(dtype=float)
+    segments = np.stack([xy[aretes["source"].to_numpy()], xy[aretes["cible"].to_numpy()]], axis=1)
+    couleurs = np.where(
+        w[:, None] >= 0.30,
+        mcolors.to_rgba(PALETTE["CERULEAN"], 0.65),
+        mcolors.to_rgba(PALETTE["CERULEAN_DARK"], 0.65),
+    )
+
+    plt.figure(figsize=(11, 11))
+    ax = plt.gca()
+    ax.add_collection(mcollections.LineCollection(segments, linewidths=1 + 4*w, colors=couleurs, capstyle="projecting", zorder=1))
+    plt.scatter(xy[:, 0], xy[:, 1], s=tailles, color=PALETTE["CERULEAN"], alpha=0.95, edgecolor="black", linewidth=0.8, zorder=3)
+
+    # labels
+    for k, (x, y) in zip(noeuds, xy):
+        plt.text(x*1.18, y*1.18, k.strip(), ha="center", va="center", color= "black", fontsize=12, zorder=4)
+
+    plt.title(f"Packs de tendances (corrélation > {seuil})", fontsize=24, fontweight="bold", pad=22)
+    plt.xlim(-1.35, 1.35)
+    plt.ylim(-1.35, 1.35)
+    plt.axis("off")
+    export_png(path)
+
+
+# [4B]
+def grille_waffle(values: np.ndarray, n_total: int) -> np.ndarray:
+    """
+    Catégorie de chaque case (ordre de lecture) : n_total cases réparties au prorata de `values`
+    (plus forts restes pour tomber juste), construites par np.repeat.
+    """
+    proportions = values / values.sum()
+    squares = np.floor(proportions * n_total).astype(int)
+
+    # ajuster pour atteindre exactement n_total cases
+    remainder = n_total - squares.sum()
+    if remainder > 0:
+        squares[np.argsort(-(proportions * n_total - squares))[:remainder]] += 1
+
+    grid = np.repeat(np.arange(len(values)), squares)[:n_total]
+    if len(grid) < n_total:
+        grid = np.concatenate([grid, np.full(n_total - len(grid), len(values) - 1)])
+    return grid
+
+
+def rendu_waffle(values: np.ndarray, labels: list[str], n_repondants: int, *, path: Path) -> None:
+    base_colors = [
+        PALETTE["CERULEAN_DARK"],
+        PALETTE["CERULEAN"],
+        PALETTE["CERULEAN_LIGHT"],
+        PALETTE["CERULEAN_SOFT"],
+        PALETTE["NAVY"],
+    ]
+    colors = [base_colors[i % len(base_colors)] for i in range(len(values))]
+
+    # grille waffle (50x50 = 2500)
+    n_cols = 50
+    n_rows = 50
+    n_total = n_cols * n_rows
+
+    grid = grille_waffle(values, n_total)
+
+    fig, ax = plt.subplots(figsize=(10, 10), facecolor="white")
+    ax.set_facecolor("white")
+
+    # toutes les cases dans une seule PolyCollection (sommets calculés en NumPy) : un artiste, pas 2 500 patches
+    cell = 0.92
+    cases = np.arange(n_total)
+    x = (cases % n_cols).astype(float)
+    y = (n_rows - 1 - cases // n_cols).astype(float)
+    coins = np.array([[0, 0], [cell, 0], [cell, cell], [0, cell]])
+    sommets = np.stack([x, y], axis=1)[:, None, :] + coins[None, :, :]
+    ax.add_collection(mcollections.PolyCollection(
+        sommets, facecolors=np.asarray([mcolors.to_rgba(c) for c in colors])[grid],
+        edgecolors="white", linewidths=0.4,
+    ))
+
+    ax.set_xlim(-1.5, n_cols + 1.5)
+    ax.set_ylim(-8, n_rows + 3.5)
+    ax.axis("off")
+
+    ax.text(
+        0, n_rows + 2.2,
+        "Typologie des consommateurs de mode (Waffle chart)",
+        fontsize=16, fontweight="bold", color=PALETTE["CERULEAN_DARK"]
+    )
+    ax.text(
+        0, n_rows + 1.2,
+        f"{n_repondants} répondants — 1 carré ≈ {max(1, int(round(n_repondants / n_total)))} répondant(s)",
+        fontsize=10, color=PALETTE["NAVY"]
+    )
+
+    y0 = -2.5
+    for i, (lab, val) in enumerate(zip(labels, values)):
+        ax.add_patch(mpatches.Rectangle((0, y0 - i*1.2), 1.2, 0.7, facecolor=colors[i], edgecolor="none"))
+        ax.text(
+            1.5, y0 - i*1.2 + 0.35,
+            f"{lab} — {val} ({val/values.sum()*100:.1f}%)",
+            va="center", fontsize=10, color=PALETTE["NOIR"]
+        )
+
+    export_png(path)
+
+
+# [4C]
+def rendu_pca(z_df: pd.DataFrame, centroids: pd.DataFrame, var1: float, var2: float, *, path: Path) -> None:
+    plt.figure(figsize=(10, 6))
+    plt.scatter(
+        z_df["PC1"], z_df["PC2"],
+        c=z_df["Cluster"],
+        cmap="tab10",
+        alpha=0.55,
+        s=35,
+        edgecolor="none"
+    )
+    plt.scatter(
+        centroids["PC1"], centroids["PC2"],
+        c=centroids.index,
+        cmap="tab10",
+        s=240,
+        marker="X",
+        edgecolor="black",
+        linewidth=1.2
+    )
+
+    plt.title(f"Personas (PCA) : projection 2D — PC1 {var1:.1f}% / PC2 {var2:.1f}%", fontweight="bold")
+    plt.xlabel("PC1")
+    plt.ylabel("PC2")
+    plt.grid(True, linestyle="--", alpha=0.25)
+    export_png(path)
+
+
+# [4D]
+def rendu_heatmap_items(pct: pd.DataFrame, *, path: Path) -> None:
+    import seaborn as sns
+
+    plt.figure(figsize=(14, 6))
+    ax = sns.heatmap(
+        pct,
+        cmap=cerulean_cmap(),
+        vmin=0, vmax=100,
+        linewidths=0.5,
+        linecolor="white",
+        cbar_kws={"label": "% d'adoption"}
+    )
+    ax.set_title("Uniformisation : articles tendance par cluster (% adoption)", fontweight="bold")
+    ax.set_xlabel("")
+    ax.set_ylabel("")
+    plt.xticks(rotation=30, ha="right")
+    plt.yticks(rotation=0)
+    export_png(path)
+
+
+# [4E]
+def rendu_obsolescence(grp: pd.Series, *, path: Path) -> None:
+    plt.figure(figsize=(8, 5))
+    plt.bar([f"Cluster {i}" for i in grp.index], grp.values, edgecolor="black")
+    plt.ylim(1, 5)
+    plt.title("Obsolescence psychologique : rejet du 'démodé' (moyenne)", fontweight="bold")
+    plt.ylabel("Niveau (1=Jamais, 5=Toujours)")
+    export_png(path)
+
+
+# [4F]
+def rendu_fastfashion_par_cluster(pivot: pd.DataFrame, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    bottom = np.zeros(len(pivot.index))
+    for col in pivot.columns:
+        plt.bar(pivot.index.astype(str), pivot[col].values, bottom=bottom, label=col)
+        bottom += pivot[col].values
+
+    plt.title("Fast fashion (en %) par cluster", fontweight="bold")
+    plt.xlabel("Cluster")
+    plt.ylabel("%")
+    plt.legend(loc="upper right")
+    export_png(path)
+
+
+# [4G]
+def rendu_carte_renoncements(grp: pd.DataFrame, *, path: Path) -> None:
+    cols = list(grp.columns)
+    x = np.arange(len(cols))
+    width = 0.18
+
+    plt.figure(figsize=(12, 5))
+    for i, cl in enumerate(grp.index):
+        plt.bar(
+            x + (i - len(grp.index)/2)*width + width/2,
+            grp.loc[cl].values,
+            width=width,
+            edgecolor="black",
+            label=f"Cluster {cl}"
+        )
+
+    plt.xticks(x, cols, rotation=15, ha="right")
+    plt.ylim(0, 10.5)
+    plt.title("Carte des renoncements : arbitrages moyens par cluster", fontweight="bold")
+    plt.ylabel("Niveau moyen (1–10)")
+    plt.legend()
+    export_png(path)
+
+
+# [6B]
+def rendu_dist_influence(counts: pd.Series, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    plt.bar(counts.index.astype(str), counts.values, edgecolor="black")
+    plt.title("Réseaux sociaux : distribution de l'influence déclarée (1–10)", fontweight="bold")
+    plt.xlabel("Influence des réseaux sociaux (1–10)")
+    plt.ylabel("Nombre de répondants")
+    export_png(path)
+
+
+# [6E]
+def rendu_fastfashion_selon_influence(grp: pd.Series, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    plt.bar(grp.index.astype(int).astype(str), grp.values, edgecolor="black")
+    plt.ylim(0, 100)
+    plt.xlabel("Influence réseaux (1–10)")
+    plt.ylabel("% déclarant consommer de la fast fashion")
+    plt.title("Réseaux sociaux : probabilité de fast fashion selon l’influence", fontweight="bold")
+    export_png(path)
+
+
+# [6F]
+def rendu_correlations(corr: pd.DataFrame, *, path: Path) -> None:
+    import seaborn as sns
+
+    plt.figure(figsize=(9, 6))
+    ax = sns.heatmap(
+        corr,
+        cmap=cerulean_cmap(),
+        vmin=-1, vmax=1,
+        linewidths=0.5, linecolor="white",
+        cbar_kws={"label": "Corrélation (Pearson)"}
+    )
+    ax.set_title("Réseaux sociaux : corrélations des variables psycho-sociales", fontweight="bold")
+    plt.xticks(rotation=30, ha="right")
+    plt.yticks(rotation=0)
+    export_png(path)
+
+
+# [9A]
+def rendu_fin_de_vie_par_frequence(pct: pd.DataFrame, *, path: Path) -> None:
+    x = np.arange(len(pct.index))
+    n = len(pct.columns)
+    width = min(0.8 / max(n, 1), 0.18)
+
+    plt.figure(figsize=(12, 6))
+    for i, col in enumerate(pct.columns):
+        plt.bar(
+            x + (i - (n-1)/2)*width,
+            pct[col].values,
+            width=width,
+            edgecolor="black",
+            label=col
+        )
+
+    plt.xticks(x, pct.index.astype(str), rotation=20, ha="right")
+    plt.ylabel("% des répondants (dans le groupe)")
+    plt.title("Fin de vie : % des répondants par option (multi-choix)", fontweight="bold")
+    plt.legend(bbox_to_anchor=(1.02, 1), loc="upper left")
+    export_png(path)
+
+
+# [10A]
+def rendu_barh_counts(vc: pd.Series, title: str, *, path: Path) -> None:
+    plt.figure(figsize=(10, 5))
+    plt.barh(vc.index, vc.values)
+    plt.title(title, fontweight="bold")
+    plt.xlabel("Nombre de réponses")
+    _savefig(path)
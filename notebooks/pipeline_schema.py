@@ -0,0 +1,163 @@
+# ============================================================
+# REGISTRE DE SCHÉMA — NOMS CANONIQUES DES COLONNES
+# But : résoudre en une passe les noms standard (Age, Canal_Achat,
+# Importance_* …) sur des exports de plusieurs centaines de colonnes.
+# Les en-têtes normalisés sont indexés par mot une seule fois ; chaque
+# règle ne vérifie que les colonnes candidates de l'index. Le résultat est
+# mémorisé par hash de l'en-tête et signale les règles ambiguës / sans match.
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+
+def norm_text(s: str) -> str:
+    s = str(s)
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = s.lower()
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+@dataclass(frozen=True)
+class Regle:
+    """
+    Règle d'un nom canonique. `passes` : tentatives successives (la 1ère qui trouve gagne),
+    chacune = alternatives "frag1 & frag2 & !exclu" ; "=texte" = en-tête exactement égal.
+    Dans une passe, on garde la 1ère colonne (ordre de l'en-tête) qui vérifie une alternative.
+    """
+    nom: str
+    passes: tuple[tuple[str, ...], ...]
+
+
+def regle(nom: str, *passes: Iterable[str]) -> Regle:
+    return Regle(nom, tuple(tuple(p) for p in passes))
+
+
+@dataclass
+class Resolution:
+    """Mapping en-tête -> nom canonique + diagnostic de la résolution."""
+    mapping: dict[str, str]
+    choix: dict[str, str] = field(default_factory=dict)             # nom -> colonne retenue par sa règle
+    ambigus: dict[str, list[str]] = field(default_factory=dict)    # nom -> colonnes candidates (1ère retenue)
+    non_trouves: list[str] = field(default_factory=list)
+    conflits: dict[str, list[str]] = field(default_factory=dict)   # colonne -> règles qui la réclament (dernière retenue)
+    ignores: dict[str, str] = field(default_factory=dict)           # colonne -> nom déjà présent dans l'en-tête
+
+    def rapport(self) -> list[str]:
+        lignes = []
+        for nom, cols in self.ambigus.items():
+            lignes.append(f"- AMBIGU {nom} : {len(cols)} colonnes candidates, retenue : {cols[0]}")
+        for nom in self.non_trouves:
+            lignes.append(f"- NON TROUVÉ {nom}")
+        for col, noms in self.conflits.items():
+            lignes.append(f"- CONFLIT {col} : réclamée par {', '.join(noms)} (retenu : {noms[-1]})")
+        for col, nom in self.ignores.items():
+            lignes.append(f"- IGNORÉ {col} -> {nom} : nom déjà présent dans l'en-tête")
+        return lignes
+
+
+class IndexEntetes:
+    """Index inversé mot -> colonnes sur les en-têtes normalisés."""
+
+    def __init__(self, colonnes: list[str]) -> None:
+        self.colonnes = list(colonnes)
+        self.normes = [norm_text(c) for c in self.colonnes]
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._exacts: dict[str, list[int]] = defaultdict(list)
+        for i, nc in enumerate(self.normes):
+            self._exacts[nc].append(i)
+            for mot in nc.split(" "):
+                self._postings[mot].add(i)
+        self._par_morceau: dict[str, set[int]] = {}
+
+    def _colonnes_morceau(self, morceau: str) -> set[int]:
+        # un morceau sans espace d'un fragment est forcément contenu dans un seul mot de l'en-tête
+        if morceau not in self._par_morceau:
+            cols: set[int] = set()
+            for mot, ids in self._postings.items():
+                if morceau in mot:
+                    cols |= ids
+            self._par_morceau[morceau] = cols
+        return self._par_morceau[morceau]
+
+    def _candidats(self, fragment: str) -> set[int]:
+        morceaux = fragment.split(" ")
+        cols = set(self._colonnes_morceau(morceaux[0]))
+        for m in morceaux[1:]:
+            cols &= self._colonnes_morceau(m)
+        return {i for i in cols if fragment in self.normes[i]}
+
+    def chercher(self, alternative: str) -> set[int]:
+        """Colonnes vérifiant 'frag1 & frag2 & !exclu' (ou '=texte')."""
+        termes = [t.strip() for t in alternative.split(" & ")]
+        inclus = [norm_text(t) for t in termes if not t.startswith(("!", "="))]
+        exclus = [norm_text(t[1:]) for t in termes if t.startswith("!")]
+        exacts = [norm_text(t[1:]) for t in termes if t.startswith("=")]
+
+        if exacts:
+            cols = set(self._exacts.get(exacts[0], ()))
+        else:
+            cols = self._candidats(inclus[0])
+        for frag in inclus[1 if not exacts else 0:]:
+            cols &= self._candidats(frag)
+        return {i for i in cols if not any(e in self.normes[i] for e in exclus)}
+
+
+class RegistreSchema:
+    """Ensemble de règles compilées ; `resoudre` mémorisé par hash de l'en-tête."""
+
+    def __init__(self, regles: Iterable[Regle]) -> None:
+        self.regles = list(regles)
+        self._memo: dict[str, Resolution] = {}
+
+    @staticmethod
+    def hash_entete(colonnes: Iterable[str]) -> str:
+        return hashlib.sha256("\x1f".join(map(str, colonnes)).encode("utf-8")).hexdigest()
+
+    def resoudre(self, colonnes: Iterable[str]) -> Resolution:
+        colonnes = list(colonnes)
+        cle = self.hash_entete(colonnes)
+        if cle not in self._memo:
+            self._memo[cle] = self._resoudre(colonnes)
+        return self._memo[cle]
+
+    def _resoudre(self, colonnes: list[str]) -> Resolution:
+        index = IndexEntetes(colonnes)
+        res = Resolution(mapping={})
+        reclamees: dict[str, list[str]] = defaultdict(list)
+
+        for r in self.regles:
+            trouves: list[int] = []
+            for passe in r.passes:
+                ids: set[int] = set()
+                for alternative in passe:
+                    ids |= index.chercher(alternative)
+                if ids:
+                    trouves = sorted(ids)
+                    break
+            if not trouves:
+                res.non_trouves.append(r.nom)
+                continue
+            if len(trouves) > 1:
+                res.ambigus[r.nom] = [colonnes[i] for i in trouves]
+            col = colonnes[trouves[0]]
+            res.choix[r.nom] = col
+            reclamees[col].append(r.nom)
+            res.mapping[col] = r.nom
+
+        res.conflits = {c: noms for c, noms in reclamees.items() if len(noms) > 1}
+
+        # un nom canonique déjà porté par une autre colonne créerait un doublon après rename
+        existants = set(colonnes)
+        for col, nom in list(res.mapping.items()):
+            if nom in existants and nom != col:
+                res.ignores[col] = nom
+                del res.mapping[col]
+        return res
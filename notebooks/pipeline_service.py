@@ -0,0 +1,279 @@
+# ============================================================
+# SERVICE LOCAL D'AGRÉGATS (JSON) POUR L'EXPLORATION INTERACTIVE
+# But : interroger taux, adoptions et flux Sankey sans régénérer de PNG.
+# Le df normalisé, les personas et le cube sont chargés une fois au
+# démarrage (python main.py --serve), puis chaque requête est une lecture
+# dans le cube (ou un produit creux pour les Sankey).
+# - réponses mémorisées dans un cache LRU (clé = chemin + paramètres triés)
+# - ETag = hash du corps ; If-None-Match identique -> 304 sans corps
+# - paramètres incorrects -> 400, toute autre erreur -> 500 (corps JSON {"erreur": …})
+# - stdlib uniquement (http.server), aucun accès réseau sortant
+# Ex : /taux?mesure=Paradoxe&par=Age_Groupe&Cluster=2
+#      /adoption?question=Type_Articles_Achetes&par=Cluster
+#      /sankey?etapes=Frequence_Achat,Canal_Achat&Genre=Une%20femme
+# ============================================================
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from pipeline_cube import Cube
+from pipeline_donnees import variance
+from pipeline_multichoix import MultiHot, flux_sankey
+
+
+class RequeteInvalide(ValueError):
+    """Paramètres de requête incorrects (-> HTTP 400)."""
+
+
+class CacheLRU:
+    """Réponses (etag, corps) par clé ; la moins récemment lue est évincée au-delà de `capacite`."""
+
+    def __init__(self, capacite: int = 256) -> None:
+        self.capacite = capacite
+        self._entrees: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._verrou = threading.Lock()  # serveur multi-thread
+        self.hits = 0
+        self.misses = 0
+
+    def lire(self, cle: str) -> tuple[str, bytes] | None:
+        with self._verrou:
+            res = self._entrees.get(cle)
+            if res is None:
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return res
+
+    def ecrire(self, cle: str, valeur: tuple[str, bytes]) -> None:
+        with self._verrou:
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.capacite:
+                self._entrees.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entrees)
+
+
+def _json(v: Any) -> Any:
+    # numpy / pandas -> types JSON ; NaN / NA -> null
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    if v is pd.NA or v is pd.NaT:
+        return None
+    return v
+
+
+def _liste(valeur: str | None) -> list[str]:
+    return [x.strip() for x in (valeur or "").split(",") if x.strip()]
+
+
+class ServiceAgregats:
+    """
+    Réponses JSON à partir d'un cube (lecture ou roll-up) et des lignes qui l'ont construit.
+    `lignes` : dimensions simples du cube, une ligne par répondant (filtres des Sankey) ;
+    `etapes(df_filtré, colonnes)` : étapes MultiHot d'un Sankey (ex: etapes_sankey du pipeline).
+    Tout paramètre qui porte le nom d'une dimension du cube est un filtre (`Cluster=2`).
+    """
+
+    def __init__(
+        self,
+        cube: Cube,
+        lignes: pd.DataFrame,
+        df: pd.DataFrame,
+        etapes: Callable[[pd.DataFrame, list[str]], list[MultiHot]],
+        etapes_autorisees: list[str],
+        capacite: int = 256,
+    ) -> None:
+        self.cube = cube
+        self.lignes = lignes
+        self.df = df
+        self.etapes = etapes
+        self.etapes_autorisees = [c for c in etapes_autorisees if c in df.columns]
+        self.cache = CacheLRU(capacite)
+        self.routes: dict[str, Callable[[dict[str, str]], dict]] = {
+            "/dimensions": self.dimensions,
+            "/taux": self.taux,
+            "/adoption": self.adoption,
+            "/sankey": self.sankey,
+        }
+
+    # --------------------------------------------------------
+    # Paramètres
+    # --------------------------------------------------------
+    def _filtres(self, params: dict[str, str]) -> dict[str, Any]:
+        """Paramètres-dimensions -> modalité du cube (comparaison sur le libellé texte)."""
+        filtres = {}
+        for d, valeur in params.items():
+            if d not in self.cube.dimensions:
+                continue
+            libelles = {str(m): m for m in self.cube.modalites[d]}
+            if valeur not in libelles:
+                raise RequeteInvalide(f"Modalité inconnue pour {d} : {valeur!r} ({', '.join(libelles)})")
+            filtres[d] = libelles[valeur]
+        return filtres
+
+    def _par(self, params: dict[str, str]) -> list[str]:
+        par = list(dict.fromkeys(_liste(params.get("par"))))  # par=Age_Groupe,Age_Groupe -> une seule fois
+        inconnues = [d for d in par if d not in self.cube.dimensions]
+        if inconnues:
+            raise RequeteInvalide(f"Dimensions inconnues : {inconnues} ({', '.join(self.cube.dimensions)})")
+        return par
+
+    @staticmethod
+    def _filtrer(t: pd.DataFrame, filtres: dict[str, Any], par: list[str]) -> pd.DataFrame:
+        # tranche par + filtres -> lignes des modalités filtrées, index réduit à `par`
+        for d, m in filtres.items():
+            t = t[t.index.get_level_values(d) == m]
+        hors_par = [d for d in filtres if d not in par]
+        return t.droplevel(hors_par) if par and hors_par else t
+
+    @staticmethod
+    def _enregistrements(t: pd.DataFrame) -> list[dict[str, Any]]:
+        t = t.reset_index() if t.index.name is not None or t.index.nlevels > 1 else t
+        return [{k: _json(v) for k, v in r.items()} for r in t.to_dict(orient="records")]
+
+    def _tranche(self, par: list[str], filtres: dict[str, Any]) -> list[str]:
+        dims = par + [d for d in filtres if d not in par]
+        if sum(d in self.cube.multiples for d in dims) > 1:
+            raise RequeteInvalide(f"Une seule question à choix multiples par requête : {dims}")
+        return dims
+
+    # --------------------------------------------------------
+    # Routes
+    # --------------------------------------------------------
+    def dimensions(self, params: dict[str, str]) -> dict:
+        return {
+            "dimensions": {d: [_json(m) for m in self.cube.modalites[d]] for d in self.cube.dimensions},
+            "multiples": list(self.cube.multiples),
+            "mesures": list(self.cube.mesures),
+            "etapes_sankey": self.etapes_autorisees,
+            "lignes": self.cube.effectifs(),
+        }
+
+    def taux(self, params: dict[str, str]) -> dict:
+        """Moyenne d'une mesure (taux si elle est booléenne, ex: Paradoxe) par groupe, avec n et écart-type."""
+        mesure = params.get("mesure", "")
+        if mesure not in self.cube.mesures:
+            raise RequeteInvalide(f"Mesure inconnue : {mesure!r} ({', '.join(self.cube.mesures)})")
+        par, filtres = self._par(params), self._filtres(params)
+        m = self.cube.moments(mesure, self._tranche(par, filtres))
+        if isinstance(m, pd.Series):  # aucune dimension : total
+            m = m.to_frame().T
+        m = self._filtrer(m, filtres, par)
+        t = pd.DataFrame({"moyenne": m["somme"] / m["n"], "ecart_type": np.sqrt(variance(m)), "n": m["n"].astype("int64")})
+        t = t[t["n"] > 0]
+        return {"mesure": mesure, "par": par, "filtres": _filtres_json(filtres), "lignes": self._enregistrements(t)}
+
+    def adoption(self, params: dict[str, str]) -> dict:
+        """Part des répondants ayant coché chaque modalité d'une question (ou d'une dimension simple)."""
+        question = params.get("question", "")
+        if question not in self.cube.dimensions:
+            raise RequeteInvalide(f"Question inconnue : {question!r} ({', '.join(self.cube.dimensions)})")
+        par, filtres = self._par(params), self._filtres(params)
+        groupes = [d for d in self._tranche([*par, question], filtres) if d != question]
+        # repondants=1 : parmi les répondants qui ont coché au moins une modalité (sinon parmi tous)
+        t = self.cube.taux(question, groupes, parmi=question if params.get("repondants") == "1" else None)
+        if not groupes:
+            t = t.to_frame("taux").T
+        t = self._filtrer(t, filtres, par).rename_axis(columns=None)
+        if not par:
+            t = t.reset_index(drop=True)
+        return {
+            "question": question, "par": par, "filtres": _filtres_json(filtres),
+            "modalites": [_json(c) for c in t.columns], "lignes": self._enregistrements(t),
+        }
+
+    def sankey(self, params: dict[str, str]) -> dict:
+        """Liens d'un Sankey (étapes au choix) sur les répondants qui passent les filtres."""
+        colonnes = _liste(params.get("etapes"))
+        inconnues = [c for c in colonnes if c not in self.etapes_autorisees]
+        if len(colonnes) < 2 or inconnues:
+            raise RequeteInvalide(f"etapes : au moins 2 parmi {', '.join(self.etapes_autorisees)}")
+        filtres = self._filtres(params)
+        garde = np.ones(len(self.lignes), dtype=bool)
+        for d, m in filtres.items():
+            if d in self.cube.multiples:
+                raise RequeteInvalide(f"Filtre sur une question à choix multiples non géré : {d}")
+            garde &= (self.lignes[d] == m).fillna(False).to_numpy(bool)
+        df = self.df.loc[self.lignes.index[garde]]
+        if df.empty:
+            labels, sources, targets, values = [], [], [], []
+        else:
+            labels, sources, targets, values = flux_sankey(self.etapes(df, colonnes))
+        return {
+            "etapes": colonnes, "filtres": _filtres_json(filtres), "lignes": len(df),
+            "noeuds": labels, "liens": {"source": sources, "cible": targets, "valeur": [round(v, 6) for v in values]},
+        }
+
+    # --------------------------------------------------------
+    # Réponse (avec cache + ETag)
+    # --------------------------------------------------------
+    def repondre(self, chemin: str, params: dict[str, str]) -> tuple[int, str, bytes, bool]:
+        """(statut, etag, corps JSON, lu dans le cache) ; la clé ignore l'ordre des paramètres."""
+        cle = chemin + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        res = self.cache.lire(cle)
+        if res is not None:
+            return 200, res[0], res[1], True
+        route = self.routes.get(chemin)
+        if route is None:
+            return _erreur(404, f"Route inconnue : {chemin} ({', '.join(self.routes)})")
+        try:
+            corps = json.dumps(route(params), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except RequeteInvalide as e:
+            return _erreur(400, str(e))
+        except Exception as e:  # jamais de connexion coupée sans réponse : erreur interne en JSON
+            return _erreur(500, f"{type(e).__name__} : {e}")
+        etag = '"' + hashlib.sha256(corps).hexdigest()[:32] + '"'
+        self.cache.ecrire(cle, (etag, corps))
+        return 200, etag, corps, False
+
+
+def _filtres_json(filtres: dict[str, Any]) -> dict[str, Any]:
+    return {d: _json(m) for d, m in filtres.items()}
+
+
+def _erreur(statut: int, message: str) -> tuple[int, str, bytes, bool]:
+    return statut, "", json.dumps({"erreur": message}, ensure_ascii=False).encode("utf-8"), False
+
+
+def creer_serveur(service: ServiceAgregats, hote: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Serveur HTTP local (un thread par requête) ; GET uniquement."""
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 (nom imposé par http.server)
+            t0 = time.perf_counter()
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query, keep_blank_values=True))
+            statut, etag, corps, hit = service.repondre(url.path.rstrip("/") or "/dimensions", params)
+            if statut == 200 and etag and etag in self.headers.get("If-None-Match", ""):
+                statut, corps = 304, b""
+            self.send_response(statut)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")  # le client revalide avec If-None-Match
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corps)))
+            self.send_header("X-Cache", "hit" if hit else "miss")
+            self.send_header("X-Duree-ms", f"{(time.perf_counter() - t0) * 1000:.2f}")
+            self.end_headers()
+            self.wfile.write(corps)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass  # pas de journal par requête (latence)
+
+    return ThreadingHTTPServer((hote, port), Gestionnaire)
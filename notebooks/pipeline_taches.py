@@ -0,0 +1,196 @@
+# ============================================================
+# REGISTRE DES BLOCS — DAG DU PIPELINE
+# But : chaque bloc (0G, 1A … 10A) déclare ses entrées (df, df_cluster…),
+# les colonnes qu'il lit et les fichiers qu'il produit. Le runner n'exécute
+# que les blocs demandés + leurs dépendances amont (au lieu de tout relancer).
+# ============================================================
+from __future__ import annotations
+
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from pipeline_artefacts import ARTEFACTS
+
+if TYPE_CHECKING:
+    from pipeline_cache import CacheArtefacts
+    from pipeline_profilage import Profileur
+
+
+@dataclass(frozen=True)
+class Tache:
+    """Un bloc du pipeline : fonction + contrat (entrées / produits / colonnes / fichiers)."""
+    nom: str
+    fonction: Callable[..., dict[str, Any] | None]
+    entrees: tuple[str, ...] = ()
+    produits: tuple[str, ...] = ()
+    colonnes: tuple[str, ...] = ()
+    sorties: tuple[Path, ...] = ()
+    params: dict[str, Any] = field(default_factory=dict)
+    version: str = "1"
+    cache: bool = True
+    # mode flux : (agreger(morceau) -> Agregats | None, finaliser(Agregats | None)) ; None = bloc non streamable
+    flux: tuple[Callable[..., Any], Callable[..., None]] | None = None
+
+
+class RegistreTaches:
+    """Registre ordonné des blocs ; l'ordre d'enregistrement est un ordre topologique."""
+
+    def __init__(self) -> None:
+        self.taches: dict[str, Tache] = {}
+
+    def tache(
+        self,
+        nom: str,
+        *,
+        entrees: Iterable[str] = (),
+        produits: Iterable[str] = (),
+        colonnes: Iterable[str] = (),
+        sorties: Iterable[Path | str] = (),
+        params: dict[str, Any] | None = None,
+        version: str = "1",
+        cache: bool = True,
+        flux: tuple[Callable[..., Any], Callable[..., None]] | None = None,
+    ):
+        """Décorateur : enregistre la fonction comme bloc `nom`."""
+        def deco(fn: Callable[..., dict[str, Any] | None]):
+            if nom in self.taches:
+                raise ValueError(f"Bloc déjà enregistré : {nom}")
+            connus = self.producteurs()
+            inconnus = [e for e in entrees if e not in connus]
+            if inconnus:
+                # garantit que le graphe reste acyclique (producteur toujours déclaré avant)
+                raise ValueError(f"Bloc {nom} : entrées sans producteur amont {inconnus}")
+            self.taches[nom] = Tache(
+                nom=nom,
+                fonction=fn,
+                entrees=tuple(entrees),
+                produits=tuple(produits),
+                colonnes=tuple(colonnes),
+                sorties=tuple(Path(p) for p in sorties),
+                params=dict(params or {}),
+                version=version,
+                cache=cache,
+                flux=flux,
+            )
+            return fn
+        return deco
+
+    def producteurs(self) -> dict[str, str]:
+        """Produit (ex: 'df_cluster') -> nom du bloc qui le fabrique."""
+        return {p: t.nom for t in self.taches.values() for p in t.produits}
+
+    def dependances(self, nom: str) -> set[str]:
+        """Blocs amont (transitifs) nécessaires à `nom`."""
+        prod = self.producteurs()
+        vus: set[str] = set()
+        pile = [nom]
+        while pile:
+            t = self.taches[pile.pop()]
+            for e in t.entrees:
+                amont = prod[e]
+                if amont not in vus:
+                    vus.add(amont)
+                    pile.append(amont)
+        return vus
+
+    def _valider(self, noms: Iterable[str]) -> list[str]:
+        noms = [n.strip().upper() for n in noms if n and n.strip()]
+        inconnus = [n for n in noms if n not in self.taches]
+        if inconnus:
+            raise KeyError(f"Blocs inconnus : {inconnus} (disponibles : {', '.join(self.taches)})")
+        return noms
+
+    def selection(self, only: Iterable[str] | None = None, depuis: str | None = None) -> list[str]:
+        """
+        Liste ordonnée des blocs à exécuter :
+        - only=["4C", "6F"] : ces blocs + leur amont
+        - depuis="4A"       : 4A et tous les blocs suivants + leur amont
+        - rien              : tout le pipeline
+        """
+        ordre = list(self.taches)
+        demandes = set(ordre)
+        if only:
+            demandes = set(self._valider(only))
+        if depuis:
+            (debut,) = self._valider([depuis])
+            demandes &= set(ordre[ordre.index(debut):])
+
+        a_executer = set(demandes)
+        for n in demandes:
+            a_executer |= self.dependances(n)
+        return [n for n in ordre if n in a_executer]
+
+    def executer(
+        self,
+        noms: Iterable[str],
+        produits: dict[str, Any] | None = None,
+        cache: CacheArtefacts | None = None,
+        profil: Profileur | None = None,
+    ) -> dict[str, Any]:
+        """
+        Exécute les blocs dans l'ordre ; les produits circulent via un dict partagé.
+        Avec `cache` : un bloc dont la clé est connue est restauré au lieu d'être relancé
+        (penser à appeler cache.valider() une fois les rendus terminés).
+        Chaque bloc s'exécute comme producteur du registre des artefacts (durée, fichiers écrits)
+        et, avec `profil`, sous la mesure du profileur (temps, mémoire, lignes en entrée).
+        """
+        produits = {} if produits is None else produits
+        for nom in noms:
+            t = self.taches[nom]
+            manquants = [e for e in t.entrees if e not in produits]
+            if manquants:
+                raise RuntimeError(f"Bloc {nom} : entrées non disponibles {manquants}")
+            entrees = {e: produits[e] for e in t.entrees}
+
+            mesure = profil.bloc(nom, entrees) if profil is not None else nullcontext({})
+            with ARTEFACTS.producteur(nom), mesure as m:
+                if cache is not None and t.cache:
+                    cle = cache.cle(t, entrees)
+                    res = cache.restaurer(t, cle)
+                    if res is not None:
+                        print(f"OK - Cache : bloc {nom} réutilisé")
+                        m["cache"] = True
+                        ARTEFACTS.restaures(nom, t.sorties)
+                        produits.update(res)
+                        continue
+                    avant = cache.etat_sorties(t)
+                    res = t.fonction(**entrees) or {}
+                    cache.preparer(t, cle, avant, res)
+                else:
+                    res = t.fonction(**entrees) or {}
+            inattendus = set(res) - set(t.produits)
+            if inattendus:
+                raise RuntimeError(f"Bloc {nom} : produits non déclarés {sorted(inattendus)}")
+            produits.update(res)
+        return produits
+
+    def executer_flux(self, noms: Iterable[str], morceaux: Iterable[Any], profil: Profileur | None = None) -> list[str]:
+        """
+        Mode flux : une seule passe sur les morceaux ; chaque bloc streamable agrège
+        chaque morceau, on fusionne, puis on finalise (rendu) une fois à la fin.
+        Renvoie les blocs ignorés (non streamables). Avec `profil` : mesures cumulées sur tous les morceaux.
+        """
+        noms = list(noms)
+        taches = [self.taches[n] for n in noms if self.taches[n].flux is not None]
+        ignores = [n for n in noms if self.taches[n].flux is None]
+        agregats: dict[str, Any] = {t.nom: None for t in taches}
+        for morceau in morceaux:
+            for t in taches:
+                with profil.bloc(t.nom, {"morceau": morceau}) if profil is not None else nullcontext():
+                    part = t.flux[0](morceau)
+                agregats[t.nom] = part if agregats[t.nom] is None else agregats[t.nom].fusionner(part)
+        for t in taches:
+            with ARTEFACTS.producteur(t.nom), profil.bloc(t.nom) if profil is not None else nullcontext():
+                t.flux[1](agregats[t.nom])
+        return ignores
+
+    def decrire(self) -> str:
+        """Résumé texte du graphe (pour --list)."""
+        lignes = []
+        for t in self.taches.values():
+            amont = ", ".join(sorted(self.dependances(t.nom))) or "-"
+            sorties = ", ".join(p.as_posix() for p in t.sorties) or "-"
+            lignes.append(f"[{t.nom}] amont: {amont} | sorties: {sorties}")
+        return "\n".join(lignes)
@@ -0,0 +1,126 @@
+# ============================================================
+# PLAN DE TYPES COMPACTS POUR LE DF DES RÉPONDANTS
+# But : après le chapitre 0, chaque réponse texte était un objet Python
+# (chaîne) et chaque score 1–10 / Likert un float64 ; sur des exports
+# cumulés de plusieurs millions de lignes, la mémoire résidente et les
+# groupby en pâtissaient. Le plan choisit, colonne par colonne :
+# - réponses texte à peu de modalités -> category
+# - échelles 1–10 / Likert / rangs entiers -> Int8 / UInt8 nullables
+#   (décimales "7,5" présentes : float64 conservé)
+# - réponses binaires (0/1, Oui/Non) -> boolean nullable
+# - autres entiers complets (âge, n° d'observation) -> plus petit int numpy
+# et rapporte la mémoire avant / après pour chaque colonne.
+# ============================================================
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+SEUIL_CATEGORIE = 0.5  # au-delà de 50 % de modalités distinctes : texte libre / identifiant, laissé en objet
+OUI_NON = {"oui": True, "non": False}
+
+
+def _entiers(s: pd.Series) -> bool:
+    v = s.dropna().to_numpy(dtype=np.float64)
+    return bool(len(v)) and bool(np.all(v == np.round(v)))
+
+
+def _entier_nullable(s: pd.Series) -> str | None:
+    """Plus petit entier nullable contenant la colonne (Int8, sinon UInt8), None si hors bornes."""
+    mini, maxi = s.min(), s.max()
+    if mini >= -128 and maxi <= 127:
+        return "Int8"
+    if mini >= 0 and maxi <= 255:
+        return "UInt8"
+    return None
+
+
+def _binaire(s: pd.Series, valeurs: np.ndarray) -> bool:
+    """`valeurs` : modalités distinctes non manquantes de `s`."""
+    if len(valeurs) != 2:
+        return False
+    if s.dtype.kind in "iuf":
+        return set(valeurs.tolist()) == {0, 1}
+    return {str(v).strip().lower() for v in valeurs} == set(OUI_NON)
+
+
+def planifier_types(
+    df: pd.DataFrame,
+    echelles: Iterable[str] = (),
+    garder_texte: Iterable[str] = (),
+    seuil_categorie: float = SEUIL_CATEGORIE,
+) -> dict[str, tuple[str, str]]:
+    """
+    Colonne -> (type cible, règle). `echelles` : scores ordinaux (1–10, Likert, rangs) ;
+    `garder_texte` : colonnes relues comme libellés (jamais converties en booléen).
+    Colonnes déjà compactes (bool, category, entiers ≤ 8 bits) et colonnes non concernées : absentes du plan.
+    """
+    echelles, garder_texte = set(echelles), set(garder_texte)
+    plan: dict[str, tuple[str, str]] = {}
+    for c in df.columns:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype) or s.dtype.kind == "b" or getattr(s.dtype, "itemsize", 8) == 1:
+            continue
+        numerique = s.dtype.kind in "iuf"
+        if c in echelles and numerique:
+            cible = _entier_nullable(s) if _entiers(s) else None
+            if cible:
+                plan[c] = (cible, "échelle")
+            continue
+        valeurs = pd.unique(s.dropna())  # un seul hachage par colonne : binaire ? peu de modalités ?
+        if c not in echelles and c not in garder_texte and _binaire(s, valeurs):
+            plan[c] = ("boolean", "binaire")
+        elif s.dtype.kind in "iu":
+            cible = str(pd.to_numeric(s, downcast="integer").dtype)
+            if cible != str(s.dtype):
+                plan[c] = (cible, "entier")
+        elif s.dtype == object and len(valeurs) <= seuil_categorie * len(s):
+            plan[c] = ("category", "texte")
+    return plan
+
+
+def appliquer_types(df: pd.DataFrame, plan: dict[str, tuple[str, str]]) -> pd.DataFrame:
+    """Copie de df aux types du plan (colonnes hors plan : partagées, pas de copie profonde)."""
+    out = df.copy(deep=False)
+    for c, (cible, regle) in plan.items():
+        if regle == "binaire" and df[c].dtype == object:
+            out[c] = df[c].astype(str).str.strip().str.lower().map(OUI_NON).astype("boolean")
+        elif regle == "échelle" and df[c].dtype.kind == "f":
+            out[c] = df[c].round().astype(cible)  # valeurs déjà entières (vérifié par le plan) : round = sécurité
+        else:
+            out[c] = df[c].astype(cible)
+    return out
+
+
+def rapport_memoire(avant: pd.DataFrame, apres: pd.DataFrame, plan: dict[str, tuple[str, str]]) -> pd.DataFrame:
+    """Une ligne par colonne : type et octets (deep) avant / après, gain (×) et règle appliquée."""
+    octets_avant = avant.memory_usage(deep=True, index=False)
+    # colonnes hors plan : mêmes données (le parcours deep des objets est le poste le plus coûteux)
+    convertis = [c for c in apres.columns if c in plan]
+    octets_apres = octets_avant.copy()
+    octets_apres[convertis] = apres[convertis].memory_usage(deep=True, index=False)
+    r = pd.DataFrame({
+        "colonne": avant.columns,
+        "type_avant": avant.dtypes.astype(str).to_numpy(),
+        "type_apres": apres.dtypes.astype(str).to_numpy(),
+        "octets_avant": octets_avant.to_numpy(),
+        "octets_apres": octets_apres.to_numpy(),
+        "regle": [plan.get(c, ("", "inchangée"))[1] for c in avant.columns],
+    })
+    r["gain"] = (r["octets_avant"] / r["octets_apres"].clip(lower=1)).round(2)
+    return r.sort_values("octets_avant", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def compacter(
+    df: pd.DataFrame,
+    echelles: Iterable[str] = (),
+    garder_texte: Iterable[str] = (),
+    seuil_categorie: float = SEUIL_CATEGORIE,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Plan + application + rapport : (df compact, rapport mémoire par colonne)."""
+    plan = planifier_types(df, echelles, garder_texte, seuil_categorie)
+    compact = appliquer_types(df, plan)
+    return compact, rapport_memoire(df, compact, plan)
@@ -0,0 +1,209 @@
+# ============================================================
+# INGESTION MULTI-VAGUES -> ENTREPÔT COLONNAIRE PARTITIONNÉ
+# But : le même questionnaire est collecté en vagues successives (et en
+# versions légèrement différentes). Chaque export CSV est normalisé une
+# fois (rename_robuste + préparation numérique / Likert), dans un pool de
+# processus (un fichier par tâche), puis écrit comme une partition :
+#   <racine>/vague=<nom>/   (format sauver_frame : .npy par colonne)
+#   <racine>/catalogue.json (source, hash, colonnes et types par vague)
+# Les schémas sont réconciliés à la lecture : union des colonnes standard,
+# colonnes absentes d'une vague = manquantes, conflits de type signalés.
+# Les chapitres ne relisent que les vagues (et colonnes) demandées.
+# ============================================================
+from __future__ import annotations
+
+import glob
+import importlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from pipeline_artefacts import hash_fichier
+from pipeline_donnees import charger_frame, cle_frame, frame_existe, sauver_frame
+
+
+CATALOGUE = "catalogue.json"
+TYPE_VIDE = "vide"  # colonne sans aucune valeur dans une vague (type de stockage non significatif)
+
+
+def nom_vague(path: Path) -> str:
+    """Nom de partition à partir du fichier : "Vague 3 - LaMode.csv" -> "Vague_3_-_LaMode"."""
+    return re.sub(r"[^0-9A-Za-z_.-]+", "_", Path(path).stem).strip("_") or "vague"
+
+
+def lister_sources(sources: str | Path | list[str | Path]) -> list[Path]:
+    """Dossier (tous ses .csv), motif glob ("exports/2024-*.csv") ou liste de fichiers, triés."""
+    if isinstance(sources, (list, tuple)):
+        return sorted({p for s in sources for p in lister_sources(s)})
+    p = Path(sources)
+    if p.is_dir():
+        return sorted(p.glob("*.csv"))
+    return sorted(Path(x) for x in glob.glob(str(sources)))
+
+
+def lire_catalogue(racine: Path) -> dict[str, Any]:
+    chemin = Path(racine) / CATALOGUE
+    if not chemin.exists():
+        return {"vagues": {}}
+    return json.loads(chemin.read_text(encoding="utf-8"))
+
+
+def _ecrire_catalogue(racine: Path, catalogue: dict[str, Any]) -> None:
+    tmp = Path(racine) / (CATALOGUE + ".tmp")
+    tmp.write_text(json.dumps(catalogue, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(Path(racine) / CATALOGUE)  # jamais de catalogue à moitié écrit
+
+
+def _preparateur(module: str, fonction: str) -> Callable[[pd.DataFrame], tuple[pd.DataFrame, dict]]:
+    # nom (module, fonction) plutôt que la fonction : importable dans un processus neuf (spawn)
+    return getattr(importlib.import_module(module), fonction)
+
+
+def _ingerer_fichier(
+    path: str, racine: str, preparer: tuple[str, str], version: str, precedente: str | None,
+) -> dict[str, Any]:
+    """Une vague (exécuté dans un processus du pool) : hash, normalisation, partition. Renvoie son entrée de catalogue."""
+    t0 = time.perf_counter()
+    path = Path(path)
+    sha = hash_fichier(path)
+    cle = cle_frame(sha, version)
+    nom = nom_vague(path)
+    dossier = Path(racine) / f"vague={nom}"
+    if cle == precedente and frame_existe(dossier):
+        return {"vague": nom, "inchangee": True}
+
+    df, mapping = _preparateur(*preparer)(pd.read_csv(path))
+    sauver_frame(df, dossier)
+    meta = json.loads((dossier / "meta.json").read_text(encoding="utf-8"))
+    vides = set(df.columns[df.isna().all()])  # colonne vide dans cette vague : aucun type observé
+    return {
+        "vague": nom,
+        "source": path.as_posix(),
+        "sha256": sha,
+        "cle": cle,
+        "n_lignes": len(df),
+        "colonnes": {c["nom"]: TYPE_VIDE if c["nom"] in vides else c["type"] for c in meta["colonnes"]},
+        "mapping": mapping,
+        "duree_s": round(time.perf_counter() - t0, 3),
+        "inchangee": False,
+    }
+
+
+def ingerer_vagues(
+    sources: str | Path | list[str | Path],
+    racine: Path,
+    preparer: tuple[str, str],
+    version: str,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """
+    Normalise chaque CSV de `sources` dans un pool de `workers` processus (None = un par cœur) et
+    écrit/rafraîchit sa partition. `preparer` = (module, fonction) : df brut -> (df normalisé, mapping).
+    `version` = hash du code de normalisation : une vague dont le CSV et le code n'ont pas changé
+    n'est pas relue. Renvoie le catalogue mis à jour (+ "ingestion" : bilan de cet appel).
+    """
+    racine = Path(racine)
+    fichiers = lister_sources(sources)
+    if not fichiers:
+        raise FileNotFoundError(f"Aucun CSV pour {sources}")
+    noms = [nom_vague(f) for f in fichiers]
+    doublons = sorted({n for n in noms if noms.count(n) > 1})
+    if doublons:
+        raise ValueError(f"Plusieurs fichiers donnent la même vague : {doublons}")
+
+    racine.mkdir(parents=True, exist_ok=True)
+    catalogue = lire_catalogue(racine)
+    args = [
+        (f.as_posix(), racine.as_posix(), preparer, version, catalogue["vagues"].get(n, {}).get("cle"))
+        for f, n in zip(fichiers, noms)
+    ]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(args)))
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        resultats = [_ingerer_fichier(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultats = list(pool.map(_ingerer_fichier, *zip(*args)))
+
+    for r in resultats:
+        if not r.pop("inchangee"):
+            catalogue["vagues"][r.pop("vague")] = r
+    catalogue["schema"] = reconcilier(catalogue)
+    _ecrire_catalogue(racine, catalogue)
+    catalogue["ingestion"] = {
+        "fichiers": len(fichiers),
+        "normalises": sum(1 for r in resultats if "cle" in r),
+        "inchanges": sum(1 for r in resultats if "cle" not in r),
+        "workers": workers,
+        "duree_s": round(time.perf_counter() - t0, 3),
+    }
+    return catalogue
+
+
+def reconcilier(catalogue: dict[str, Any]) -> dict[str, Any]:
+    """
+    Schéma commun : union des colonnes (ordre de première apparition), vagues où chacune manque,
+    et types rencontrés (numerique / texte / objet, ou vide) ; plus d'un type hors "vide" = conflit
+    (concaténé en objet). Une colonne entièrement vide dans une vague ne contredit aucun type.
+    """
+    vagues = list(catalogue["vagues"])
+    colonnes: dict[str, dict[str, Any]] = {}
+    for v in vagues:
+        for c, t in catalogue["vagues"][v]["colonnes"].items():
+            info = colonnes.setdefault(c, {"types": {}, "absente_de": []})
+            info["types"][t] = info["types"].get(t, 0) + 1
+    for c, info in colonnes.items():
+        info["absente_de"] = [v for v in vagues if c not in catalogue["vagues"][v]["colonnes"]]
+        info["conflit"] = len(set(info["types"]) - {TYPE_VIDE}) > 1
+    return colonnes
+
+
+def rapport_schema(catalogue: dict[str, Any], vagues: list[str] | None = None) -> list[str]:
+    """Lignes de diagnostic : vagues retenues, colonnes manquantes selon les vagues, conflits de type."""
+    vagues = list(catalogue["vagues"]) if vagues is None else vagues
+    lignes = [f"- {v} : {catalogue['vagues'][v]['n_lignes']} lignes ({catalogue['vagues'][v]['source']})" for v in vagues]
+    for c, info in catalogue.get("schema", {}).items():
+        absente = [v for v in info["absente_de"] if v in vagues]
+        if absente and len(absente) < len(vagues):
+            lignes.append(f"- colonne {c} absente de : {', '.join(absente)}")
+        if info["conflit"]:
+            lignes.append(f"- colonne {c} : types différents selon les vagues {info['types']}")
+    return lignes
+
+
+def charger_entrepot(
+    racine: Path, vagues: list[str] | None = None, colonnes: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Concatène les partitions demandées (toutes si None), éventuellement seulement certaines colonnes.
+    Colonnes absentes d'une vague -> manquantes ; lignes étiquetées Vague / Source (catégorielles).
+    """
+    racine = Path(racine)
+    catalogue = lire_catalogue(racine)
+    disponibles = list(catalogue["vagues"])
+    vagues = disponibles if not vagues else list(vagues)
+    inconnues = [v for v in vagues if v not in catalogue["vagues"]]
+    if inconnues:
+        raise KeyError(f"Vagues absentes de l'entrepôt {racine.as_posix()} : {inconnues} ({', '.join(disponibles)})")
+    if not vagues:
+        raise FileNotFoundError(f"Entrepôt vide : {racine.as_posix()} (voir --ingest)")
+
+    morceaux = []
+    for v in vagues:
+        d = charger_frame(racine / f"vague={v}", colonnes)
+        d["Vague"] = v
+        d["Source"] = Path(catalogue["vagues"][v]["source"]).name
+        morceaux.append(d)
+    df = pd.concat(morceaux, ignore_index=True, sort=False)
+    df["Vague"] = pd.Categorical(df["Vague"], categories=vagues)
+    df["Source"] = df["Source"].astype("category")
+    return df
@@ -7,125 +7,55 @@
 from __future__ import annotations
 
 from pathlib import Path
-import re
-import unicodedata
 import warnings
 
 import numpy as np
 import pandas as pd
 
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-from matplotlib.patches import Rectangle
-
-from cycler import cycler
-
-import plotly.graph_objects as go
-
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.tree import DecisionTreeClassifier, plot_tree
-from sklearn.decomposition import PCA
-
-import seaborn as sns
-
 import os
-
-
-# [0B] Palette cerulean + colormap cerulean
-PALETTE = {
-    "CERULEAN_DARK":  "#005B82",  # cerulean foncé
-    "CERULEAN":       "#007BA7",  # cerulean classic
-    "CERULEAN_LIGHT": "#4FB6E1",  # clair
-    "CERULEAN_SOFT":  "#A7D8F0",  # très clair
-    "NAVY":           "#083D5B",  # contraste bleu nuit
-    "GRID":           "#D6EAF5",  # grid léger bleu
-    "GRIS_CLAIR":     "#E9ECEF",
-    "NOIR":           "#0B1D26",
-}
-
-CERULEAN_CMAP = mcolors.LinearSegmentedColormap.from_list(
-    "cerulean_cmap",
-    ["#F3FBFF", PALETTE["CERULEAN_SOFT"], PALETTE["CERULEAN_LIGHT"], PALETTE["CERULEAN"], PALETTE["CERULEAN_DARK"]],
-    N=256
+import argparse
+import inspect
+import json
+
+from pipeline_taches import RegistreTaches
+from pipeline_schema import RegistreSchema, norm_text, regle
+from pipeline_multichoix import MultiHot, encoder_multi, encoder_simple, flux_sankey
+from pipeline_artefacts import ARTEFACTS, ecrire_csv, ecrire_texte, hash_fichier
+from pipeline_cache import CacheArtefacts
+from pipeline_profilage import NIVEAUX, Profileur, niveau_par_defaut
+from pipeline_kmeans import balayer_k
+from pipeline_matrices import MagasinMatrices, MatriceFeatures, projeter_pca
+from pipeline_derives import SOURCES as SOURCES_DERIVES, MagasinDerives
+from pipeline_cube import Cube, construire_cube
+from pipeline_vagues import charger_entrepot, ingerer_vagues, lire_catalogue, rapport_schema
+from pipeline_types import compacter
+from pipeline_personas import (
+    MODELE_PERSONAS_PATH, ETAT_INCREMENTAL_PATH, ModelePersonas, EtatIncremental, apparier_clusters, charger_si_existe,
+    score_respondents,
 )
+from pipeline_donnees import (
+    FRAMES_DIR, cle_frame, sauver_frame, charger_frame, frame_existe,
+    Agregats, lire_par_morceaux, moments, moyenne, decoder_par_modalite, safe_to_numeric, texte_ou_defaut,
+)
+from pipeline_rendu import (
+    PALETTE, plt, export_png,
+    rendre, demarrer_rendu_parallele, terminer_rendu_parallele,
+    rendu_grand_paradoxe, rendu_paradoxe_par_age, rendu_paradoxe_par_canal, rendu_boxplot_culpabilite,
+    rendu_hexbin, rendu_reseau_items, rendu_waffle, rendu_pca, rendu_heatmap_items, rendu_obsolescence,
+    rendu_fastfashion_par_cluster, rendu_carte_renoncements, rendu_dist_influence,
+    rendu_fastfashion_selon_influence, rendu_correlations, rendu_fin_de_vie_par_frequence, rendu_barh_counts,
+)
+
 
-# [0C] Design system
-def apply_design_system() -> None:
-    """Applique un thème global Matplotlib cohérent (à appeler une seule fois au début)."""
-    plt.rcParams.update({
-        # canvas
-        "figure.facecolor": "white",
-        "axes.facecolor": "white",
-
-        # contours & texte
-        "axes.edgecolor": PALETTE["CERULEAN_DARK"],
-        "axes.labelcolor": PALETTE["CERULEAN_DARK"],
-        "text.color": PALETTE["CERULEAN_DARK"],
-        "xtick.color": PALETTE["CERULEAN_DARK"],
-        "ytick.color": PALETTE["CERULEAN_DARK"],
-
-        # grid “soft”
-        "axes.grid": True,
-        "grid.color": PALETTE["GRID"],
-        "grid.linestyle": "-",
-        "grid.linewidth": 0.8,
-
-        # typographie (simple mais propre)
-        "axes.titlesize": 18,
-        "axes.titleweight": "bold",
-        "axes.labelsize": 12,
-        "xtick.labelsize": 11,
-        "ytick.labelsize": 11,
-
-        # légende
-        "legend.frameon": True,
-        "legend.framealpha": 0.95,
-        "legend.edgecolor": PALETTE["GRID"],
-    })
-
-    # cycle de couleurs (évite couleurs random)
-    plt.rcParams["axes.prop_cycle"] = cycler(color=[
-        PALETTE["CERULEAN_DARK"],
-        PALETTE["CERULEAN"],
-        PALETTE["CERULEAN_LIGHT"],
-        PALETTE["NAVY"],
-    ])
-
-def set_editorial_axes(ax: plt.Axes, title: str | None = None, xlabel: str | None = None, ylabel: str | None = None) -> None:
-    """Uniformise un axe (respiration + style)."""
-    if title:
-        ax.set_title(title, pad=18, fontweight="bold")
-    if xlabel is not None:
-        ax.set_xlabel(xlabel)
-    if ylabel is not None:
-        ax.set_ylabel(ylabel)
-
-    # enlève le “cadre” trop lourd en haut/droite
-    ax.spines["top"].set_visible(False)
-    ax.spines["right"].set_visible(False)
-
-    # grid légère uniquement en y (souvent plus chic)
-    ax.grid(True, axis="y", alpha=0.35)
-    ax.grid(False, axis="x")
-
-    # marge interne (évite éléments collés)
-    ax.margins(x=0.05, y=0.08)
-
-
-def export_png(path: Path) -> None:
-    """Export propre: marges + bbox pour éviter titres collés."""
-    # IMPORTANT: tight_layout AVANT savefig
-    plt.tight_layout(pad=1.6)
-    plt.savefig(path, dpi=240, bbox_inches="tight")
-    plt.close()
-
-
-# applique le design system une fois
-apply_design_system()
+# [0B]/[0C] Palette cerulean + design system + fonctions de rendu : voir pipeline_rendu.py
+# matplotlib (design system appliqué au chargement), plotly et scikit-learn sont importés par
+# les blocs qui s'en servent : voir pipeline_imports.py
 
 # [0D] Paths / outputs
 DATA_PATH = Path("data") / "La mode - LaMode.csv"
+ENTREPOT_DIR = Path("data") / "entrepot"  # vagues normalisées (--ingest), voir pipeline_vagues.py
+VAGUES = None         # --vagues : liste de vagues de l'entrepôt à la place de DATA_PATH ([] = toutes)
+VAGUES_WORKERS = None  # --ingest : processus du pool (None = un par cœur)
 
 OUT_DIR = Path("reports")
 FIG_DIR = OUT_DIR / "figures"
@@ -133,42 +63,52 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
 RANDOM_STATE = 42
+SEUIL_ETHIQUE = 7  # "souci éthique élevé" = Souci_Ethique >= 7 (chapitre 1)
+
+# registre des blocs (DAG) : chaque bloc ci-dessous est déclaré via @tache(...)
+TACHES = RegistreTaches()
+tache = TACHES.tache
+
+# matrices de features (imputées / standardisées) partagées entre modèles : voir pipeline_matrices.py
+MATRICES = MagasinMatrices()
+
+# [0E] Helpers texte/nombre (safe_to_numeric : voir pipeline_donnees.py)
+
+# dictionnaires texte -> nombre (1er mot-clé trouvé dans le texte normalisé)
+LIKERT_FR = {
+    "jamais": 1,
+    "rarement": 2,
+    "parfois": 3,
+    "souvent": 4,
+    "toujours": 5,
+    "pas du tout": 1,
+    "peu": 2,
+    "assez": 3,
+    "beaucoup": 4,
+    "enormement": 5,
+    "énormément": 5,
+}
 
-# [0E] Helpers texte/nombre
-def norm_text(s: str) -> str:
-    s = str(s)
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.lower()
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-
-def safe_to_numeric(series: pd.Series) -> pd.Series:
-    # gère virgules FR "7,5"
-    s = series.astype(str).str.replace(",", ".", regex=False)
-    return pd.to_numeric(s, errors="coerce")
-
-
-from pandas.api.types import is_string_dtype
-def map_likert_fr_to_num(series: pd.Series) -> pd.Series:
-    if not is_string_dtype(series):
-        return series
-
-    m = {
-        "jamais": 1,
-        "rarement": 2,
-        "parfois": 3,
-        "souvent": 4,
-        "toujours": 5,
-        "pas du tout": 1,
-        "peu": 2,
-        "assez": 3,
-        "beaucoup": 4,
-        "enormement": 5,
-        "énormément": 5,
-    }
+# ordinaux : rang croissant (1 = achète le moins souvent / garde-robe la plus courte)
+ORDINAUX = {
+    "Frequence_Achat": {
+        "moins d'une fois par an": 1,
+        "une fois par an": 2,
+        "4 a 6 mois": 3,
+        "2 a 3 mois": 4,
+        "une fois par mois": 5,
+        "semaine": 6,
+    },
+    "Duree_Vie_GardeRobe": {
+        "moins de 6 mois": 1,
+        "6 mois a 1 an": 2,
+        "1 a 5 ans": 3,
+        "plus de 5 ans": 4,
+    },
+}
 
+def decoder_texte(series: pd.Series, regles: dict[str, int]) -> pd.Series:
+    """Texte FR -> nombre (nombre écrit, sinon 1er mot-clé de `regles`), une fois par modalité."""
     def conv(x):
         if pd.isna(x):
             return np.nan
@@ -177,142 +117,125 @@ def map_likert_fr_to_num(series: pd.Series) -> pd.Series:
             return float(t)
         except ValueError:
             pass
-        for k, v in m.items():
+        for k, v in regles.items():
             if k in t:
                 return float(v)
         return np.nan
-    return series.apply(conv)
+    return decoder_par_modalite(series, lambda u: u.apply(conv))
 
-# [0F] Détection / renommage robuste
-def rename_robuste(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
-    mapping: dict[str, str] = {}
-    cols_norm = {c: norm_text(c) for c in df.columns}
 
-    def pick_col(predicate) -> str | None:
-        for c, nc in cols_norm.items():
-            if predicate(nc):
-                return c
-        return None
+from pandas.api.types import is_string_dtype
+def map_likert_fr_to_num(series: pd.Series) -> pd.Series:
+    if not is_string_dtype(series):
+        return series
+    return decoder_texte(series, LIKERT_FR)
 
+# [0F] Détection / renommage robuste
+# Règles du registre de schéma (pipeline_schema.py) : "frag1 & frag2 & !exclu", "=texte exact".
+# Fragments comparés aux en-têtes normalisés (minuscules, sans accents).
+SCHEMA = RegistreSchema([
     # --- profil
-    c = pick_col(lambda nc: "quel est votre age" in nc or nc == "age" or "age ?" in nc)
-    if c: mapping[c] = "Age"
-
-    c = pick_col(lambda nc: "etes-vous" in nc or "êtes-vous" in nc)
-    if c: mapping[c] = "Genre"
-
-    c = pick_col(lambda nc: "situation professionnelle" in nc and "precisez" not in nc)
-    if c: mapping[c] = "Situation_Pro"
+    regle("Age", ["quel est votre age", "=age", "age ?"]),
+    regle("Genre", ["etes-vous"]),
+    regle("Situation_Pro", ["situation professionnelle & !precisez"]),
 
     # --- parcours d'achat
-    c = pick_col(lambda nc: "tous les combien de temps achetez" in nc or ("frequence" in nc and "achetez" in nc))
-    if c: mapping[c] = "Frequence_Achat"
-
-    c = pick_col(lambda nc: "ou achetez-vous" in nc or "où achetez-vous" in nc)
-    if c: mapping[c] = "Canal_Achat"
-
-    c = pick_col(lambda nc: ("cycle de vie moyen" in nc and "garde-robe" in nc) or ("cycle de vie moyen" in nc))
-    if c: mapping[c] = "Duree_Vie_GardeRobe"
-
-    c = pick_col(lambda nc: ("que faites-vous le plus souvent" in nc and "vous separer" in nc) or ("recycle" in nc and "jette" in nc))
-    if c: mapping[c] = "Destination_Fin_Vie"
-
-    c = pick_col(lambda nc: "apres avoir achete" in nc and "jamais portes" in nc or "jamais etre portes" in nc)
-    if c: mapping[c] = "Vetements_Jamais_Portes"
+    regle("Frequence_Achat", ["tous les combien de temps achetez", "frequence & achetez"]),
+    regle("Canal_Achat", ["ou achetez-vous"]),
+    regle("Duree_Vie_GardeRobe", ["cycle de vie moyen"]),
+    regle("Destination_Fin_Vie", ["que faites-vous le plus souvent & vous separer", "recycle & jette"]),
+    regle("Vetements_Jamais_Portes", ["apres avoir achete & jamais portes", "jamais etre portes"]),
 
     # --- matrice importance
-    def pick_importance(keyword: str) -> str | None:
-        return pick_col(lambda nc: "caracteristiques suivantes" in nc and keyword in nc)
-
-    c = pick_importance("prix")
-    if c: mapping[c] = "Importance_Prix"
-    c = pick_importance("qualite")
-    if c: mapping[c] = "Importance_Qualite"
-    c = pick_importance("marque")
-    if c: mapping[c] = "Importance_Marque"
-    c = pick_importance("confort")
-    if c: mapping[c] = "Importance_Confort"
-    c = pick_importance("mode")
-    if c: mapping[c] = "Importance_Tendance"
-    if not any(v == "Importance_Tendance" for v in mapping.values()):
-        c = pick_importance("tendance")
-        if c: mapping[c] = "Importance_Tendance"
+    regle("Importance_Prix", ["caracteristiques suivantes & prix"]),
+    regle("Importance_Qualite", ["caracteristiques suivantes & qualite"]),
+    regle("Importance_Marque", ["caracteristiques suivantes & marque"]),
+    regle("Importance_Confort", ["caracteristiques suivantes & confort"]),
+    # "mode" d'abord, "tendance" seulement si aucune colonne "mode"
+    regle("Importance_Tendance", ["caracteristiques suivantes & mode"], ["caracteristiques suivantes & tendance"]),
 
     # --- influence & psycho
-    c = pick_col(lambda nc: "tendances actuelles" in nc and "influenc" in nc)
-    if c: mapping[c] = "Influence_Tendances"
-
-    c = pick_col(lambda nc: "reseaux sociaux" in nc and ("dict" in nc or "influenc" in nc))
-    if c: mapping[c] = "Influence_Reseaux"
-
-    c = pick_col(lambda nc: "pression sociale" in nc)
-    if c: mapping[c] = "Pression_Sociale"
-
-    c = pick_col(lambda nc: ("evite" in nc and "plus a la mode" in nc) or ("evité" in nc and "plus a la mode" in nc))
-    if c: mapping[c] = "Peur_Etre_Demode"
-
-    c = pick_col(lambda nc: "confiance en vous" in nc or ("vetements" in nc and "confiance" in nc))
-    if c: mapping[c] = "Impact_Confiance"
-
-    c = pick_col(lambda nc: "culpabil" in nc)
-    if c: mapping[c] = "Sentiment_Culpabilite"
+    regle("Influence_Tendances", ["tendances actuelles & influenc"]),
+    regle("Influence_Reseaux", ["reseaux sociaux & dict", "reseaux sociaux & influenc"]),
+    regle("Pression_Sociale", ["pression sociale"]),
+    regle("Peur_Etre_Demode", ["evite & plus a la mode"]),
+    regle("Impact_Confiance", ["confiance en vous", "vetements & confiance"]),
+    regle("Sentiment_Culpabilite", ["culpabil"]),
 
     # --- fast fashion
-    c = pick_col(lambda nc: "concept de" in nc and "fast fashion" in nc)
-    if c: mapping[c] = "Connaissance_FastFashion"
-
-    c = pick_col(lambda nc: ("avez-vous deja consomme" in nc or "avez-vous déjà consommé" in nc)
-                          and ("fast fashion" in nc)
-                          and ("shein" in nc or "temu" in nc or "plateforme" in nc))
-    if c: mapping[c] = "Utilise_FastFashion"
-
-    c = pick_col(lambda nc: "raisons achetez-vous" in nc and "fast fashion" in nc)
-    if c: mapping[c] = "Motivations_FastFashion"
+    regle("Connaissance_FastFashion", ["concept de & fast fashion"]),
+    regle("Utilise_FastFashion", [
+        "avez-vous deja consomme & fast fashion & shein",
+        "avez-vous deja consomme & fast fashion & temu",
+        "avez-vous deja consomme & fast fashion & plateforme",
+    ]),
+    regle("Motivations_FastFashion", ["raisons achetez-vous & fast fashion"]),
 
     # --- articles achetés (choix multiples)
-    c = pick_col(lambda nc:
-        ("acheté certains de ces articles" in nc)
-        or ("achete certains de ces articles" in nc)
-        or ("certains de ces articles" in nc and "choix" in nc)
-    )
-    if c:
-        mapping[c] = "Type_Articles_Achetes"
-
+    regle("Type_Articles_Achetes", ["achete certains de ces articles", "certains de ces articles & choix"]),
 
     # --- éthique / prix
-    c = pick_col(lambda nc: "considerations ethique" in nc or ("ethique" in nc and "environnement" in nc))
-    if c: mapping[c] = "Souci_Ethique"
-
-    c = pick_col(lambda nc: "20 %" in nc and ("pret" in nc or "prêt" in nc))
-    if c: mapping[c] = "Pret_A_Payer_Plus"
-
-    df2 = df.rename(columns=mapping)
-    return df2, mapping
-
-
-# [0G] Chargement + rename + anti-duplicats + diagnostic
-if not DATA_PATH.exists():
-    raise FileNotFoundError(f"CSV introuvable : {DATA_PATH.resolve()}")
-
-df_raw = pd.read_csv(DATA_PATH)
-df, mapping = rename_robuste(df_raw)
+    regle("Souci_Ethique", ["considerations ethique", "ethique & environnement"]),
+    regle("Pret_A_Payer_Plus", ["20 % & pret"]),
+])
 
-# corrige colunas duplicadas (ex: Canal_Achat que virou DataFrame)
-df = df.loc[:, ~df.columns.duplicated()].copy()
-
-
-print("OK - Données chargées.")
-print(f"Dimensions : {df.shape[0]} lignes × {df.shape[1]} colonnes")
-
-# Diagnostic exporté
-diag_lines = ["=== DIAGNOSTIC COLONNES (original -> standard) ==="]
-for k, v in mapping.items():
-    diag_lines.append(f"- {k}  -->  {v}")
-(OUT_DIR / "diagnostic_colonnes.txt").write_text("\n".join(diag_lines), encoding="utf-8")
-print("OK - Diagnostic exporté : reports/diagnostic_colonnes.txt")
-
-
-# [0H] Préparation numérique (num_10 + likert_5)
+def rename_robuste(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    mapping = SCHEMA.resoudre(df.columns).mapping
+    return df.rename(columns=mapping), mapping
+
+
+# [0G] Détection des colonnes (en-tête seul) + diagnostic
+@tache("0G", produits=("mapping", "source"), cache=False, sorties=(OUT_DIR / "diagnostic_colonnes.txt",))
+def bloc_0g_detection_colonnes() -> dict:
+    if VAGUES is not None:
+        return detection_entrepot()
+    if not DATA_PATH.exists():
+        raise FileNotFoundError(f"CSV introuvable : {DATA_PATH.resolve()}")
+
+    # le schéma ne regarde que les noms de colonnes : pas besoin de lire les lignes
+    resolution = SCHEMA.resoudre(pd.read_csv(DATA_PATH, nrows=0).columns)
+    mapping = resolution.mapping
+    for nom in resolution.non_trouves:
+        warnings.warn(f"Colonne standard introuvable : {nom}")
+    source = {"path": DATA_PATH.as_posix(), "sha256": hash_fichier(DATA_PATH)}
+
+    # Diagnostic exporté
+    diag_lines = ["=== DIAGNOSTIC COLONNES (original -> standard) ==="]
+    for k, v in mapping.items():
+        diag_lines.append(f"- {k}  -->  {v}")
+    rapport = resolution.rapport()
+    if rapport:
+        diag_lines += ["", "=== RÉSOLUTION (ambiguïtés / règles sans colonne) ==="] + rapport
+    ecrire_texte(OUT_DIR / "diagnostic_colonnes.txt", "\n".join(diag_lines))
+    print("OK - Diagnostic exporté : reports/diagnostic_colonnes.txt")
+    return {"mapping": mapping, "source": source}
+
+
+def detection_entrepot() -> dict:
+    """0G en mode --vagues : colonnes déjà standardisées à l'ingestion ; diagnostic = réconciliation des vagues."""
+    catalogue = lire_catalogue(ENTREPOT_DIR)
+    vagues = VAGUES or list(catalogue["vagues"])
+    inconnues = [v for v in vagues if v not in catalogue["vagues"]]
+    if inconnues or not vagues:
+        raise FileNotFoundError(f"Vagues absentes de {ENTREPOT_DIR.as_posix()} : {inconnues or 'aucune'} "
+                                f"(disponibles : {', '.join(catalogue['vagues']) or '-'} ; voir --ingest)")
+    mapping = {}
+    for v in vagues:
+        mapping.update(catalogue["vagues"][v]["mapping"])
+    source = {"entrepot": ENTREPOT_DIR.as_posix(), "vagues": {v: catalogue["vagues"][v]["sha256"] for v in vagues}}
+
+    diag_lines = ["=== DIAGNOSTIC COLONNES (original -> standard, toutes vagues retenues) ==="]
+    for k, v in mapping.items():
+        diag_lines.append(f"- {k}  -->  {v}")
+    diag_lines += ["", f"=== VAGUES ({len(vagues)}) ET RÉCONCILIATION DES SCHÉMAS ==="] + rapport_schema(catalogue, vagues)
+    ecrire_texte(OUT_DIR / "diagnostic_colonnes.txt", "\n".join(diag_lines))
+    print(f"OK - Entrepôt : {len(vagues)} vagues ({', '.join(vagues)}) — diagnostic : reports/diagnostic_colonnes.txt")
+    return {"mapping": mapping, "source": source}
+
+
+# [0H] Chargement + anti-duplicats + préparation numérique (num_10 + likert_5)
+# Le df normalisé est mis en cache colonnaire (.cache/pipeline/frames/<clé>) :
+# clé = hash du CSV brut + mapping + code de normalisation.
 num_10 = [
     "Souci_Ethique", "Pret_A_Payer_Plus",
     "Influence_Tendances", "Influence_Reseaux",
@@ -321,18 +244,139 @@ num_10 = [
     "Sentiment_Culpabilite",
 ]
 
-for c in num_10:
-    if c in df.columns:
-        df[c] = safe_to_numeric(df[c])
-
 likert_5 = ["Pression_Sociale", "Peur_Etre_Demode", "Vetements_Jamais_Portes"]
-for c in likert_5:
-    if c in df.columns:
-        df[c] = map_likert_fr_to_num(df[c])
 
-print("=== COLONNES DISPONIBLES ===")
-for c in df.columns:
-    print("-", c)
+CACHE_FRAME = True  # désactivé par --no-cache
+
+def normaliser(df_raw: pd.DataFrame, mapping: dict) -> pd.DataFrame:
+    # le registre de schéma garantit un mapping sans doublon de colonnes
+    df = df_raw.rename(columns=mapping)
+
+    for c in num_10:
+        if c in df.columns:
+            df[c] = safe_to_numeric(df[c])
+
+    for c in likert_5:
+        if c in df.columns:
+            df[c] = map_likert_fr_to_num(df[c])
+
+    # ordinaux texte -> rang (colonne texte d'origine conservée)
+    for c, regles in ORDINAUX.items():
+        if c in df.columns:
+            df[f"{c}_Rang"] = decoder_texte(df[c], regles)
+    return df
+
+def version_normalisation() -> list:
+    """Paramètres + code de la normalisation : font partie des clés du cache colonnaire et de l'entrepôt."""
+    return [
+        num_10, likert_5, LIKERT_FR, ORDINAUX,
+        *(inspect.getsource(f) for f in (
+            normaliser, rename_robuste, safe_to_numeric, map_likert_fr_to_num, decoder_texte,
+            decoder_par_modalite, norm_text,
+        )),
+    ]
+
+def preparer_vague(df_raw: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """Un export brut -> (df normalisé, mapping) ; appelé par les processus de --ingest."""
+    _, mapping = rename_robuste(df_raw.iloc[:0])
+    return normaliser(df_raw, mapping), mapping
+
+# Plan de types compacts (voir pipeline_types.py) : category / Int8 / boolean, appliqué au df chargé
+# (après le cache colonnaire et l'entrepôt, qui gardent les types de la normalisation)
+TYPES_COMPACTS = True  # désactivé par --no-compact
+
+def compaction_types(df: pd.DataFrame) -> pd.DataFrame:
+    echelles = [*num_10, *likert_5, *(f"{c}_Rang" for c in ORDINAUX)]
+    # colonnes relues comme libellés (décodage FF, dimensions du cube, multi-choix, alias du chapitre 10)
+    libelles = {*SOURCES_DERIVES, *CUBE_DIMENSIONS, *MULTI_CHOIX, *SCHEMA_ANNEXES.resoudre(df.columns).choix.values()}
+    compact, rapport = compacter(df, echelles, libelles)
+    ecrire_csv(rapport, OUT_DIR / "types_memoire.csv", index=False)
+    avant, apres = int(rapport["octets_avant"].sum()), int(rapport["octets_apres"].sum())
+    print(f"OK - Types compacts : {avant / 1e6:.2f} Mo -> {apres / 1e6:.2f} Mo (× {avant / max(apres, 1):.1f}), "
+          f"{int((rapport['regle'] != 'inchangée').sum())} colonnes converties ; reports/types_memoire.csv")
+    return compact
+
+@tache("0H", entrees=("mapping", "source"), produits=("df",), cache=False)
+def bloc_0h_chargement(mapping: dict, source: dict) -> dict:
+    if "vagues" in source:
+        # partitions déjà normalisées (--ingest) : seulement les vagues retenues
+        df = charger_entrepot(ENTREPOT_DIR, list(source["vagues"]))
+        print(f"OK - Données chargées (entrepôt, {len(source['vagues'])} vagues).")
+    else:
+        cle = cle_frame(source["sha256"], mapping, *version_normalisation())
+        dossier = FRAMES_DIR / cle
+        if CACHE_FRAME and frame_existe(dossier):
+            df = charger_frame(dossier)
+            print(f"OK - Données chargées (cache colonnaire {cle[:8]}).")
+        else:
+            df = normaliser(pd.read_csv(source["path"]), mapping)
+            if CACHE_FRAME:
+                sauver_frame(df, dossier)
+            print("OK - Données chargées.")
+    if TYPES_COMPACTS:
+        df = compaction_types(df)
+    print(f"Dimensions : {df.shape[0]} lignes × {df.shape[1]} colonnes")
+
+    print("=== COLONNES DISPONIBLES ===")
+    for c in df.columns:
+        print("-", c)
+    return {"df": df}
+
+
+# [0I] Encodage multi-hot des questions à choix multiples (une fois pour tous les blocs)
+MULTI_CHOIX = ["Canal_Achat", "Destination_Fin_Vie", "Type_Articles_Achetes", "Motivations_FastFashion"]
+
+@tache("0I", entrees=("df",), produits=("multichoix",), colonnes=tuple(MULTI_CHOIX))
+def bloc_0i_multichoix(df: pd.DataFrame) -> dict:
+    multichoix = {c: encoder_multi(df[c], sep=";") for c in MULTI_CHOIX if c in df.columns}
+    for c, enc in multichoix.items():
+        print(f"OK - Multi-choix {c} : {len(enc.vocabulaire)} modalités, {enc.matrice.nnz} réponses cochées")
+    return {"multichoix": multichoix}
+
+
+# [0J] Indicateurs dérivés (FF, Ethique_Haute, Paradoxe, Age_Groupe, échelles 1–10) : une définition
+# pour tous les chapitres, recalculée seulement si les colonnes sources changent (voir pipeline_derives.py)
+ECHELLES_DERIVEES = [
+    "Influence_Reseaux", "Influence_Tendances", "Pression_Sociale", "Peur_Etre_Demode",
+    "Impact_Confiance", "Sentiment_Culpabilite",
+]
+DERIVES = MagasinDerives(seuil_ethique=SEUIL_ETHIQUE, echelles=ECHELLES_DERIVEES)
+
+@tache("0J", entrees=("df",), produits=("derives",), cache=False,
+       params={"seuil_ethique": SEUIL_ETHIQUE}, colonnes=(*SOURCES_DERIVES, *ECHELLES_DERIVEES))
+def bloc_0j_derives(df: pd.DataFrame) -> dict:
+    derives = DERIVES.obtenir(df)
+    types = ", ".join(sorted(set(derives.dtypes.astype(str))))
+    print(f"OK - Indicateurs dérivés : {len(derives.columns)} colonnes ({types})")
+    return {"derives": derives}
+
+
+# [0K] Cube d'agrégats (voir pipeline_cube.py) : comptes / sommes / sommes des carrés pour toutes les
+# combinaisons de dimensions jusqu'à CUBE_ORDRE, en une passe ; les figures y lisent taux et moyennes
+CUBE_ORDRE = 2
+CUBE_DIMENSIONS = ["Age_Groupe", "Frequence_Achat", "FF", "Genre", "Situation_Pro"]
+CUBE_MULTIPLES = ["Canal_Achat", "Destination_Fin_Vie"]
+CUBE_MESURES = ["Paradoxe", "Souci_Ethique", "Sentiment_Culpabilite", "Influence_Reseaux"]
+
+def _colonnes_cube(df: pd.DataFrame, derives: pd.DataFrame, colonnes: list[str]) -> pd.DataFrame:
+    # indicateur dérivé (0J) s'il existe, sinon colonne du df
+    return pd.DataFrame(
+        {c: derives[c] if c in derives.columns else df[c] for c in colonnes if c in derives.columns or c in df.columns},
+        index=df.index,
+    )
+
+@tache("0K", entrees=("df", "derives", "multichoix"), produits=("cube",), params={"ordre": CUBE_ORDRE},
+       colonnes=tuple(dict.fromkeys([*SOURCES_DERIVES, *CUBE_DIMENSIONS, *CUBE_MULTIPLES, *CUBE_MESURES])))
+def bloc_0k_cube(df: pd.DataFrame, derives: pd.DataFrame, multichoix: dict[str, MultiHot]) -> dict:
+    cube = construire_cube(
+        _colonnes_cube(df, derives, CUBE_DIMENSIONS),
+        _colonnes_cube(df, derives, CUBE_MESURES),
+        multiples={q: multichoix[q] for q in CUBE_MULTIPLES if q in multichoix},
+        ordre=CUBE_ORDRE,
+    )
+    print(f"OK - Cube d'agrégats : {len(cube.dimensions)} dimensions, {len(cube.mesures)} mesures, "
+          f"{len(cube.cuboides)} cuboïdes (ordre {cube.ordre}), {cube.taille()} cellules")
+    return {"cube": cube}
 
 
 # ============================================================
@@ -342,25 +386,15 @@ for c in df.columns:
 
 # [1A] Grand Paradoxe (global)
 
-req = ["Souci_Ethique", "Utilise_FastFashion"]
-if all(c in df.columns for c in req):
-    d = df.copy()
-
-    # 1) FastFashion: on force une lecture Oui/Non, sinon NaN -> "Autres"
-    ff_txt = d["Utilise_FastFashion"].astype(str).str.strip().str.lower()
-
-    d["FF"] = np.select(
-        [
-            ff_txt.str.contains(r"\boui\b", na=False),
-            ff_txt.str.contains(r"\bnon\b", na=False),
-        ],
-        [1, 0],
-        default=np.nan
-    )
-
-    # 2) Souci éthique: numeric + seuil
-    d["Souci_Ethique_num"] = pd.to_numeric(d["Souci_Ethique"], errors="coerce")
-    d["Ethique_Haute"] = d["Souci_Ethique_num"] >= 7
+def _agreger_1a(df: pd.DataFrame, derives: pd.DataFrame | None = None) -> Agregats | None:
+    req = ["Souci_Ethique", "Utilise_FastFashion"]
+    if not all(c in df.columns for c in req):
+        return None
+    # 1) FastFashion lu Oui/Non (NA -> "Autres") + 2) Souci éthique >= seuil : indicateurs dérivés (0J)
+    # (en mode flux, calculés sur le morceau)
+    if derives is None:
+        derives = DERIVES.obtenir(df)
+    d = derives[["FF", "Ethique_Haute"]].astype({"FF": "float"})  # FF manquant = NaN : aucun des 4 cas
 
     # 3) Groupes (4 cas) + Autres = seulement si on ne peut pas classer
     d["Comportement"] = "Autres (données manquantes / non interprétables)"
@@ -378,8 +412,19 @@ if all(c in df.columns for c in req):
         "Souci éthique faible, et pas de fast fashion"
     )
 
+    # (Optionnel) debug: voir ce que contient "Autres"
+    # print(df.loc[d["Comportement"].str.startswith("Autres"), "Utilise_FastFashion"].value_counts(dropna=False).head(20))
+    return Agregats(comportements=d["Comportement"].value_counts())
+
+
+def _finaliser_1a(agg: Agregats | None) -> None:
+    if agg is None:
+        warnings.warn("Grand paradoxe ignoré (colonnes manquantes).")
+        return
+
     # 4) Pourcentages + ordre (labels non abrégés)
-    counts = d["Comportement"].value_counts(normalize=True) * 100
+    vc = agg["comportements"]
+    counts = vc / vc.sum() * 100
 
     order = [
         "Souci éthique élevé, mais achat de fast fashion",
@@ -394,185 +439,154 @@ if all(c in df.columns for c in req):
     counts = counts[counts > 0]
 
     # 5) Plot
-    plt.figure(figsize=(12, 6))
-    plt.barh(counts.index, counts.values, edgecolor="black")
-    plt.gca().invert_yaxis()
-    plt.title("Le Grand Paradoxe : discours vs réalité", fontweight="bold")
-    plt.xlabel("%")
-    plt.ylabel("")
-    export_png(FIG_DIR / "grand_paradoxe.png")
+    rendre(rendu_grand_paradoxe, FIG_DIR / "grand_paradoxe.png", counts)
 
-    # (Optionnel) debug: voir ce que contient "Autres"
-    # print(d.loc[d["Comportement"].str.startswith("Autres"), "Utilise_FastFashion"].value_counts(dropna=False).head(20))
 
-else:
-    warnings.warn("Grand paradoxe ignoré (colonnes manquantes).")
+@tache("1A", entrees=("df", "derives"), params={"seuil_ethique": SEUIL_ETHIQUE},
+       colonnes=("Souci_Ethique", "Utilise_FastFashion", "FF", "Ethique_Haute"),
+       sorties=(FIG_DIR / "grand_paradoxe.png",),
+       flux=(_agreger_1a, _finaliser_1a))
+def bloc_1a_grand_paradoxe(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    _finaliser_1a(_agreger_1a(df, derives))
 
 
 # [1B] Grand Paradoxe par âge
 
-req = ["Age", "Souci_Ethique", "Utilise_FastFashion"]
-if all(c in df.columns for c in req):
-    d = df.dropna(subset=["Age", "Souci_Ethique", "Utilise_FastFashion"]).copy()
-    d["FF_Oui"] = d["Utilise_FastFashion"].astype(str).str.contains("oui", case=False, na=False)
-    d["Ethique_Haute"] = d["Souci_Ethique"] >= 7
-    d["Paradoxe"] = (d["Ethique_Haute"] & d["FF_Oui"]).astype(int)
-
-    # buckets simples
-    bins = [0, 18, 24, 34, 44, 54, 64, 120]
-    labels = ["<18", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
-    d["Age_Groupe"] = pd.cut(d["Age"], bins=bins, labels=labels, include_lowest=True)
-
-    grp = d.groupby("Age_Groupe", observed=False)["Paradoxe"].mean() * 100
-    plt.figure(figsize=(10, 5))
-    plt.plot(grp.index.astype(str), grp.values, marker="o")
-    plt.title("Taux de paradoxe (Souci éthique élevé, mais achat de fast fashion) par âge", fontweight="bold")
-    plt.ylabel("% du groupe")
-    plt.xlabel("Groupe d'âge")
-    plt.grid(True, linestyle="--", alpha=0.4)
-    export_png(FIG_DIR / "paradoxe_par_age.png")
-else:
-    warnings.warn("Paradoxe par âge ignoré.")
+def _agreger_1b(df: pd.DataFrame, derives: pd.DataFrame | None = None) -> Agregats | None:
+    req = ["Age", "Souci_Ethique", "Utilise_FastFashion"]
+    if not all(c in df.columns for c in req):
+        return None
+    if derives is None:
+        derives = DERIVES.obtenir(df)
+    # répondants dont les trois réponses sont présentes ; paradoxe et tranches d'âge : indicateurs dérivés (0J)
+    d = derives.loc[df[req].notna().all(axis=1), ["Paradoxe", "Age_Groupe"]]
+    return Agregats(paradoxe=moments(d["Paradoxe"].astype(int), par=d["Age_Groupe"]))
+
+
+def _finaliser_1b(agg: Agregats | None) -> None:
+    if agg is None:
+        warnings.warn("Paradoxe par âge ignoré.")
+        return
+    grp = moyenne(agg["paradoxe"]) * 100
+    rendre(rendu_paradoxe_par_age, FIG_DIR / "paradoxe_par_age.png", grp)
+
+
+@tache("1B", entrees=("df", "derives"), params={"seuil_ethique": SEUIL_ETHIQUE},
+       colonnes=("Age", "Souci_Ethique", "Utilise_FastFashion", "Paradoxe", "Age_Groupe"),
+       sorties=(FIG_DIR / "paradoxe_par_age.png",),
+       flux=(_agreger_1b, _finaliser_1b))
+def bloc_1b_paradoxe_par_age(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    _finaliser_1b(_agreger_1b(df, derives))
 
 
 # [1C] Paradoxe par canal (multi-choix)
 
 # helpers (DEVEM estar aqui, antes do code)
-def split_multi(series: pd.Series, sep=";") -> pd.Series:
-    return series.fillna("").astype(str).apply(
-        lambda x: [t.strip() for t in x.split(sep) if t.strip()]
-    )
-
 def top_n_with_other(series: pd.Series, n=6, other="Autres") -> pd.Series:
     vc = series.value_counts()
     top = set(vc.head(n).index)
     return series.apply(lambda x: x if x in top else other)
 
 
-req = ["Canal_Achat", "Souci_Ethique", "Utilise_FastFashion"]
-if all(c in df.columns for c in req):
-    d = df.dropna(subset=req).copy()
+def _agreger_1c(df: pd.DataFrame, canaux: MultiHot | None = None, derives: pd.DataFrame | None = None) -> Agregats | None:
+    req = ["Canal_Achat", "Souci_Ethique", "Utilise_FastFashion"]
+    if not all(c in df.columns for c in req):
+        return None
+    if derives is None:
+        derives = DERIVES.obtenir(df)
 
-    # paradoxe = dit éthique (>=7) MAIS fast fashion
-    d["FF_Oui"] = d["Utilise_FastFashion"].astype(str).str.contains("oui", case=False, na=False)
-    d["Ethique_Haute"] = d["Souci_Ethique"] >= 7
-    d["Paradoxe"] = (d["Ethique_Haute"] & d["FF_Oui"]).astype(int)
+    # paradoxe = dit éthique (>=7) MAIS fast fashion (indicateur dérivé, 0J)
+    paradoxe = derives.loc[df[req].notna().all(axis=1), "Paradoxe"].astype(int)
 
-    # split multi-choix + explode
-    d["Canal_Achat_list"] = split_multi(d["Canal_Achat"], sep=";")
-    e = d.explode("Canal_Achat_list")
-    e["Canal_Achat_list"] = e["Canal_Achat_list"].astype(str).str.strip()
-    e = e[e["Canal_Achat_list"] != ""]
+    # multi-choix : encodage partagé (0I) ou, en mode flux, celui du morceau
+    if canaux is None:
+        canaux = encoder_multi(df["Canal_Achat"], sep=";")
+
+    # par canal brut : n + somme (le top N ne peut se décider qu'une fois tout agrégé)
+    return Agregats(paradoxe=canaux.sous_ensemble(paradoxe.index).moments(paradoxe))
+
+
+def _finaliser_1c(agg: Agregats | None) -> None:
+    if agg is None:
+        warnings.warn("Paradoxe par canal ignoré (colonnes manquantes).")
+        return
+    m = agg["paradoxe"]
 
     # top canaux + autres
-    e["Canal_Achat_clean"] = top_n_with_other(e["Canal_Achat_list"], n=6, other="Autres")
+    top = set(m["n"].sort_values(ascending=False).head(6).index)
+    m = m.groupby([c if c in top else "Autres" for c in m.index]).sum()
 
     # taux de paradoxe (%)
-    grp = (
-        e.groupby("Canal_Achat_clean")["Paradoxe"]
-        .mean()
-        .mul(100)
-        .sort_values(ascending=False)
-    )
+    grp = moyenne(m).mul(100).sort_values(ascending=False)
 
     # plot lisible
-    plt.figure(figsize=(10, 5))
-    plt.barh(grp.index, grp.values, edgecolor="black")
-    plt.gca().invert_yaxis()
-    plt.title("Paradoxe éthique par canal d'achat", fontweight="bold")
-    plt.xlabel("% (Souci éthique élevé + fast fashion)")
-    export_png(FIG_DIR / "paradoxe_par_canal.png")
+    rendre(rendu_paradoxe_par_canal, FIG_DIR / "paradoxe_par_canal.png", grp)
 
-else:
-    warnings.warn("Paradoxe par canal ignoré (colonnes manquantes).")
 
-# [1D] Culpabilité par paradoxe (boxplot)
-
-req = ["Souci_Ethique", "Utilise_FastFashion", "Sentiment_Culpabilite"]
-if all(c in df.columns for c in req):
-    d = df.dropna(subset=req).copy()
+@tache("1C", entrees=("df", "multichoix", "derives"), params={"seuil_ethique": SEUIL_ETHIQUE},
+       colonnes=("Canal_Achat", "Souci_Ethique", "Utilise_FastFashion", "Paradoxe"),
+       sorties=(FIG_DIR / "paradoxe_par_canal.png",),
+       flux=(_agreger_1c, _finaliser_1c))
+def bloc_1c_paradoxe_par_canal(df: pd.DataFrame, multichoix: dict[str, MultiHot], derives: pd.DataFrame) -> None:
+    _finaliser_1c(_agreger_1c(df, multichoix.get("Canal_Achat"), derives))
 
-    # Fast fashion => bool
-    ff = d["Utilise_FastFashion"].astype(str).str.contains("oui", case=False, na=False)
-    ethique_haute = d["Souci_Ethique"] >= 7
-
-    # Paradoxe = "DIT éthique" ET "consomme FF"
-    d["Paradoxe"] = (ethique_haute & ff).astype(int)
+# [1D] Culpabilité par paradoxe (boxplot)
 
-    # Nettoyage numérique (sécurité)
-    d["Sentiment_Culpabilite"] = pd.to_numeric(d["Sentiment_Culpabilite"], errors="coerce")
-    d = d.dropna(subset=["Sentiment_Culpabilite"])
+@tache("1D", entrees=("df", "derives"), params={"seuil_ethique": SEUIL_ETHIQUE},
+       colonnes=("Souci_Ethique", "Utilise_FastFashion", "Sentiment_Culpabilite", "Paradoxe"),
+       sorties=(FIG_DIR / "boxplot_culpabilite_par_paradoxe.png",))
+def bloc_1d_culpabilite_par_paradoxe(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    req = ["Souci_Ethique", "Utilise_FastFashion", "Sentiment_Culpabilite"]
+    if all(c in df.columns for c in req):
+        garde = df[req].notna().all(axis=1)
+
+        # Paradoxe = "DIT éthique" ET "consomme FF" (indicateur dérivé, 0J)
+        # + nettoyage numérique de la culpabilité (sécurité)
+        d = pd.DataFrame({
+            "Paradoxe": derives.loc[garde, "Paradoxe"].astype(int),
+            "Sentiment_Culpabilite": safe_to_numeric(df.loc[garde, "Sentiment_Culpabilite"]),
+        })
+        d = d.dropna(subset=["Sentiment_Culpabilite"])
 
-    if len(d) >= 10 and d["Paradoxe"].nunique() >= 2:
-        data = [
-            d.loc[d["Paradoxe"] == 1, "Sentiment_Culpabilite"].values,
-            d.loc[d["Paradoxe"] == 0, "Sentiment_Culpabilite"].values,
-        ]
+        if len(d) >= 10 and d["Paradoxe"].nunique() >= 2:
+            data = [
+                d.loc[d["Paradoxe"] == 1, "Sentiment_Culpabilite"].values,
+                d.loc[d["Paradoxe"] == 0, "Sentiment_Culpabilite"].values,
+            ]
 
-        plt.figure(figsize=(10, 5))
-        bp = plt.boxplot(
-            data,
-            labels=["Paradoxe\n(éthique + FF)", "Non-paradoxe"],
-            patch_artist=True,
-            showfliers=False,
-            widths=0.55
-        )
-
-        # Couleurs (ta palette existante)
-        bp["boxes"][0].set_facecolor(PALETTE["CERULEAN_DARK"])
-        bp["boxes"][0].set_edgecolor(PALETTE["CERULEAN_DARK"])
-        bp["boxes"][1].set_facecolor(PALETTE["CERULEAN_LIGHT"])
-        bp["boxes"][1].set_edgecolor(PALETTE["CERULEAN_DARK"])
-
-        for median in bp["medians"]:
-            median.set_color("white")
-            median.set_linewidth(2.2)
-
-        plt.ylim(1, 10)
-        plt.ylabel("Culpabilité (1–10)")
-        plt.title("Culpabilité : paradoxe vs non-paradoxe", fontweight="bold")
-        export_png(FIG_DIR / "boxplot_culpabilite_par_paradoxe.png")
+            rendre(
+                rendu_boxplot_culpabilite, FIG_DIR / "boxplot_culpabilite_par_paradoxe.png",
+                data, ["Paradoxe\n(éthique + FF)", "Non-paradoxe"], "Culpabilité : paradoxe vs non-paradoxe",
+            )
+        else:
+            warnings.warn("Boxplot culpabilité ignoré (pas assez de données / variance).")
     else:
-        warnings.warn("Boxplot culpabilité ignoré (pas assez de données / variance).")
-else:
-    warnings.warn("Boxplot culpabilité ignoré (colonnes manquantes).")
+        warnings.warn("Boxplot culpabilité ignoré (colonnes manquantes).")
 
 
 # [1E] Densité Éthique × Culpabilité (hexbin)
 
-req = ["Souci_Ethique", "Sentiment_Culpabilite"]
-if all(c in df.columns for c in req):
-    d = df.dropna(subset=req).copy()
-
-    d["Souci_Ethique"] = pd.to_numeric(d["Souci_Ethique"], errors="coerce")
-    d["Sentiment_Culpabilite"] = pd.to_numeric(d["Sentiment_Culpabilite"], errors="coerce")
-    d = d.dropna(subset=req)
-
-    if len(d) >= 30:
-        plt.figure(figsize=(10, 6))
-
-        hb = plt.hexbin(
-            d["Souci_Ethique"],
-            d["Sentiment_Culpabilite"],
-            gridsize=20,
-            cmap=CERULEAN_CMAP,   # ton colormap cerulean déjà défini
-            mincnt=1
-        )
-
-        cb = plt.colorbar(hb)
-        cb.set_label("Densité (nombre de réponses)")
-
-        plt.xlim(1, 10)
-        plt.ylim(1, 10)
-        plt.xlabel("Souci éthique (1–10)")
-        plt.ylabel("Culpabilité (1–10)")
-        plt.title("Densité : éthique × culpabilité", fontweight="bold")
-
-        export_png(FIG_DIR / "heatmap_densite_ethique_culpabilite.png")
+@tache("1E", entrees=("df",), colonnes=("Souci_Ethique", "Sentiment_Culpabilite"),
+       sorties=(FIG_DIR / "heatmap_densite_ethique_culpabilite.png",))
+def bloc_1e_densite_ethique_culpabilite(df: pd.DataFrame) -> None:
+    req = ["Souci_Ethique", "Sentiment_Culpabilite"]
+    if all(c in df.columns for c in req):
+        d = df.dropna(subset=req).copy()
+
+        d["Souci_Ethique"] = safe_to_numeric(d["Souci_Ethique"])
+        d["Sentiment_Culpabilite"] = safe_to_numeric(d["Sentiment_Culpabilite"])
+        d = d.dropna(subset=req)
+
+        if len(d) >= 30:
+            rendre(
+                rendu_hexbin, FIG_DIR / "heatmap_densite_ethique_culpabilite.png",
+                d["Souci_Ethique"].to_numpy(), d["Sentiment_Culpabilite"].to_numpy(), 20,
+                "Souci éthique (1–10)", "Culpabilité (1–10)", "Densité : éthique × culpabilité",
+            )
+        else:
+            warnings.warn("Heatmap densité ignorée (pas assez de lignes).")
     else:
-        warnings.warn("Heatmap densité ignorée (pas assez de lignes).")
-else:
-    warnings.warn("Heatmap densité ignorée (colonnes manquantes).")
+        warnings.warn("Heatmap densité ignorée (colonnes manquantes).")
 
 
 # ============================================================
@@ -580,109 +594,65 @@ else:
 # But : transformer “choix individuel” → “chemin structuré”
 # ============================================================
 
-# [2A] Sankey 3 étapes : Fréquence → Canal → Fast fashion
-
-if all(c in df.columns for c in ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion"]):
-    d0 = df[["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion"]].copy()
-
-    # explode Canal_Achat (multi-choix)
-    d0["Canal_Achat_list"] = split_multi(d0["Canal_Achat"], sep=";")
-    d = (
-        d0
-        .explode("Canal_Achat_list")
-        .drop(columns=["Canal_Achat"])   # <- remove a coluna original
-        .rename(columns={"Canal_Achat_list": "Canal_Achat"})
-    )
-    # nettoyer labels + réduire cardinalité
-    d["Frequence_Achat"] = d["Frequence_Achat"].fillna("Non spécifié").astype(str).str.strip()
-    ca = d["Canal_Achat"]
-    if isinstance(ca, pd.DataFrame):
-        ca = ca.bfill(axis=1).iloc[:, 0]
-    d["Canal_Achat"] = ca
-    d["Canal_Achat"] = d["Canal_Achat"].fillna("Non spécifié").astype(str).str.strip()
-    d["Utilise_FastFashion"] = d["Utilise_FastFashion"].fillna("Non spécifié").astype(str).str.strip()
-
-    d["Canal_Achat"] = top_n_with_other(d["Canal_Achat"], n=6, other="Autres canaux")
-    d["Frequence_Achat"] = top_n_with_other(d["Frequence_Achat"], n=6, other="Autres fréquences")
-
-    cols = ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion"]
-    grouped = d.groupby(cols).size().reset_index(name="count")
-
-    labels_list, sources, targets, values = [], [], [], []
-
-    def idx(x: str) -> int:
-        if x not in labels_list:
-            labels_list.append(x)
-        return labels_list.index(x)
+# Sankey : une étape = une question (choix unique ou multi-choix), nœuds = (étape, modalité).
+# Pondéré : chaque répondant pèse 1 au total, même avec plusieurs canaux / destinations cochés.
+SANKEY_PONDERE = True
+
+def etapes_sankey(df: pd.DataFrame, multichoix: dict[str, MultiHot], colonnes: list[str],
+                  autres: dict[str, str]) -> list[MultiHot]:
+    """Une MultiHot par étape (sans réponse = "Non spécifié", top 6 + libellé `autres[c]`)."""
+    etapes = []
+    for c in colonnes:
+        if c in multichoix:
+            e = multichoix[c].sous_ensemble(df.index)
+        else:
+            e = encoder_simple(texte_ou_defaut(df[c]))
+        e = e.avec_vide("Non spécifié")
+        if c in autres:
+            e = e.top_n(6, autres[c])
+        etapes.append(e)
+    return etapes
 
-    for _, r in grouped.iterrows():
-        s = idx(str(r[cols[0]])); t = idx(str(r[cols[1]]))
-        sources.append(s); targets.append(t); values.append(int(r["count"]))
-        s = t; t = idx(str(r[cols[2]]))
-        sources.append(s); targets.append(t); values.append(int(r["count"]))
+def figure_sankey(etapes: list[MultiHot], titre: str, path: Path) -> None:
+    import plotly.graph_objects as go
 
+    labels_list, sources, targets, values = flux_sankey(etapes, pondere=SANKEY_PONDERE)
     fig = go.Figure(data=[go.Sankey(
         node=dict(pad=15, thickness=18, label=labels_list, color=PALETTE["CERULEAN"]),
         link=dict(source=sources, target=targets, value=values)
     )])
-    fig.update_layout(title_text="Parcours consommateur (Sankey nettoyé)", font_size=10)
-    fig.write_html(OUT_DIR / "sankey_parcours_3_etapes.html", include_plotlyjs="cdn")
-    print("OK - Sankey nettoyé : reports/sankey_parcours_3_etapes.html")
+    fig.update_layout(title_text=titre, font_size=10)
+    with ARTEFACTS.ecriture(path):
+        fig.write_html(path, include_plotlyjs="cdn")
 
-# [2B] Sankey 4 étapes : + Destination fin de vie
-if all(c in df.columns for c in ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion", "Destination_Fin_Vie"]):
-    d0 = df[["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion", "Destination_Fin_Vie"]].copy()
-
-    # explode multi-choix
-    d0["Canal_Achat_list"] = split_multi(d0["Canal_Achat"], sep=";")
-    d0["FinVie_list"] = split_multi(d0["Destination_Fin_Vie"], sep=";")
-
-    d = (
-        d0
-        .explode("Canal_Achat_list")
-        .explode("FinVie_list")
-        .drop(columns=["Canal_Achat", "Destination_Fin_Vie"])  # <- remove as originais
-        .rename(columns={"Canal_Achat_list": "Canal_Achat", "FinVie_list": "Destination_Fin_Vie"})
-    )
 
-    # nettoyage + réduction cardinalité
-    d["Frequence_Achat"] = d["Frequence_Achat"].fillna("Non spécifié").astype(str).str.strip()
-    ca = d["Canal_Achat"]
-    if isinstance(ca, pd.DataFrame):
-        ca = ca.bfill(axis=1).iloc[:, 0]
-    d["Canal_Achat"] = ca
-    d["Canal_Achat"] = d["Canal_Achat"].fillna("Non spécifié").astype(str).str.strip()
-    d["Utilise_FastFashion"] = d["Utilise_FastFashion"].fillna("Non spécifié").astype(str).str.strip()
-    d["Destination_Fin_Vie"] = d["Destination_Fin_Vie"].fillna("Non spécifié").astype(str).str.strip()
+# [2A] Sankey 3 étapes : Fréquence → Canal → Fast fashion
 
-    d["Canal_Achat"] = top_n_with_other(d["Canal_Achat"], n=6, other="Autres canaux")
-    d["Frequence_Achat"] = top_n_with_other(d["Frequence_Achat"], n=6, other="Autres fréquences")
-    d["Destination_Fin_Vie"] = top_n_with_other(d["Destination_Fin_Vie"], n=6, other="Autres destinations")
+@tache("2A", entrees=("df", "multichoix"), params={"pondere": SANKEY_PONDERE},
+       colonnes=("Frequence_Achat", "Canal_Achat", "Utilise_FastFashion"),
+       sorties=(OUT_DIR / "sankey_parcours_3_etapes.html",))
+def bloc_2a_sankey_3_etapes(df: pd.DataFrame, multichoix: dict[str, MultiHot]) -> None:
+    cols = ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion"]
+    if all(c in df.columns for c in cols):
+        etapes = etapes_sankey(df, multichoix, cols, autres={
+            "Frequence_Achat": "Autres fréquences", "Canal_Achat": "Autres canaux",
+        })
+        figure_sankey(etapes, "Parcours consommateur (Sankey nettoyé)", OUT_DIR / "sankey_parcours_3_etapes.html")
+        print("OK - Sankey nettoyé : reports/sankey_parcours_3_etapes.html")
 
+# [2B] Sankey 4 étapes : + Destination fin de vie
+@tache("2B", entrees=("df", "multichoix"), params={"pondere": SANKEY_PONDERE},
+       colonnes=("Frequence_Achat", "Canal_Achat", "Utilise_FastFashion", "Destination_Fin_Vie"),
+       sorties=(OUT_DIR / "sankey_cycle_complet_4_etapes.html",))
+def bloc_2b_sankey_4_etapes(df: pd.DataFrame, multichoix: dict[str, MultiHot]) -> None:
     cols = ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion", "Destination_Fin_Vie"]
-    grouped = d.groupby(cols).size().reset_index(name="count")
-
-    labels_list, sources, targets, values = [], [], [], []
-    def idx(x: str) -> int:
-        if x not in labels_list:
-            labels_list.append(x)
-        return labels_list.index(x)
-
-    for _, r in grouped.iterrows():
-        s = idx(str(r[cols[0]])); t = idx(str(r[cols[1]]))
-        sources.append(s); targets.append(t); values.append(int(r["count"]))
-        s = t; t = idx(str(r[cols[2]]))
-        sources.append(s); targets.append(t); values.append(int(r["count"]))
-        s = t; t = idx(str(r[cols[3]]))
-        sources.append(s); targets.append(t); values.append(int(r["count"]))
-
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(pad=15, thickness=18, label=labels_list, color=PALETTE["CERULEAN"]),
-        link=dict(source=sources, target=targets, value=values)
-    )])
-    fig.update_layout(title_text="Cycle complet (Sankey - 4 étapes, nettoyé)", font_size=10)
-    fig.write_html(OUT_DIR / "sankey_cycle_complet_4_etapes.html", include_plotlyjs="cdn")
-    print("OK - Sankey 4 étapes nettoyé : reports/sankey_cycle_complet_4_etapes.html")
+    if all(c in df.columns for c in cols):
+        etapes = etapes_sankey(df, multichoix, cols, autres={
+            "Frequence_Achat": "Autres fréquences", "Canal_Achat": "Autres canaux",
+            "Destination_Fin_Vie": "Autres destinations",
+        })
+        figure_sankey(etapes, "Cycle complet (Sankey - 4 étapes, nettoyé)", OUT_DIR / "sankey_cycle_complet_4_etapes.html")
+        print("OK - Sankey 4 étapes nettoyé : reports/sankey_cycle_complet_4_etapes.html")
 
 
 
@@ -694,64 +664,26 @@ if all(c in df.columns for c in ["Frequence_Achat", "Canal_Achat", "Utilise_Fast
 
 
 # [3A] Réseau / packs de tendances (co-achat des items)
-
-if "Type_Articles_Achetes" in df.columns:
-    items = df["Type_Articles_Achetes"].dropna().astype(str)
-    dummies = items.str.get_dummies(sep=";")
-    if dummies.shape[1] >= 2:
-        corr = dummies.corr()
-
-        # Construire une liste d'arêtes fortes
-        threshold = 0.15
-        edges = []
-        cols = corr.columns.tolist()
-        for i in range(len(cols)):
-            for j in range(i + 1, len(cols)):
-                w = corr.iloc[i, j]
-                if w > threshold:
-                    edges.append((cols[i], cols[j], float(w)))
-
-        # Visualisation "réseau" simple sans networkx :
-        # on place les noeuds sur un cercle, et on trace les liens.
-        nodes = cols
-        n = len(nodes)
-        angles = np.linspace(0, 2*np.pi, n, endpoint=False)
-        pos = {nodes[i]: (np.cos(angles[i]), np.sin(angles[i])) for i in range(n)}
-
-        plt.figure(figsize=(11, 11))
-        # liens
-        for a, b, w in edges:
-            xa, ya = pos[a]
-            xb, yb = pos[b]
-            link_color = PALETTE["CERULEAN"] if w >= 0.30 else PALETTE["CERULEAN_DARK"]
-            plt.plot(
-                [xa, xb],
-                [ya, yb],
-                linewidth=1 + 4*w,
-                 alpha=0.65,
-                color=link_color,
-                zorder=1
-            )
-        # noeuds
-        sizes = (dummies.sum().reindex(nodes).fillna(0).values + 1) * 30
-        xs = [pos[k][0] for k in nodes]
-        ys = [pos[k][1] for k in nodes]
-        plt.scatter(xs, ys, s=sizes, color=PALETTE["CERULEAN"], alpha=0.95, edgecolor="black", linewidth=0.8, zorder=3)
-
-        # labels
-        for k in nodes:
-            x, y = pos[k]
-            plt.text(x*1.18, y*1.18, k.strip(), ha="center", va="center", color= "black", fontsize=12, zorder=4)
-
-        plt.title(f"Packs de tendances (corrélation > {threshold})", fontsize=24, fontweight="bold", pad=22)
-        plt.xlim(-1.35, 1.35)
-        plt.ylim(-1.35, 1.35)
-        plt.axis("off")
-        export_png(FIG_DIR / "reseau_items_tendance.png")
+RESEAU_SEUIL = 0.15
+RESEAU_MAX_ARETES = 2000  # au-delà, on ne garde que les liens les plus forts (lisibilité + rendu)
+
+@tache("3A", entrees=("df", "multichoix"), params={"seuil": RESEAU_SEUIL, "max_aretes": RESEAU_MAX_ARETES},
+       colonnes=("Type_Articles_Achetes",),
+       sorties=(FIG_DIR / "reseau_items_tendance.png",))
+def bloc_3a_reseau_items(df: pd.DataFrame, multichoix: dict[str, MultiHot]) -> None:
+    if "Type_Articles_Achetes" in multichoix:
+        items = multichoix["Type_Articles_Achetes"]
+        items = items.sous_ensemble(df.index[df["Type_Articles_Achetes"].notna()])
+        if len(items.vocabulaire) >= 2:
+            # arêtes fortes (phi > seuil) extraites du XᵀX creux : pas de matrice n×n ni de double boucle
+            threshold = RESEAU_SEUIL
+            edges = items.aretes("phi", seuil=threshold, top_k=RESEAU_MAX_ARETES)
+            sizes = (items.comptes().to_numpy() + 1) * 30
+            rendre(rendu_reseau_items, FIG_DIR / "reseau_items_tendance.png", items.vocabulaire, sizes, edges, threshold)
+        else:
+            warnings.warn("Réseau items ignoré (pas assez d'items).")
     else:
-        warnings.warn("Réseau items ignoré (pas assez d'items).")
-else:
-    warnings.warn("Réseau items ignoré (colonne manquante).")
+        warnings.warn("Réseau items ignoré (colonne manquante).")
 
 
 # ============================================================
@@ -759,10 +691,8 @@ else:
 # But : passer du macro (société) au micro (profils)
 #
 # Pré-requis (déjà dans tes imports en haut du fichier) :
-# - import seaborn as sns
-# - from matplotlib.patches import Rectangle
-# - from sklearn.decomposition import PCA
-# - CERULEAN_CMAP, PALETTE, export_png, safe_to_numeric, StandardScaler, KMeans, RANDOM_STATE, OUT_DIR, FIG_DIR
+# - MATRICES / projeter_pca (pipeline_matrices.py), balayer_k (pipeline_kmeans.py)
+# - rendre + rendu_* (pipeline_rendu.py), RANDOM_STATE, OUT_DIR, FIG_DIR
 # ============================================================
 
 
@@ -771,8 +701,6 @@ else:
 # Objectif : construire df_cluster (base de toutes les visus Personas)
 # =========================
 
-df_cluster = None  # sécurité : défini même si clustering ignoré
-
 features = [
     "Age",
     "Influence_Tendances",
@@ -785,74 +713,199 @@ features = [
     "Importance_Confort",
 ]
 
-available = [c for c in features if c in df.columns]
+# sélection de k : grille évaluée en parallèle ; KMEANS_K = k imposé (None = meilleure silhouette)
+KMEANS_GRILLE = range(2, 9)
+KMEANS_K = 4
+KMEANS_MOTEUR = "auto"    # "kmeans", "minibatch" ou "auto" (MiniBatchKMeans sur les grands effectifs)
+KMEANS_METRIQUES = ("silhouette",)  # + "silhouette_echantillon", "calinski_harabasz", "davies_bouldin", "auto"
+KMEANS_PATIENCE = None    # ex: 2 = arrêt quand le critère (1ère métrique) baisse depuis 2 k consécutifs
+KMEANS_WORKERS = None     # None = un processus par cœur, 1 = série
+MATRICE_DTYPE = np.float64  # np.float32 : matrice deux fois plus légère pour les grands effectifs
 
-if len(available) >= 4:
-    d = df[available].copy()
+COL_DATE_SAISIE = "Date de saisie"  # filigrane du mode incrémental (--incremental)
+COL_CLE = "Clé"                     # identifiant unique du répondant dans l'export (--incremental)
 
-    # conversions numeric (sécurise)
-    for c in available:
-        d[c] = safe_to_numeric(d[c])
 
-    # imputation simple
-    d = d.fillna(d.median(numeric_only=True)).dropna()
+# colonnes lues par 4A (clé de cache) ; réponses : empreinte de secours du mode incrémental
+COLONNES_4A = (*features, "Utilise_FastFashion", "Souci_Ethique", "Pression_Sociale", "Sentiment_Culpabilite",
+               "Peur_Etre_Demode", "Type_Articles_Achetes", "Canal_Achat", COL_DATE_SAISIE, COL_CLE)
 
-    if len(d) >= 30:
-        scaler = StandardScaler()
-        X = scaler.fit_transform(d[available])
+def colonnes_empreinte(df: pd.DataFrame) -> list[str]:
+    """
+    Empreinte d'une réponse sans clé ni date lisible (--incremental) : réponses lues par 4A, sans la date
+    et la clé, ni les booléens compactés (texte Oui/Non dans un lot brut, boolean dans le df de 4A).
+    """
+    return [c for c in dict.fromkeys(COLONNES_4A)
+            if c not in (COL_DATE_SAISIE, COL_CLE) and c in df.columns and df[c].dtype.kind != "b"]
 
-        # === ÉVALUATION DU NOMBRE DE CLUSTERS ===
-        from sklearn.metrics import silhouette_score
-        inertias = []
-        silhouettes = []
-        K = range(2, 9)
+def dates_saisie(df: pd.DataFrame) -> pd.Series | None:
+    if COL_DATE_SAISIE not in df.columns:
+        return None
+    return pd.to_datetime(df[COL_DATE_SAISIE], format="%d/%m/%Y %H:%M:%S", errors="coerce")
+
+# MODELE_PERSONAS_PATH et ETAT_INCREMENTAL_PATH ne sont pas des sorties restaurables : un hit du cache
+# les laisse tels quels (mises à jour --incremental conservées) ; 4A exécuté les réécrit (ajustement complet)
+@tache("4A", entrees=("df",),
+       params={"random_state": RANDOM_STATE, "grille": list(KMEANS_GRILLE), "k": KMEANS_K,
+               "moteur": KMEANS_MOTEUR, "metriques": list(KMEANS_METRIQUES), "patience": KMEANS_PATIENCE,
+               "dtype": np.dtype(MATRICE_DTYPE).name},
+       produits=("df_cluster", "matrice"),
+       colonnes=COLONNES_4A,
+       sorties=(OUT_DIR / "kmeans_elbow_silhouette.csv", OUT_DIR / "kmeans_selection.json",
+                OUT_DIR / "personas_clusters.csv", OUT_DIR / "personas_moyennes_par_cluster.csv"))
+def bloc_4a_clustering(df: pd.DataFrame) -> dict:
+    df_cluster = None  # sécurité : défini même si clustering ignoré
+    matrice = None
+
+    available = [c for c in features if c in df.columns]
+
+    if len(available) >= 4:
+        # conversions numeric + imputation (médianes) + standardisation : une seule fois, partagée avec 4C
+        matrice = MATRICES.obtenir(df, available, dtype=MATRICE_DTYPE)
+        d = matrice.frame()
+        medianes, scaler, X = matrice.medianes, matrice.scaler, matrice.X
+
+        if len(d) >= 30:
+
+            # === ÉVALUATION DU NOMBRE DE CLUSTERS (grille en parallèle, voir pipeline_kmeans.py) ===
+            balayage = balayer_k(
+                X, KMEANS_GRILLE, random_state=RANDOM_STATE, n_init=10, moteur=KMEANS_MOTEUR, metriques=KMEANS_METRIQUES,
+                k_fixe=KMEANS_K, patience=KMEANS_PATIENCE, workers=KMEANS_WORKERS,
+            )
+            ecrire_csv(balayage.tableau(), OUT_DIR / "kmeans_elbow_silhouette.csv", index=False)
+            print("OK - Export : reports/kmeans_elbow_silhouette.csv")
+            ecrire_texte(OUT_DIR / "kmeans_selection.json", json.dumps(balayage.resume(), ensure_ascii=False, indent=2))
+            print(f"OK - Export : reports/kmeans_selection.json (k={balayage.k_retenu}, {balayage.moteur}, "
+                  f"{balayage.duree_s:.2f} s sur {balayage.workers} processus)")
+
+            # === MODÈLE FINAL : ajustement du k retenu réutilisé (pas de second fit) ===
+            kmeans = balayage.modele()
+
+            # === MODÈLE PERSISTÉ : ids stables (appariement avec le modèle précédent) + scoring sans refit ===
+            modele = ModelePersonas.depuis_ajustement(
+                available, medianes, scaler, kmeans,
+                k=balayage.k_retenu, moteur=balayage.moteur, random_state=RANDOM_STATE, n_lignes=len(d),
+            )
+            ordre = apparier_clusters(modele, charger_si_existe(MODELE_PERSONAS_PATH))
+            modele = modele.reordonner(ordre)
+            modele.sauver(MODELE_PERSONAS_PATH)
+            print(f"OK - Export : {MODELE_PERSONAS_PATH.as_posix()} (modèle {modele.identifiant})")
+
+            d["Cluster"] = np.argsort(ordre)[kmeans.labels_]
+
+            # point de départ du mode incrémental (--incremental) : statistiques suffisantes + filigrane
+            dates = dates_saisie(df.loc[d.index])
+            filigrane = dates.max() if dates is not None else None
+            EtatIncremental.initialiser(
+                modele, d[available].to_numpy(dtype=float), d["Cluster"].to_numpy(),
+                filigrane.isoformat() if pd.notna(filigrane) else None,
+                lignes=df.loc[d.index], colonnes_empreinte=colonnes_empreinte(df), colonne_cle=COL_CLE,
+            ).sauver(ETAT_INCREMENTAL_PATH)
+
+            # join contexte utile (variables “histoire”)
+            ctx_cols = [
+                c for c in [
+                    "Utilise_FastFashion",
+                    "Souci_Ethique",
+                    "Pression_Sociale",
+                    "Sentiment_Culpabilite",
+                    "Peur_Etre_Demode",
+                    "Type_Articles_Achetes",
+                    "Canal_Achat",
+                ]
+                if c in df.columns
+            ]
+            d_ctx = df.loc[d.index, ctx_cols].copy() if ctx_cols else pd.DataFrame(index=d.index)
 
-        for k in K:
-            km = KMeans(n_clusters=k, random_state=RANDOM_STATE, n_init=10)
-            labels_k = km.fit_predict(X)
-            inertias.append(km.inertia_)
-            silhouettes.append(silhouette_score(X, labels_k))
+            df_cluster = pd.concat([d, d_ctx], axis=1)
 
-        df_kmeans_eval = pd.DataFrame({
-            "k": list(K),
-            "inertia": inertias,
-            "silhouette": silhouettes
-        })
-        df_kmeans_eval.to_csv(OUT_DIR / "kmeans_elbow_silhouette.csv", index=False)
-        print("OK - Export : reports/kmeans_elbow_silhouette.csv")
+            ecrire_csv(df_cluster, OUT_DIR / "personas_clusters.csv", index=False)
+            print("OK - Export : reports/personas_clusters.csv")
 
-        # === MODÈLE FINAL (k=4) ===
-        kmeans = KMeans(n_clusters=4, random_state=RANDOM_STATE, n_init=10)
-        d["Cluster"] = kmeans.fit_predict(X)
+            means = df_cluster.groupby("Cluster")[available].mean().round(2)
+            ecrire_csv(means, OUT_DIR / "personas_moyennes_par_cluster.csv")
+            print("OK - Export : reports/personas_moyennes_par_cluster.csv")
 
-        # join contexte utile (variables “histoire”)
-        ctx_cols = [
-            c for c in [
-                "Utilise_FastFashion",
-                "Souci_Ethique",
-                "Pression_Sociale",
-                "Sentiment_Culpabilite",
-                "Peur_Etre_Demode",
-                "Type_Articles_Achetes",
-                "Canal_Achat",
-            ]
-            if c in df.columns
-        ]
-        d_ctx = df.loc[d.index, ctx_cols].copy() if ctx_cols else pd.DataFrame(index=d.index)
+        else:
+            warnings.warn("Clustering ignoré (pas assez de lignes après nettoyage).")
+    else:
+        warnings.warn("Clustering ignoré (pas assez de variables).")
 
-        df_cluster = pd.concat([d, d_ctx], axis=1)
+    return {"df_cluster": df_cluster, "matrice": matrice if df_cluster is not None else None}
 
-        df_cluster.to_csv(OUT_DIR / "personas_clusters.csv", index=False)
-        print("OK - Export : reports/personas_clusters.csv")
 
-        means = df_cluster.groupby("Cluster")[available].mean().round(2)
-        means.to_csv(OUT_DIR / "personas_moyennes_par_cluster.csv")
-        print("OK - Export : reports/personas_moyennes_par_cluster.csv")
+# [4H] Cube des personas : tranches par cluster des blocs 4D–4G lues dans un seul cube
+PERSONAS_MESURES = [
+    "Peur_Etre_Demode", "Importance_Prix", "Importance_Qualite", "Importance_Confort", "Souci_Ethique",
+    "Importance_Tendance",
+]
 
-    else:
-        warnings.warn("Clustering ignoré (pas assez de lignes après nettoyage).")
-else:
-    warnings.warn("Clustering ignoré (pas assez de variables).")
+@tache("4H", entrees=("df_cluster", "multichoix"), produits=("cube_personas",),
+       colonnes=("Cluster", "Utilise_FastFashion", "Type_Articles_Achetes", *PERSONAS_MESURES))
+def bloc_4h_cube_personas(df_cluster: pd.DataFrame | None, multichoix: dict[str, MultiHot]) -> dict:
+    if df_cluster is None:
+        return {"cube_personas": None}
+    dims = df_cluster[["Cluster"]].copy()
+    if "Utilise_FastFashion" in df_cluster.columns:
+        dims["Utilise_FastFashion"] = texte_ou_defaut(df_cluster["Utilise_FastFashion"])
+    multiples = {
+        q: multichoix[q].sous_ensemble(df_cluster.index)
+        for q in ["Type_Articles_Achetes"] if q in df_cluster.columns and q in multichoix
+    }
+    cube = construire_cube(dims, df_cluster[[c for c in PERSONAS_MESURES if c in df_cluster.columns]],
+                           multiples=multiples, ordre=2)
+    print(f"OK - Cube des personas : {len(cube.cuboides)} cuboïdes, {cube.taille()} cellules")
+    return {"cube_personas": cube}
+
+
+def personas_incrementales(path_lot: Path) -> None:
+    """
+    Mode incrémental (hors DAG) : intègre les réponses nouvelles de `path_lot` (Clé inconnue ; sans clé,
+    Date de saisie postérieure au filigrane ou, sans date lisible, empreinte inconnue : voir
+    EtatIncremental.trier_lot) dans l'état laissé par 4A, sans réajustement complet. Met à jour le modèle
+    persisté (scoring) et personas_moyennes_par_cluster.csv ; les ids de clusters ne bougent pas.
+    """
+    if not ETAT_INCREMENTAL_PATH.exists():
+        warnings.warn(f"Mode incrémental ignoré ({ETAT_INCREMENTAL_PATH.as_posix()} absent : "
+                      "lancer 4A une fois, --only 4A --no-cache).")
+        return
+    etat = EtatIncremental.charger(ETAT_INCREMENTAL_PATH)
+
+    df_raw = pd.read_csv(path_lot)
+    df_lot = normaliser(df_raw, SCHEMA.resoudre(df_raw.columns).mapping)
+    dates = dates_saisie(df_lot)
+    tri = etat.trier_lot(df_lot, dates)
+    for regle, libelle in (("cle", f"{COL_CLE} connue"), ("date", "antérieures au filigrane"),
+                           ("empreinte", "sans clé ni date lisible, empreinte identique")):
+        n = int((tri["regle"].eq(regle) & ~tri["nouvelle"]).sum())
+        if n:
+            print(f"INFO - {n} réponses déjà intégrées ({libelle}) ignorées")
+    for regle, verbe in (("empreinte", "intégrées (dédoublonnées par empreinte)"),
+                         ("aucune", "écartées (état sans empreintes, relancer 4A)")):
+        concernees = tri["regle"].eq(regle) & (tri["nouvelle"] | (regle == "aucune"))
+        if concernees.any():
+            lignes = ", ".join(str(i + 2) for i in df_lot.index[concernees][:10])  # n° de ligne du CSV (en-tête = 1)
+            warnings.warn(f"{int(concernees.sum())} réponses sans clé ni '{COL_DATE_SAISIE}' lisible {verbe} : "
+                          f"lignes {lignes}")
+    garde = tri["nouvelle"]
+    df_lot, dates = df_lot[garde], (dates[garde] if dates is not None else None)
+    if df_lot.empty:
+        print(f"OK - Personas incrémentales : aucune nouvelle réponse (filigrane {etat.filigrane})")
+        return
+
+    labels = etat.mettre_a_jour(df_lot)
+    if dates is not None and dates.notna().any():
+        derniere = dates.max()
+        if etat.filigrane is None or derniere > pd.Timestamp(etat.filigrane):
+            etat.filigrane = derniere.isoformat()
+    etat.sauver(ETAT_INCREMENTAL_PATH)
+    etat.modele().sauver(MODELE_PERSONAS_PATH)
+
+    ecrire_csv(etat.moyennes_par_cluster().round(2), OUT_DIR / "personas_moyennes_par_cluster.csv")
+    repartition = ", ".join(f"{c}: {n}" for c, n in labels.value_counts().sort_index().items())
+    print(f"OK - Personas incrémentales : {len(df_lot)} nouvelles réponses ({repartition}), "
+          f"{etat.n} au total, filigrane {etat.filigrane}")
+    print("OK - Export : reports/personas_moyennes_par_cluster.csv")
 
 
 
@@ -861,89 +914,23 @@ else:
 # Objectif : montrer “qui est majoritaire” avant de détailler les différences
 # =========================
 
-if df_cluster is None or "Cluster" not in df_cluster.columns:
-    warnings.warn("Waffle chart ignoré (df_cluster / colonne Cluster manquante).")
-else:
-    d_w = df_cluster.dropna(subset=["Cluster"]).copy()
-    d_w["Cluster"] = pd.to_numeric(d_w["Cluster"], errors="coerce")
-    d_w = d_w.dropna(subset=["Cluster"])
-    d_w["Cluster"] = d_w["Cluster"].astype(int)
-
-    counts = d_w["Cluster"].value_counts().sort_index()
-    labels = [f"Cluster {c}" for c in counts.index]
-    values = counts.values
-
-    base_colors = [
-        PALETTE["CERULEAN_DARK"],
-        PALETTE["CERULEAN"],
-        PALETTE["CERULEAN_LIGHT"],
-        PALETTE["CERULEAN_SOFT"],
-        PALETTE["NAVY"],
-    ]
-    colors = [base_colors[i % len(base_colors)] for i in range(len(values))]
-
-    # grille waffle (50x50 = 2500)
-    n_cols = 50
-    n_rows = 50
-    n_total = n_cols * n_rows
-
-    proportions = values / values.sum()
-    squares = np.floor(proportions * n_total).astype(int)
-
-    # ajuster pour atteindre exactement 2500 cases
-    remainder = n_total - squares.sum()
-    if remainder > 0:
-        order = np.argsort(-(proportions * n_total - squares))
-        for i in order[:remainder]:
-            squares[i] += 1
-
-    # construire la grille
-    grid = []
-    for i, c in enumerate(squares):
-        grid += [i] * int(c)
-
-    grid = grid[:n_total]
-    if len(grid) < n_total:
-        grid += [len(values) - 1] * (n_total - len(grid))
-
-    fig, ax = plt.subplots(figsize=(10, 10), facecolor="white")
-    ax.set_facecolor("white")
-
-    cell = 0.92
-    for i, cat in enumerate(grid):
-        row = i // n_cols
-        col = i % n_cols
-        x = col
-        y = (n_rows - 1 - row)
-        rect = Rectangle((x, y), cell, cell, facecolor=colors[cat], edgecolor="white", linewidth=0.4)
-        ax.add_patch(rect)
-
-    ax.set_xlim(-1.5, n_cols + 1.5)
-    ax.set_ylim(-8, n_rows + 3.5)
-    ax.axis("off")
-
-    ax.text(
-        0, n_rows + 2.2,
-        "Typologie des consommateurs de mode (Waffle chart)",
-        fontsize=16, fontweight="bold", color=PALETTE["CERULEAN_DARK"]
-    )
-    ax.text(
-        0, n_rows + 1.2,
-        f"{len(d_w)} répondants — 1 carré ≈ {max(1, int(round(len(d_w) / n_total)))} répondant(s)",
-        fontsize=10, color=PALETTE["NAVY"]
-    )
+@tache("4B", entrees=("df_cluster",), colonnes=("Cluster",),
+       sorties=(FIG_DIR / "waffle_clusters_typologie.png",))
+def bloc_4b_waffle(df_cluster: pd.DataFrame | None) -> None:
+    if df_cluster is None or "Cluster" not in df_cluster.columns:
+        warnings.warn("Waffle chart ignoré (df_cluster / colonne Cluster manquante).")
+    else:
+        d_w = df_cluster.dropna(subset=["Cluster"]).copy()
+        d_w["Cluster"] = pd.to_numeric(d_w["Cluster"], errors="coerce")
+        d_w = d_w.dropna(subset=["Cluster"])
+        d_w["Cluster"] = d_w["Cluster"].astype(int)
 
-    y0 = -2.5
-    for i, (lab, val) in enumerate(zip(labels, values)):
-        ax.add_patch(Rectangle((0, y0 - i*1.2), 1.2, 0.7, facecolor=colors[i], edgecolor="none"))
-        ax.text(
-            1.5, y0 - i*1.2 + 0.35,
-            f"{lab} — {val} ({val/values.sum()*100:.1f}%)",
-            va="center", fontsize=10, color=PALETTE["NOIR"]
-        )
+        counts = d_w["Cluster"].value_counts().sort_index()
+        labels = [f"Cluster {c}" for c in counts.index]
+        values = counts.values
 
-    export_png(FIG_DIR / "waffle_clusters_typologie.png")
-    print("OK - Export : reports/figures/waffle_clusters_typologie.png")
+        rendre(rendu_waffle, FIG_DIR / "waffle_clusters_typologie.png", values, labels, len(d_w))
+        print("OK - Export : reports/figures/waffle_clusters_typologie.png")
 
 
 
@@ -952,55 +939,26 @@ else:
 # Objectif : visualiser la séparation basée sur les 9 variables utilisées par K-Means
 # =========================
 
-if df_cluster is None:
-    warnings.warn("PCA 2D ignorée (df_cluster manquant).")
-else:
-    # Refaire la matrice X sur les mêmes lignes que df_cluster (cohérent)
-    d_pca = df_cluster[available].copy()
-    for c in available:
-        d_pca[c] = safe_to_numeric(d_pca[c])
-    d_pca = d_pca.fillna(d_pca.median(numeric_only=True)).dropna()
-
-    # Standardisation identique
-    X_pca = StandardScaler().fit_transform(d_pca[available])
-
-    pca = PCA(n_components=2, random_state=RANDOM_STATE)
-    Z = pca.fit_transform(X_pca)
-
-    z_df = pd.DataFrame(Z, columns=["PC1", "PC2"], index=d_pca.index)
-    z_df["Cluster"] = df_cluster.loc[d_pca.index, "Cluster"].astype(int)
-
-    centroids = z_df.groupby("Cluster")[["PC1", "PC2"]].mean()
-
-    plt.figure(figsize=(10, 6))
-    plt.scatter(
-        z_df["PC1"], z_df["PC2"],
-        c=z_df["Cluster"],
-        cmap="tab10",
-        alpha=0.55,
-        s=35,
-        edgecolor="none"
-    )
-    plt.scatter(
-        centroids["PC1"], centroids["PC2"],
-        c=centroids.index,
-        cmap="tab10",
-        s=240,
-        marker="X",
-        edgecolor="black",
-        linewidth=1.2
-    )
+@tache("4C", entrees=("df_cluster", "matrice"), params={"random_state": RANDOM_STATE}, colonnes=(*features, "Cluster"),
+       sorties=(FIG_DIR / "personas_pca_2d.png",))
+def bloc_4c_pca(df_cluster: pd.DataFrame | None, matrice: MatriceFeatures | None) -> None:
+    if df_cluster is None or matrice is None:
+        warnings.warn("PCA 2D ignorée (df_cluster manquant).")
+    else:
+        # même matrice X standardisée que le K-Means (4A) : projection cohérente par construction
+        # solveur selon n : complet, randomisé, puis incrémental (pipeline_matrices.py)
+        pca, Z = projeter_pca(matrice.X, 2, RANDOM_STATE)
 
-    var1 = pca.explained_variance_ratio_[0] * 100
-    var2 = pca.explained_variance_ratio_[1] * 100
+        z_df = pd.DataFrame(Z, columns=["PC1", "PC2"], index=matrice.index)
+        z_df["Cluster"] = df_cluster.loc[matrice.index, "Cluster"].astype(int)
 
-    plt.title(f"Personas (PCA) : projection 2D — PC1 {var1:.1f}% / PC2 {var2:.1f}%", fontweight="bold")
-    plt.xlabel("PC1")
-    plt.ylabel("PC2")
-    plt.grid(True, linestyle="--", alpha=0.25)
+        centroids = z_df.groupby("Cluster")[["PC1", "PC2"]].mean()
 
-    export_png(FIG_DIR / "personas_pca_2d.png")
-    print("OK - Export : reports/figures/personas_pca_2d.png")
+        var1 = pca.explained_variance_ratio_[0] * 100
+        var2 = pca.explained_variance_ratio_[1] * 100
+
+        rendre(rendu_pca, FIG_DIR / "personas_pca_2d.png", z_df, centroids, var1, var2)
+        print("OK - Export : reports/figures/personas_pca_2d.png")
 
 
 
@@ -1009,36 +967,20 @@ else:
 # Objectif : montrer la standardisation des tendances par profil
 # =========================
 
-if df_cluster is not None and "Type_Articles_Achetes" in df_cluster.columns:
-    items = df_cluster["Type_Articles_Achetes"].dropna().astype(str)
-    dummies = items.str.get_dummies(sep=";")
-    dummies.columns = [c.strip() for c in dummies.columns]
-
-    if dummies.shape[1] >= 1:
-        temp = pd.concat([df_cluster["Cluster"], dummies], axis=1).fillna(0)
-        pct = temp.groupby("Cluster").mean(numeric_only=True) * 100
-
-        plt.figure(figsize=(14, 6))
-        ax = sns.heatmap(
-            pct,
-            cmap=CERULEAN_CMAP,
-            vmin=0, vmax=100,
-            linewidths=0.5,
-            linecolor="white",
-            cbar_kws={"label": "% d'adoption"}
-        )
-        ax.set_title("Uniformisation : articles tendance par cluster (% adoption)", fontweight="bold")
-        ax.set_xlabel("")
-        ax.set_ylabel("")
-        plt.xticks(rotation=30, ha="right")
-        plt.yticks(rotation=0)
-
-        export_png(FIG_DIR / "heatmap_items_par_cluster.png")
-        print("OK - Export : reports/figures/heatmap_items_par_cluster.png")
+@tache("4D", entrees=("cube_personas",),
+       sorties=(FIG_DIR / "heatmap_items_par_cluster.png",))
+def bloc_4d_heatmap_items(cube_personas: Cube | None) -> None:
+    if cube_personas is not None and "Type_Articles_Achetes" in cube_personas.multiples:
+        if len(cube_personas.modalites["Type_Articles_Achetes"]) >= 1:
+            # % d'adoption par cluster : GᵀX / effectif du cluster (cube 4H)
+            pct = cube_personas.taux("Type_Articles_Achetes", ["Cluster"]).rename_axis(columns=None) * 100
+
+            rendre(rendu_heatmap_items, FIG_DIR / "heatmap_items_par_cluster.png", pct)
+            print("OK - Export : reports/figures/heatmap_items_par_cluster.png")
+        else:
+            warnings.warn("Heatmap items ignorée (pas d'items).")
     else:
-        warnings.warn("Heatmap items ignorée (pas d'items).")
-else:
-    warnings.warn("Heatmap items ignorée (df_cluster ou colonne manquante).")
+        warnings.warn("Heatmap items ignorée (df_cluster ou colonne manquante).")
 
 
 
@@ -1047,26 +989,20 @@ else:
 # Objectif : mesurer la pression sociale (rejet du “plus à la mode”) par persona
 # =========================
 
-if df_cluster is not None and "Peur_Etre_Demode" in df_cluster.columns:
-    d_obs = df_cluster.dropna(subset=["Peur_Etre_Demode"]).copy()
-    d_obs["Peur_Etre_Demode"] = pd.to_numeric(d_obs["Peur_Etre_Demode"], errors="coerce")
-    d_obs = d_obs.dropna(subset=["Peur_Etre_Demode"])
-
-    if len(d_obs) >= 10:
-        grp = d_obs.groupby("Cluster")["Peur_Etre_Demode"].mean().sort_index()
+@tache("4E", entrees=("cube_personas",),
+       sorties=(FIG_DIR / "obsolescence_psy_par_cluster.png",))
+def bloc_4e_obsolescence(cube_personas: Cube | None) -> None:
+    if cube_personas is not None and "Peur_Etre_Demode" in cube_personas.mesures:
+        # réponses numériques seulement (cube : n = valeurs lisibles)
+        if cube_personas.moments("Peur_Etre_Demode")["n"] >= 10:
+            grp = cube_personas.moyennes(["Peur_Etre_Demode"], ["Cluster"])["Peur_Etre_Demode"]
 
-        plt.figure(figsize=(8, 5))
-        plt.bar([f"Cluster {i}" for i in grp.index], grp.values, edgecolor="black")
-        plt.ylim(1, 5)
-        plt.title("Obsolescence psychologique : rejet du 'démodé' (moyenne)", fontweight="bold")
-        plt.ylabel("Niveau (1=Jamais, 5=Toujours)")
-
-        export_png(FIG_DIR / "obsolescence_psy_par_cluster.png")
-        print("OK - Export : reports/figures/obsolescence_psy_par_cluster.png")
+            rendre(rendu_obsolescence, FIG_DIR / "obsolescence_psy_par_cluster.png", grp)
+            print("OK - Export : reports/figures/obsolescence_psy_par_cluster.png")
+        else:
+            warnings.warn("Obsolescence psycho ignorée (pas assez de données).")
     else:
-        warnings.warn("Obsolescence psycho ignorée (pas assez de données).")
-else:
-    warnings.warn("Obsolescence psycho ignorée (df_cluster / colonne manquante).")
+        warnings.warn("Obsolescence psycho ignorée (df_cluster / colonne manquante).")
 
 
 
@@ -1075,31 +1011,21 @@ else:
 # Objectif : relier “discours” et “pratique” selon les personas
 # =========================
 
-if df_cluster is not None and "Utilise_FastFashion" in df_cluster.columns:
-    t = df_cluster[["Cluster", "Utilise_FastFashion"]].dropna(subset=["Cluster"]).copy()
-    t["Utilise_FastFashion"] = t["Utilise_FastFashion"].fillna("Non spécifié").astype(str).str.strip()
+@tache("4F", entrees=("cube_personas",),
+       sorties=(OUT_DIR / "utilise_fastfashion_pct_par_cluster.csv", FIG_DIR / "fastfashion_pct_par_cluster.png"))
+def bloc_4f_fastfashion_par_cluster(cube_personas: Cube | None) -> None:
+    if cube_personas is not None and "Utilise_FastFashion" in cube_personas.dimensions:
+        # réponses manquantes = "Non spécifié" (cube 4H) ; équivalent crosstab(normalize="index")
+        pivot = cube_personas.taux("Utilise_FastFashion", ["Cluster"]) * 100
+        pivot = pivot.round(1)
 
-    pivot = pd.crosstab(t["Cluster"], t["Utilise_FastFashion"], normalize="index") * 100
-    pivot = pivot.round(1)
+        ecrire_csv(pivot, OUT_DIR / "utilise_fastfashion_pct_par_cluster.csv", index=True)
+        print("OK - Export : reports/utilise_fastfashion_pct_par_cluster.csv")
 
-    pivot.to_csv(OUT_DIR / "utilise_fastfashion_pct_par_cluster.csv", index=True)
-    print("OK - Export : reports/utilise_fastfashion_pct_par_cluster.csv")
-
-    plt.figure(figsize=(10, 5))
-    bottom = np.zeros(len(pivot.index))
-    for col in pivot.columns:
-        plt.bar(pivot.index.astype(str), pivot[col].values, bottom=bottom, label=col)
-        bottom += pivot[col].values
-
-    plt.title("Fast fashion (en %) par cluster", fontweight="bold")
-    plt.xlabel("Cluster")
-    plt.ylabel("%")
-    plt.legend(loc="upper right")
-
-    export_png(FIG_DIR / "fastfashion_pct_par_cluster.png")
-    print("OK - Export : reports/figures/fastfashion_pct_par_cluster.png")
-else:
-    warnings.warn("Fast fashion par cluster ignoré (df_cluster / colonne manquante).")
+        rendre(rendu_fastfashion_par_cluster, FIG_DIR / "fastfashion_pct_par_cluster.png", pivot)
+        print("OK - Export : reports/figures/fastfashion_pct_par_cluster.png")
+    else:
+        warnings.warn("Fast fashion par cluster ignoré (df_cluster / colonne manquante).")
 
 
 
@@ -1108,46 +1034,30 @@ else:
 # Objectif : montrer que les “choix” sont des compromis structurés (prix/qualité/tendance/éthique)
 # =========================
 
-if df_cluster is not None:
-    cols = [
-        c for c in [
-            "Importance_Prix",
-            "Importance_Qualite",
-            "Importance_Confort",
-            "Souci_Ethique",
-            "Importance_Tendance",
+@tache("4G", entrees=("cube_personas",),
+       sorties=(FIG_DIR / "carte_renoncements_par_cluster.png",))
+def bloc_4g_carte_renoncements(cube_personas: Cube | None) -> None:
+    if cube_personas is not None:
+        cols = [
+            c for c in [
+                "Importance_Prix",
+                "Importance_Qualite",
+                "Importance_Confort",
+                "Souci_Ethique",
+                "Importance_Tendance",
+            ]
+            if c in cube_personas.mesures
         ]
-        if c in df_cluster.columns
-    ]
-
-    if len(cols) >= 3:
-        grp = df_cluster.groupby("Cluster")[cols].mean().round(2)
 
-        x = np.arange(len(cols))
-        width = 0.18
+        if len(cols) >= 3:
+            grp = cube_personas.moyennes(cols, ["Cluster"]).round(2)
 
-        plt.figure(figsize=(12, 5))
-        for i, cl in enumerate(grp.index):
-            plt.bar(
-                x + (i - len(grp.index)/2)*width + width/2,
-                grp.loc[cl].values,
-                width=width,
-                edgecolor="black",
-                label=f"Cluster {cl}"
-            )
-
-        plt.xticks(x, cols, rotation=15, ha="right")
-        plt.ylim(0, 10.5)
-        plt.title("Carte des renoncements : arbitrages moyens par cluster", fontweight="bold")
-        plt.ylabel("Niveau moyen (1–10)")
-        plt.legend()
-
-        export_png(FIG_DIR / "carte_renoncements_par_cluster.png")
-        print("OK - Export : reports/figures/carte_renoncements_par_cluster.png")
+            rendre(rendu_carte_renoncements, FIG_DIR / "carte_renoncements_par_cluster.png", grp)
+            print("OK - Export : reports/figures/carte_renoncements_par_cluster.png")
+        else:
+            warnings.warn("Carte des renoncements ignorée (colonnes insuffisantes).")
     else:
-        warnings.warn("Carte des renoncements ignorée (colonnes insuffisantes).")
-else:
-    warnings.warn("Carte des renoncements ignorée (df_cluster manquant).")
+        warnings.warn("Carte des renoncements ignorée (df_cluster manquant).")
 
 
 # ============================================================
@@ -1155,79 +1065,19 @@ else:
 # Objectif : montrer l’uniformisation (mêmes items) + la pression sociale
 # ============================================================
 #%% =========================
-# 5A) HEATMAP — UNIFORMISATION : % ADOPTION DES ITEMS PAR CLUSTER
+# 5A) HEATMAP — UNIFORMISATION : % ADOPTION DES ITEMS PAR CLUSTER -> figure du bloc 4D
 # =========================
 # Ce que ça prouve :
 # - certains clusters adoptent plus certains items → la tendance n’est pas “au hasard”
 # - on observe des patterns d’uniformisation (packs / codes)
 
-if df_cluster is not None and "Type_Articles_Achetes" in df_cluster.columns:
-    items = df_cluster["Type_Articles_Achetes"].dropna().astype(str)
-    dummies = items.str.get_dummies(sep=";")
-
-    # Nettoyage noms colonnes (évite espaces)
-    dummies.columns = [c.strip() for c in dummies.columns]
-
-    if dummies.shape[1] >= 1:
-        temp = pd.concat([df_cluster["Cluster"], dummies], axis=1).fillna(0)
-
-        # % d'adoption par cluster (moyenne des dummies)
-        pct = temp.groupby("Cluster").mean(numeric_only=True) * 100
-
-        plt.figure(figsize=(14, 6))
-        ax = sns.heatmap(
-            pct,
-            cmap=CERULEAN_CMAP,   # colormap global déjà défini au début
-            vmin=0, vmax=100,
-            linewidths=0.5,
-            linecolor="white",
-            cbar_kws={"label": "% d'adoption"}
-        )
-        ax.set_title("Uniformisation : articles tendance par cluster (% adoption)", fontweight="bold")
-        ax.set_xlabel("")
-        ax.set_ylabel("")
-        plt.xticks(rotation=30, ha="right")
-        plt.yticks(rotation=0)
-
-        export_png(FIG_DIR / "heatmap_items_par_cluster.png")
-        print("OK - Export : reports/figures/heatmap_items_par_cluster.png")
-    else:
-        warnings.warn("Heatmap items ignorée (pas d'items).")
-else:
-    warnings.warn("Heatmap items ignorée (df_cluster ou colonne manquante).")
-
-
-
 #%% =========================
-# 5B) OBSOLESCENCE PSYCHOLOGIQUE — PEUR D’ÊTRE “DÉMODÉ” PAR CLUSTER
+# 5B) OBSOLESCENCE PSYCHOLOGIQUE — PEUR D’ÊTRE “DÉMODÉ” PAR CLUSTER -> figure du bloc 4E
 # =========================
 # Ce que ça prouve :
 # - la pression sociale se traduit par l’évitement du “plus à la mode”
 # - certains clusters sont plus sensibles à cette obsolescence psychologique
 
-if df_cluster is not None and "Peur_Etre_Demode" in df_cluster.columns:
-    d = df_cluster.dropna(subset=["Peur_Etre_Demode"]).copy()
-
-    # Sécurité : au cas où la colonne serait en texte
-    d["Peur_Etre_Demode"] = pd.to_numeric(d["Peur_Etre_Demode"], errors="coerce")
-    d = d.dropna(subset=["Peur_Etre_Demode"])
-
-    if len(d) >= 10:
-        grp = d.groupby("Cluster")["Peur_Etre_Demode"].mean().sort_index()
-
-        plt.figure(figsize=(8, 5))
-        plt.bar([f"Cluster {i}" for i in grp.index], grp.values, edgecolor="black")
-        plt.ylim(1, 5)
-        plt.title("Obsolescence psychologique : rejet du 'démodé' (moyenne)", fontweight="bold")
-        plt.ylabel("Niveau (1=Jamais, 5=Toujours)")
-
-        export_png(FIG_DIR / "obsolescence_psy_par_cluster.png")
-        print("OK - Export : reports/figures/obsolescence_psy_par_cluster.png")
-    else:
-        warnings.warn("Obsolescence psycho ignorée (pas assez de données).")
-else:
-    warnings.warn("Obsolescence psycho ignorée (df_cluster / colonne manquante).")
-
 
 # ============================================================
 # CHAPITRE 6 — RÉSEAUX SOCIAUX (df)
@@ -1240,39 +1090,8 @@ else:
 #%% =========================
 # 6A) Helpers robustes (échelles 1–10)
 # =========================
-def _to_scale_1_10(series: pd.Series) -> pd.Series:
-    """
-    Convertit une série vers une échelle 1–10 robuste :
-    - gère '7,5' (virgule FR)
-    - gère textes parasites
-    - clip [1,10]
-    - arrondi à l'entier le plus proche (Int64)
-    """
-    if series is None:
-        return pd.Series(dtype="Int64")
-    s = series.copy()
-    # si jamais c'est un DataFrame (cas de colonnes dupliquées mal gérées)
-    if isinstance(s, pd.DataFrame):
-        s = s.bfill(axis=1).iloc[:, 0]
-    s = s.astype(str).str.replace(",", ".", regex=False).str.strip()
-    s = pd.to_numeric(s, errors="coerce")
-    s = s.clip(1, 10)
-    s = s.round().astype("Int64")
-    return s
-
-def _ff_binary(series: pd.Series) -> pd.Series:
-    """Fast fashion Oui/Non -> 1/0 (Int64), NaN sinon."""
-    if series is None:
-        return pd.Series(dtype="Int64")
-    s = series.copy()
-    if isinstance(s, pd.DataFrame):
-        s = s.bfill(axis=1).iloc[:, 0]
-    txt = s.astype(str).str.lower().str.strip()
-    out = pd.Series(np.nan, index=txt.index, dtype="float")
-    out[txt.str.contains(r"\boui\b", na=False)] = 1
-    out[txt.str.contains(r"\bnon\b", na=False)] = 0
-    return out.astype("Int64")
-
+# échelles 1–10 (Int8) et FF : indicateurs dérivés calculés une fois en 0J (pipeline_derives.py) ;
+# en mode flux, calculés sur le morceau
 def _counts_1_10(s_int: pd.Series) -> pd.Series:
     """Retourne counts sur 1..10, même si des valeurs manquent."""
     vc = s_int.dropna().astype(int).value_counts().sort_index()
@@ -1281,145 +1100,130 @@ def _counts_1_10(s_int: pd.Series) -> pd.Series:
 #%% =========================
 # 6B) Réseaux : distribution de l'influence (barres 1..10)
 # =========================
-req = ["Influence_Reseaux"]
-if all(c in df.columns for c in req):
-    d = df.copy()
-    infl_rs = _to_scale_1_10(d["Influence_Reseaux"])
-    counts = _counts_1_10(infl_rs)
-
-    plt.figure(figsize=(10, 5))
-    plt.bar(counts.index.astype(str), counts.values, edgecolor="black")
-    plt.title("Réseaux sociaux : distribution de l'influence déclarée (1–10)", fontweight="bold")
-    plt.xlabel("Influence des réseaux sociaux (1–10)")
-    plt.ylabel("Nombre de répondants")
-    export_png(FIG_DIR / "reseaux_dist_influence.png")
-else:
-    warnings.warn("Réseaux sociaux (6B) ignoré : colonne Influence_Reseaux manquante.")
+def _agreger_6b(df: pd.DataFrame, derives: pd.DataFrame | None = None) -> Agregats | None:
+    if "Influence_Reseaux" not in df.columns:
+        return None
+    if derives is None:
+        derives = DERIVES.obtenir(df)
+    return Agregats(counts=_counts_1_10(derives["Influence_Reseaux"]))
+
+def _finaliser_6b(agg: Agregats | None) -> None:
+    if agg is None:
+        warnings.warn("Réseaux sociaux (6B) ignoré : colonne Influence_Reseaux manquante.")
+        return
+    rendre(rendu_dist_influence, FIG_DIR / "reseaux_dist_influence.png", agg["counts"])
+
+@tache("6B", entrees=("df", "derives"), colonnes=("Influence_Reseaux",),
+       sorties=(FIG_DIR / "reseaux_dist_influence.png",),
+       flux=(_agreger_6b, _finaliser_6b))
+def bloc_6b_dist_influence(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    _finaliser_6b(_agreger_6b(df, derives))
 
 #%% =========================
 # 6C) Réseaux vs Tendances : relation (hexbin, plus lisible qu'un scatter bruité)
 # =========================
-req = ["Influence_Reseaux", "Influence_Tendances"]
-if all(c in df.columns for c in req):
-    d = df.copy()
-    x = _to_scale_1_10(d["Influence_Reseaux"]).astype("float")
-    y = _to_scale_1_10(d["Influence_Tendances"]).astype("float")
-    dd = pd.DataFrame({"x": x, "y": y}).dropna()
-
-    if len(dd) >= 30:
-        plt.figure(figsize=(10, 6))
-        hb = plt.hexbin(dd["x"], dd["y"], gridsize=12, cmap=CERULEAN_CMAP, mincnt=1)
-        cb = plt.colorbar(hb)
-        cb.set_label("Densité (nombre de réponses)")
-        plt.xlim(1, 10); plt.ylim(1, 10)
-        plt.xlabel("Influence réseaux (1–10)")
-        plt.ylabel("Influence des tendances (1–10)")
-        plt.title("Réseaux sociaux vs tendances : densité des réponses", fontweight="bold")
-        export_png(FIG_DIR / "reseaux_influence_vs_tendances.png")
+@tache("6C", entrees=("df", "derives"), colonnes=("Influence_Reseaux", "Influence_Tendances"),
+       sorties=(FIG_DIR / "reseaux_influence_vs_tendances.png",))
+def bloc_6c_reseaux_vs_tendances(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    req = ["Influence_Reseaux", "Influence_Tendances"]
+    if all(c in df.columns for c in req):
+        dd = derives[req].astype("float").set_axis(["x", "y"], axis=1).dropna()
+
+        if len(dd) >= 30:
+            rendre(
+                rendu_hexbin, FIG_DIR / "reseaux_influence_vs_tendances.png",
+                dd["x"].to_numpy(), dd["y"].to_numpy(), 12,
+                "Influence réseaux (1–10)", "Influence des tendances (1–10)",
+                "Réseaux sociaux vs tendances : densité des réponses",
+            )
+        else:
+            warnings.warn("Réseaux sociaux (6C) ignoré : pas assez de données.")
     else:
-        warnings.warn("Réseaux sociaux (6C) ignoré : pas assez de données.")
-else:
-    warnings.warn("Réseaux sociaux (6C) ignoré : colonnes manquantes.")
+        warnings.warn("Réseaux sociaux (6C) ignoré : colonnes manquantes.")
 
 #%% =========================
 # 6D) Réseaux → culpabilité : comparaison Fast Fashion Oui/Non (boxplot)
 # =========================
-req = ["Influence_Reseaux", "Sentiment_Culpabilite", "Utilise_FastFashion"]
-if all(c in df.columns for c in req):
-    d = df.copy()
-    infl_rs = _to_scale_1_10(d["Influence_Reseaux"]).astype("float")
-    culp = _to_scale_1_10(d["Sentiment_Culpabilite"]).astype("float")
-    ff = _ff_binary(d["Utilise_FastFashion"])
-
-    dd = pd.DataFrame({"infl_rs": infl_rs, "culp": culp, "ff": ff}).dropna(subset=["culp", "ff"])
-    if len(dd) >= 20 and dd["ff"].nunique() >= 2:
-        data = [
-            dd.loc[dd["ff"] == 1, "culp"].values,
-            dd.loc[dd["ff"] == 0, "culp"].values,
-        ]
-        plt.figure(figsize=(10, 5))
-        bp = plt.boxplot(
-            data,
-            labels=["Fast fashion : OUI", "Fast fashion : NON"],
-            patch_artist=True,
-            showfliers=False,
-            widths=0.55
-        )
-        bp["boxes"][0].set_facecolor(PALETTE["CERULEAN_DARK"])
-        bp["boxes"][0].set_edgecolor(PALETTE["CERULEAN_DARK"])
-        bp["boxes"][1].set_facecolor(PALETTE["CERULEAN_LIGHT"])
-        bp["boxes"][1].set_edgecolor(PALETTE["CERULEAN_DARK"])
-        for median in bp["medians"]:
-            median.set_color("white")
-            median.set_linewidth(2.2)
-
-        plt.ylim(1, 10)
-        plt.ylabel("Culpabilité (1–10)")
-        plt.title("Culpabilité selon la consommation de fast fashion", fontweight="bold")
-        export_png(FIG_DIR / "reseaux_culpabilite_fastfashion_boxplot.png")
+@tache("6D", entrees=("df", "derives"), colonnes=("Influence_Reseaux", "Sentiment_Culpabilite", "Utilise_FastFashion", "FF"),
+       sorties=(FIG_DIR / "reseaux_culpabilite_fastfashion_boxplot.png",))
+def bloc_6d_culpabilite_fastfashion(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    req = ["Influence_Reseaux", "Sentiment_Culpabilite", "Utilise_FastFashion"]
+    if all(c in df.columns for c in req):
+        dd = pd.DataFrame({
+            "culp": derives["Sentiment_Culpabilite"].astype("float"),
+            "ff": derives["FF"].astype("float"),
+        }).dropna()
+        if len(dd) >= 20 and dd["ff"].nunique() >= 2:
+            data = [
+                dd.loc[dd["ff"] == 1, "culp"].values,
+                dd.loc[dd["ff"] == 0, "culp"].values,
+            ]
+            rendre(
+                rendu_boxplot_culpabilite, FIG_DIR / "reseaux_culpabilite_fastfashion_boxplot.png",
+                data, ["Fast fashion : OUI", "Fast fashion : NON"], "Culpabilité selon la consommation de fast fashion",
+            )
+        else:
+            warnings.warn("Réseaux sociaux (6D) ignoré : pas assez de données / variance.")
     else:
-        warnings.warn("Réseaux sociaux (6D) ignoré : pas assez de données / variance.")
-else:
-    warnings.warn("Réseaux sociaux (6D) ignoré : colonnes manquantes.")
+        warnings.warn("Réseaux sociaux (6D) ignoré : colonnes manquantes.")
 
 #%% =========================
 # 6E) Probabilité de fast fashion selon l'influence réseaux (barres %)
 # =========================
-req = ["Influence_Reseaux", "Utilise_FastFashion"]
-if all(c in df.columns for c in req):
-    d = df.copy()
-    infl_rs = _to_scale_1_10(d["Influence_Reseaux"]).astype("float")
-    ff = _ff_binary(d["Utilise_FastFashion"]).astype("float")
-
-    dd = pd.DataFrame({"infl_rs": infl_rs, "ff": ff}).dropna()
-    if len(dd) >= 30:
-        grp = dd.groupby("infl_rs")["ff"].mean().mul(100).reindex(range(1, 11))
-        plt.figure(figsize=(10, 5))
-        plt.bar(grp.index.astype(int).astype(str), grp.values, edgecolor="black")
-        plt.ylim(0, 100)
-        plt.xlabel("Influence réseaux (1–10)")
-        plt.ylabel("% déclarant consommer de la fast fashion")
-        plt.title("Réseaux sociaux : probabilité de fast fashion selon l’influence", fontweight="bold")
-        export_png(FIG_DIR / "reseaux_fastfashion_selon_influence.png")
+def _agreger_6e(df: pd.DataFrame, derives: pd.DataFrame | None = None) -> Agregats | None:
+    req = ["Influence_Reseaux", "Utilise_FastFashion"]
+    if not all(c in df.columns for c in req):
+        return None
+    if derives is None:
+        derives = DERIVES.obtenir(df)
+
+    dd = pd.DataFrame({
+        "infl_rs": derives["Influence_Reseaux"].astype("float"),
+        "ff": derives["FF"].astype("float"),
+    }).dropna()
+    return Agregats(n=len(dd), ff=moments(dd["ff"], par=dd["infl_rs"]))
+
+def _finaliser_6e(agg: Agregats | None) -> None:
+    if agg is None:
+        warnings.warn("Réseaux sociaux (6E) ignoré : colonnes manquantes.")
+    elif agg["n"] >= 30:
+        grp = moyenne(agg["ff"]).mul(100).reindex(range(1, 11))
+        rendre(rendu_fastfashion_selon_influence, FIG_DIR / "reseaux_fastfashion_selon_influence.png", grp)
     else:
         warnings.warn("Réseaux sociaux (6E) ignoré : pas assez de données.")
-else:
-    warnings.warn("Réseaux sociaux (6E) ignoré : colonnes manquantes.")
+
+@tache("6E", entrees=("df", "derives"), colonnes=("Influence_Reseaux", "Utilise_FastFashion", "FF"),
+       sorties=(FIG_DIR / "reseaux_fastfashion_selon_influence.png",),
+       flux=(_agreger_6e, _finaliser_6e))
+def bloc_6e_fastfashion_selon_influence(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    _finaliser_6e(_agreger_6e(df, derives))
 
 #%% =========================
 # 6F) Carte des corrélations (mécanisme psycho-social)
 # =========================
-vars_corr = [
-    "Influence_Reseaux",
-    "Influence_Tendances",
-    "Pression_Sociale",
-    "Peur_Etre_Demode",
-    "Impact_Confiance",
-    "Sentiment_Culpabilite",
-]
-available_corr = [c for c in vars_corr if c in df.columns]
-if len(available_corr) >= 3:
-    d = df.copy()
-    mat = pd.DataFrame({c: _to_scale_1_10(d[c]).astype("float") for c in available_corr})
-    mat = mat.dropna()
-    if len(mat) >= 40:
-        corr = mat.corr()
-        plt.figure(figsize=(9, 6))
-        ax = sns.heatmap(
-            corr,
-            cmap=CERULEAN_CMAP,
-            vmin=-1, vmax=1,
-            linewidths=0.5, linecolor="white",
-            cbar_kws={"label": "Corrélation (Pearson)"}
-        )
-        ax.set_title("Réseaux sociaux : corrélations des variables psycho-sociales", fontweight="bold")
-        plt.xticks(rotation=30, ha="right")
-        plt.yticks(rotation=0)
-        export_png(FIG_DIR / "reseaux_heatmap_correlations.png")
+@tache("6F", entrees=("df", "derives"),
+       colonnes=("Influence_Reseaux", "Influence_Tendances", "Pression_Sociale", "Peur_Etre_Demode",
+                 "Impact_Confiance", "Sentiment_Culpabilite"),
+       sorties=(FIG_DIR / "reseaux_heatmap_correlations.png",))
+def bloc_6f_correlations(df: pd.DataFrame, derives: pd.DataFrame) -> None:
+    vars_corr = [
+        "Influence_Reseaux",
+        "Influence_Tendances",
+        "Pression_Sociale",
+        "Peur_Etre_Demode",
+        "Impact_Confiance",
+        "Sentiment_Culpabilite",
+    ]
+    available_corr = [c for c in vars_corr if c in df.columns]
+    if len(available_corr) >= 3:
+        mat = derives[available_corr].astype("float").dropna()
+        if len(mat) >= 40:
+            corr = mat.corr()
+            rendre(rendu_correlations, FIG_DIR / "reseaux_heatmap_correlations.png", corr)
+        else:
+            warnings.warn("Réseaux sociaux (6F) ignoré : pas assez de données.")
     else:
-        warnings.warn("Réseaux sociaux (6F) ignoré : pas assez de données.")
-else:
-    warnings.warn("Réseaux sociaux (6F) ignoré : variables insuffisantes.")
+        warnings.warn("Réseaux sociaux (6F) ignoré : variables insuffisantes.")
 
 # ============================================================
 # CHAPITRE 7 — ARBITRAGES (df_cluster)
@@ -1432,48 +1236,8 @@ else:
 # ============================================================
 
 #%% =========================
-# 7A) CARTE DES RENONCEMENTS : arbitrages moyens par cluster
+# 7A) CARTE DES RENONCEMENTS : arbitrages moyens par cluster -> figure du bloc 4G
 # =========================
-if df_cluster is not None:
-    cols = [
-        c for c in [
-            "Importance_Prix",
-            "Importance_Qualite",
-            "Importance_Confort",
-            "Souci_Ethique",
-            "Importance_Tendance",
-        ]
-        if c in df_cluster.columns
-    ]
-
-    if len(cols) >= 3:
-        grp = df_cluster.groupby("Cluster")[cols].mean().round(2)
-
-        x = np.arange(len(cols))
-        width = 0.18
-
-        plt.figure(figsize=(12, 5))
-        for i, cl in enumerate(grp.index):
-            plt.bar(
-                x + (i - len(grp.index)/2)*width + width/2,
-                grp.loc[cl].values,
-                width=width,
-                edgecolor="black",
-                label=f"Cluster {cl}"
-            )
-
-        plt.xticks(x, cols, rotation=15, ha="right")
-        plt.ylim(0, 10.5)
-        plt.title("Carte des renoncements : arbitrages moyens par cluster", fontweight="bold")
-        plt.ylabel("Niveau moyen (1–10)")
-        plt.legend()
-        export_png(FIG_DIR / "carte_renoncements_par_cluster.png")
-        print("OK - Export : reports/figures/carte_renoncements_par_cluster.png")
-    else:
-        warnings.warn("Carte des renoncements ignorée (colonnes insuffisantes).")
-else:
-    warnings.warn("Carte des renoncements ignorée (df_cluster manquant).")
-
 
 
 # ============================================================
@@ -1511,54 +1275,58 @@ def _recolor_tree_fills(ann_list, class_names=("Ne paie pas", "Paie")):
                 txt_obj.set_color("black")
 
 
-req = ["Pret_A_Payer_Plus", "Age", "Souci_Ethique", "Importance_Prix", "Importance_Qualite"]
-
-if all(c in df.columns for c in req):
-    d = df.dropna(subset=req).copy()
-
-    # cible binaire : prêt(e) si >= 7
-    y = (d["Pret_A_Payer_Plus"] >= 7).astype(int)
-
-    feats = ["Age", "Souci_Ethique", "Importance_Prix", "Importance_Qualite"]
-    X = d[feats].copy()
-
-    # sécuriser numeric
-    for c in feats:
-        X[c] = pd.to_numeric(X[c], errors="coerce")
-    X = X.dropna()
-    y = y.loc[X.index]
-
-    if len(X) >= 50 and y.nunique() >= 2:
-        tree_model = DecisionTreeClassifier(
-            max_depth=3,
-            min_samples_leaf=20,
-            class_weight="balanced",
-            random_state=RANDOM_STATE
-        )
-        tree_model.fit(X, y)
-
-        fig, ax = plt.subplots(figsize=(16, 9), facecolor="white")
-
-        ann = plot_tree(
-            tree_model,
-            feature_names=feats,
-            class_names=["Ne paie pas", "Paie"],
-            filled=True,
-            rounded=True,
-            fontsize=11,
-            ax=ax,
-            precision=2
-        )
-        _recolor_tree_fills(ann, class_names=("Ne paie pas", "Paie"))
-
-        plt.title("Règles pour payer 20% plus cher (produit éthique)", fontsize=22, fontweight="bold", pad=20)
-        export_png(FIG_DIR / "arbre_decision_payer_plus.png")
-        print("OK - Export : reports/figures/arbre_decision_payer_plus.png")
-        plt.show()
+@tache("8A", entrees=("df",), params={"random_state": RANDOM_STATE},
+       colonnes=("Pret_A_Payer_Plus", "Age", "Souci_Ethique", "Importance_Prix", "Importance_Qualite"),
+       sorties=(FIG_DIR / "arbre_decision_payer_plus.png",))
+def bloc_8a_arbre_decision(df: pd.DataFrame) -> None:
+    req = ["Pret_A_Payer_Plus", "Age", "Souci_Ethique", "Importance_Prix", "Importance_Qualite"]
+
+    if all(c in df.columns for c in req):
+        d = df.dropna(subset=req).copy()
+
+        # cible binaire : prêt(e) si >= 7
+        y = (d["Pret_A_Payer_Plus"] >= 7).astype(int)
+
+        feats = ["Age", "Souci_Ethique", "Importance_Prix", "Importance_Qualite"]
+
+        # sécuriser numeric (matrice partagée, sans imputation ni standardisation : inutiles pour un arbre)
+        m = MATRICES.obtenir(d, feats, imputer=False, standardiser=False)
+        X = m.frame()
+        y = y.loc[m.index]
+
+        if len(X) >= 50 and y.nunique() >= 2:
+            from sklearn.tree import DecisionTreeClassifier, plot_tree
+
+            tree_model = DecisionTreeClassifier(
+                max_depth=3,
+                min_samples_leaf=20,
+                class_weight="balanced",
+                random_state=RANDOM_STATE
+            )
+            tree_model.fit(X, y)
+
+            fig, ax = plt.subplots(figsize=(16, 9), facecolor="white")
+
+            ann = plot_tree(
+                tree_model,
+                feature_names=feats,
+                class_names=["Ne paie pas", "Paie"],
+                filled=True,
+                rounded=True,
+                fontsize=11,
+                ax=ax,
+                precision=2
+            )
+            _recolor_tree_fills(ann, class_names=("Ne paie pas", "Paie"))
+
+            plt.title("Règles pour payer 20% plus cher (produit éthique)", fontsize=22, fontweight="bold", pad=20)
+            export_png(FIG_DIR / "arbre_decision_payer_plus.png")
+            print("OK - Export : reports/figures/arbre_decision_payer_plus.png")
+            plt.show()
+        else:
+            warnings.warn("Arbre de décision ignoré (pas assez de données / pas de variance).")
     else:
-        warnings.warn("Arbre de décision ignoré (pas assez de données / pas de variance).")
-else:
-    warnings.warn("Arbre de décision ignoré (colonnes manquantes).")
+        warnings.warn("Arbre de décision ignoré (colonnes manquantes).")
 
 
 
@@ -1575,42 +1343,47 @@ else:
 #%% =========================
 # 9A) DESTINATION FIN DE VIE par fréquence d'achat (barres empilées)
 # =========================
-req = ["Frequence_Achat", "Destination_Fin_Vie"]
-if all(c in df.columns for c in req):
-    d = df.dropna(subset=req).copy()
-
-    dum = d["Destination_Fin_Vie"].astype(str).str.get_dummies(sep=";")
-    dum.columns = [c.strip() for c in dum.columns]
-    temp = pd.concat([d["Frequence_Achat"], dum], axis=1)
+def _agreger_9a(df: pd.DataFrame, fins: MultiHot | None = None) -> Agregats | None:
+    req = ["Frequence_Achat", "Destination_Fin_Vie"]
+    if not all(c in df.columns for c in req):
+        return None
+    d = df[req].dropna()
+    if fins is None:
+        fins = encoder_multi(df["Destination_Fin_Vie"], sep=";")
+
+    # crosstab fréquence × option (multi-choix) : GᵀX par groupe + effectif du groupe
+    return Agregats(
+        n=d.groupby("Frequence_Achat", observed=True).size(),
+        options=fins.sous_ensemble(d.index).par_groupe(d["Frequence_Achat"]),
+    )
 
-    pct = temp.groupby("Frequence_Achat").mean(numeric_only=True) * 100
+def _finaliser_9a(agg: Agregats | None) -> None:
+    if agg is None:
+        warnings.warn("Fin de vie par fréquence ignorée (colonnes manquantes).")
+        return
+    sommes = agg["options"]
+    pct = sommes.div(agg["n"], axis=0) * 100
 
     # garder top options pour lisibilité
-    top_cols = dum.sum().sort_values(ascending=False).head(6).index
+    top_cols = sommes.sum().sort_values(ascending=False).head(6).index
     pct = pct[top_cols]
 
-    x = np.arange(len(pct.index))
-    n = len(pct.columns)
-    width = min(0.8 / max(n, 1), 0.18)
-
-    plt.figure(figsize=(12, 6))
-    for i, col in enumerate(pct.columns):
-        plt.bar(
-            x + (i - (n-1)/2)*width,
-            pct[col].values,
-            width=width,
-            edgecolor="black",
-            label=col
-        )
-
-    plt.xticks(x, pct.index.astype(str), rotation=20, ha="right")
-    plt.ylabel("% des répondants (dans le groupe)")
-    plt.title("Fin de vie : % des répondants par option (multi-choix)", fontweight="bold")
-    plt.legend(bbox_to_anchor=(1.02, 1), loc="upper left")
-    export_png(FIG_DIR / "fin_de_vie_par_frequence.png")
+    rendre(rendu_fin_de_vie_par_frequence, FIG_DIR / "fin_de_vie_par_frequence.png", pct)
     print("OK - Export : reports/figures/fin_de_vie_par_frequence.png")
-else:
-    warnings.warn("Fin de vie par fréquence ignorée (colonnes manquantes).")
+
+def _agreger_9a_cube(cube: Cube) -> Agregats | None:
+    # mêmes agrégats que _agreger_9a, lus dans le cube 0K (lignes ayant répondu aux deux questions)
+    if not {"Frequence_Achat", "Destination_Fin_Vie"} <= set(cube.dimensions):
+        return None
+    n = cube.effectifs(["Frequence_Achat"], parmi="Destination_Fin_Vie")
+    options = cube.effectifs(["Frequence_Achat", "Destination_Fin_Vie"]).unstack(fill_value=0)
+    return Agregats(n=n, options=options.reindex(n.index, fill_value=0).rename_axis(columns=None))
+
+@tache("9A", entrees=("cube",),
+       sorties=(FIG_DIR / "fin_de_vie_par_frequence.png",),
+       flux=(_agreger_9a, _finaliser_9a))
+def bloc_9a_fin_de_vie_par_frequence(cube: Cube) -> None:
+    _finaliser_9a(_agreger_9a_cube(cube))
 
 
 
@@ -1641,51 +1414,19 @@ except NameError:
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
-def _savefig(path: Path):
-    try:
-        export_png(path)
-    except Exception:
-        plt.tight_layout()
-        plt.savefig(path, dpi=200, bbox_inches="tight")
-        plt.close()
-
 # -------- helpers --------
-def col_like(df: pd.DataFrame, must_contain: list[str]):
-    """Retourne la 1ère colonne dont le nom contient tous les fragments donnés."""
-    cols = []
-    for c in df.columns:
-        ok = True
-        cl = str(c).lower()
-        for frag in must_contain:
-            if frag.lower() not in cl:
-                ok = False
-                break
-        if ok:
-            cols.append(c)
-    return cols[0] if cols else None
-
-def split_multi(s: pd.Series, sep=";"):
-    """Gère multi-choix: split sur ';' et nettoyage."""
-    return (
-        s.fillna("")
-         .astype(str)
-         .str.split(sep)
-         .apply(lambda lst: [x.strip() for x in lst if x and x.strip()])
-    )
-
 def value_counts_pct(s: pd.Series, dropna=False):
     vc = s.value_counts(dropna=dropna)
     pct = (vc / vc.sum() * 100).round(1)
     return pd.DataFrame({"count": vc, "pct": pct})
 
 def barh_counts(s: pd.Series, title: str, filename: str, top_n=12):
-    d = s.fillna("Non spécifié").astype(str).str.strip()
-    vc = d.value_counts().head(top_n)[::-1]
-    plt.figure(figsize=(10, 5))
-    plt.barh(vc.index, vc.values)
-    plt.title(title, fontweight="bold")
-    plt.xlabel("Nombre de réponses")
-    _savefig(FIG_DIR / filename)
+    d = texte_ou_defaut(s)
+    barh_comptes(d.value_counts(), title, filename, top_n=top_n)
+
+def barh_comptes(vc: pd.Series, title: str, filename: str, top_n=12):
+    vc = vc.sort_values(ascending=False, kind="stable").head(top_n)[::-1]
+    rendre(rendu_barh_counts, FIG_DIR / filename, vc, title)
 
 # -------- 1) créer des alias courts (si pas déjà présents) --------
 # IMPORTANT: on ne détruit rien, on crée juste des colonnes "propres" en plus
@@ -1723,109 +1464,253 @@ ALIASES = {
     "Importance_Confort": ["caractéristiques", "confort"],
 }
 
-for short, frags in ALIASES.items():
-    if short not in df.columns:
-        original = col_like(df, frags)
-        if original is not None:
+# mêmes règles que le schéma principal (index des en-têtes, résolution mémorisée)
+SCHEMA_ANNEXES = RegistreSchema(regle(short, [" & ".join(frags)]) for short, frags in ALIASES.items())
+
+@tache("10A", entrees=("df", "multichoix"), params={"alias": ALIASES}, sorties=(
+    FIG_DIR / "dist_frequence_achat.png", FIG_DIR / "dist_canaux_achat.png", FIG_DIR / "dist_cycle_vie.png",
+    FIG_DIR / "dist_destination_fin_vie.png", FIG_DIR / "dist_raisons_fastfashion.png",
+    OUT_DIR / "resume_storytelling.md",
+))
+def bloc_10a_distributions(df: pd.DataFrame, multichoix: dict[str, MultiHot]) -> None:
+    # alias ajoutés sur une copie : df reste partagé entre les blocs
+    df = df.copy()
+    for short, original in SCHEMA_ANNEXES.resoudre(df.columns).choix.items():
+        if short not in df.columns:
             df[short] = df[original]
-        else:
-            pass
 
-# Nettoyage minimal sur les alias clés (évite erreurs .str sur DataFrame)
-for c in [
-    "Frequence_Achat", "Canal_Achat", "Cycle_Vie", "Destination_Fin_Vie",
-    "Utilise_FastFashion", "Connaissance_FF", "Raisons_FF", "Items_Achetes", "Genre"
-]:
-    if c in df.columns:
-        df[c] = df[c].fillna("Non spécifié").astype(str).str.strip()
-
-# -------- 2) visus “classiques” (distributions) --------
-if "Frequence_Achat" in df.columns:
-    barh_counts(df["Frequence_Achat"], "Fréquence d’achat (top)", "dist_frequence_achat.png", top_n=12)
-
-if "Canal_Achat" in df.columns:
-    tmp = df[["Canal_Achat"]].copy()
-    tmp["Canal_Achat"] = split_multi(tmp["Canal_Achat"])
-    tmp = tmp.explode("Canal_Achat")
-    if tmp["Canal_Achat"].notna().any():
-        barh_counts(tmp["Canal_Achat"], "Canaux d’achat (multi-choix)", "dist_canaux_achat.png", top_n=15)
-
-if "Cycle_Vie" in df.columns:
-    barh_counts(df["Cycle_Vie"], "Cycle de vie moyen d’un vêtement", "dist_cycle_vie.png", top_n=12)
-
-if "Destination_Fin_Vie" in df.columns:
-    tmp = df[["Destination_Fin_Vie"]].copy()
-    tmp["Destination_Fin_Vie"] = split_multi(tmp["Destination_Fin_Vie"])
-    tmp = tmp.explode("Destination_Fin_Vie")
-    if tmp["Destination_Fin_Vie"].notna().any():
-        barh_counts(tmp["Destination_Fin_Vie"], "Destination fin de vie (multi-choix)", "dist_destination_fin_vie.png", top_n=15)
-
-if "Raisons_FF" in df.columns:
-    tmp = df[["Raisons_FF"]].copy()
-    tmp["Raisons_FF"] = split_multi(tmp["Raisons_FF"])
-    tmp = tmp.explode("Raisons_FF")
-    if tmp["Raisons_FF"].notna().any():
-        barh_counts(tmp["Raisons_FF"], "Raisons d’achat fast fashion (multi-choix)", "dist_raisons_fastfashion.png", top_n=15)
-
-# -------- 3) exports “storytelling” en tables --------
-summary_lines = []
-summary_lines.append(f"- N réponses: {len(df)}")
-
-if "Souci_Ethique" in df.columns:
-    s = pd.to_numeric(df["Souci_Ethique"], errors="coerce")
-    if s.notna().any():
-        summary_lines.append(f"- Souci éthique (moyenne): {s.mean():.2f} / 10")
-
-if "Pret_A_Payer_Plus" in df.columns:
-    s = pd.to_numeric(df["Pret_A_Payer_Plus"], errors="coerce")
-    if s.notna().any():
-        summary_lines.append(f"- Prêt à payer +20% (moyenne): {s.mean():.2f} / 10")
-
-if "Influence_Reseaux" in df.columns:
-    s = pd.to_numeric(df["Influence_Reseaux"], errors="coerce")
-    if s.notna().any():
-        summary_lines.append(f"- Influence réseaux (moyenne): {s.mean():.2f} / 10")
-
-(Path(OUT_DIR) / "resume_storytelling.md").write_text("\n".join(summary_lines), encoding="utf-8")
-print("OK - Export : reports/resume_storytelling.md")
+    # Nettoyage minimal sur les alias clés (évite erreurs .str sur DataFrame)
+    for c in [
+        "Frequence_Achat", "Canal_Achat", "Cycle_Vie", "Destination_Fin_Vie",
+        "Utilise_FastFashion", "Connaissance_FF", "Raisons_FF", "Items_Achetes", "Genre"
+    ]:
+        if c in df.columns:
+            df[c] = texte_ou_defaut(df[c])
+
+    # -------- 2) visus “classiques” (distributions) --------
+    if "Frequence_Achat" in df.columns:
+        barh_counts(df["Frequence_Achat"], "Fréquence d’achat (top)", "dist_frequence_achat.png", top_n=12)
+
+    # multi-choix : comptes par modalité depuis l'encodage partagé (0I) ; sans réponse = "Non spécifié"
+    if "Canal_Achat" in multichoix and len(df):
+        barh_comptes(multichoix["Canal_Achat"].comptes(vide="Non spécifié"),
+                     "Canaux d’achat (multi-choix)", "dist_canaux_achat.png", top_n=15)
+
+    if "Cycle_Vie" in df.columns:
+        barh_counts(df["Cycle_Vie"], "Cycle de vie moyen d’un vêtement", "dist_cycle_vie.png", top_n=12)
+
+    if "Destination_Fin_Vie" in multichoix and len(df):
+        barh_comptes(multichoix["Destination_Fin_Vie"].comptes(vide="Non spécifié"),
+                     "Destination fin de vie (multi-choix)", "dist_destination_fin_vie.png", top_n=15)
+
+    # alias (colonne hors encodage partagé) : encodé ici
+    if "Raisons_FF" in df.columns and len(df):
+        barh_comptes(encoder_multi(df["Raisons_FF"], sep=";").comptes(vide="Non spécifié"),
+                     "Raisons d’achat fast fashion (multi-choix)", "dist_raisons_fastfashion.png", top_n=15)
+
+    # -------- 3) exports “storytelling” en tables --------
+    summary_lines = []
+    summary_lines.append(f"- N réponses: {len(df)}")
+
+    if "Souci_Ethique" in df.columns:
+        s = pd.to_numeric(df["Souci_Ethique"], errors="coerce")
+        if s.notna().any():
+            summary_lines.append(f"- Souci éthique (moyenne): {s.mean():.2f} / 10")
+
+    if "Pret_A_Payer_Plus" in df.columns:
+        s = pd.to_numeric(df["Pret_A_Payer_Plus"], errors="coerce")
+        if s.notna().any():
+            summary_lines.append(f"- Prêt à payer +20% (moyenne): {s.mean():.2f} / 10")
+
+    if "Influence_Reseaux" in df.columns:
+        s = pd.to_numeric(df["Influence_Reseaux"], errors="coerce")
+        if s.notna().any():
+            summary_lines.append(f"- Influence réseaux (moyenne): {s.mean():.2f} / 10")
+
+    ecrire_texte(OUT_DIR / "resume_storytelling.md", "\n".join(summary_lines))
+    print("OK - Export : reports/resume_storytelling.md")
 
 #%% =========================
-# 10B) RÉSUMÉ DES EXPORTS (liste)
+# 10B) MANIFESTE DES EXPORTS (fichiers réellement écrits)
 # =========================
-generated = [
-    "reports/diagnostic_colonnes.txt",
-    "reports/figures/grand_paradoxe.png",
-    "reports/figures/paradoxe_par_age.png",
-    "reports/figures/paradoxe_par_canal.png",
-    "reports/figures/boxplot_culpabilite_par_paradoxe.png",
-    "reports/figures/heatmap_densite_ethique_culpabilite.png",
-    "reports/sankey_parcours_3_etapes.html",
-    "reports/sankey_cycle_complet_4_etapes.html",
-    "reports/figures/reseau_items_tendance.png",
-    "reports/figures/personas_scatter.png",
-    "reports/personas_clusters.csv",
-    "reports/personas_moyennes_par_cluster.csv",
-    "reports/figures/waffle_clusters_typologie.png",
-    "reports/figures/heatmap_items_par_cluster.png",
-    "reports/figures/obsolescence_psy_par_cluster.png",
-    "reports/utilise_fastfashion_pct_par_cluster.csv",
-    "reports/figures/fastfashion_pct_par_cluster.png",
-    "reports/figures/carte_renoncements_par_cluster.png",
-    "reports/figures/arbre_decision_payer_plus.png",
-    "reports/figures/fin_de_vie_par_frequence.png",
-    "reports/figures/dist_frequence_achat.png",
-    "reports/figures/dist_canaux_achat.png",
-    "reports/figures/dist_cycle_vie.png",
-    "reports/figures/dist_destination_fin_vie.png",
-    "reports/figures/dist_raisons_fastfashion.png",
-    "reports/resume_storytelling.md",
-]
+def ecrire_manifeste(selection: list[str]) -> None:
+    """reports/manifest.json + reports/resume_exports.md depuis le registre des artefacts (voir pipeline_artefacts.py)."""
+    m = ARTEFACTS.ecrire_manifeste(OUT_DIR / "manifest.json", OUT_DIR / "resume_exports.md", selection)
+    t = m["totaux"]
+    print(f"OK - Export : reports/manifest.json + reports/resume_exports.md "
+          f"({t['fichiers']} fichiers, {t['octets'] / 1e6:.2f} Mo, {len(m['rendus_evites'])} rendus évités)")
+
+
+# ============================================================
+# INGESTION MULTI-VAGUES (--ingest) : voir pipeline_vagues.py
+# Ex : python main.py --ingest "exports/*.csv" puis python main.py --vagues V1,V3
+# ============================================================
+def ingestion_vagues(sources: str) -> None:
+    # preparer_vague par nom de module : importable dans les processus du pool (même sous main.py)
+    catalogue = ingerer_vagues(
+        sources, ENTREPOT_DIR, preparer=("pipeline_visualisations", "preparer_vague"),
+        version=cle_frame(*version_normalisation()), workers=VAGUES_WORKERS,
+    )
+    bilan = catalogue["ingestion"]
+    print(f"OK - Ingestion : {bilan['fichiers']} fichiers ({bilan['normalises']} normalisés, {bilan['inchanges']} inchangés) "
+          f"en {bilan['duree_s']:.2f} s sur {bilan['workers']} processus")
+    for ligne in rapport_schema(catalogue):
+        print(ligne)
+    print(f"OK - Entrepôt : {ENTREPOT_DIR.as_posix()} ({len(catalogue['vagues'])} vagues, catalogue.json)")
+
+
+# ============================================================
+# SERVICE LOCAL D'AGRÉGATS (--serve) : voir pipeline_service.py
+# Ex : curl "http://127.0.0.1:8765/taux?mesure=Paradoxe&par=Age_Groupe&Cluster=2"
+# ============================================================
+SERVICE_HOTE = "127.0.0.1"  # local uniquement
+SERVICE_PORT = 8765
+SERVICE_ETAPES = ["Frequence_Achat", "Canal_Achat", "Utilise_FastFashion", "Destination_Fin_Vie", "Genre", "Situation_Pro"]
+SERVICE_AUTRES = {
+    "Frequence_Achat": "Autres fréquences", "Canal_Achat": "Autres canaux", "Destination_Fin_Vie": "Autres destinations",
+}
 
-md = ["# Résumé des exports\n", "Fichiers potentiellement générés :\n"]
-for p in generated:
-    md.append(f"- {p}")
+def charger_service(capacite: int = 256):
+    """
+    df normalisé, indicateurs et multi-choix (blocs 0G–0K, cache d'artefacts) + personas du modèle
+    persisté (score_respondents, sans réajustement), puis cube du service : dimensions du cube 0K
+    + Cluster, choix multiples + Type_Articles_Achetes.
+    """
+    from pipeline_service import ServiceAgregats
 
-(OUT_DIR / "resume_exports.md").write_text("\n".join(md), encoding="utf-8")
-print("OK - Export : reports/resume_exports.md")
+    cache = None if not CACHE_FRAME else CacheArtefacts()
+    produits = TACHES.executer(TACHES.selection(only=["0K"]), cache=cache)
+    if cache is not None:
+        cache.valider()
+    df, derives, multichoix = produits["df"], produits["derives"], produits["multichoix"]
 
-print("OK - Annexes descriptives + résumés exports générés.")
+    lignes = _colonnes_cube(df, derives, CUBE_DIMENSIONS)
+    if MODELE_PERSONAS_PATH.exists():
+        lignes["Cluster"] = score_respondents(df)
+    else:
+        warnings.warn(f"Pas de personas ({MODELE_PERSONAS_PATH.as_posix()} absent) : lancer d'abord le bloc 4A.")
+    cube = construire_cube(
+        lignes, _colonnes_cube(df, derives, CUBE_MESURES),
+        multiples={q: multichoix[q] for q in [*CUBE_MULTIPLES, "Type_Articles_Achetes"] if q in multichoix},
+        ordre=CUBE_ORDRE,
+    )
+    return ServiceAgregats(
+        cube, lignes, df,
+        etapes=lambda d, colonnes: etapes_sankey(d, multichoix, colonnes, autres=SERVICE_AUTRES),
+        etapes_autorisees=SERVICE_ETAPES, capacite=capacite,
+    )
+
+def servir_agregats(port: int = SERVICE_PORT, hote: str = SERVICE_HOTE) -> None:
+    from pipeline_service import creer_serveur
+
+    service = charger_service()
+    serveur = creer_serveur(service, hote, port)
+    print(f"OK - Service d'agrégats : http://{hote}:{serveur.server_port}/dimensions "
+          f"({service.cube.effectifs()} répondants, {len(service.cube.dimensions)} dimensions) — Ctrl+C pour arrêter")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+        print(f"OK - Service arrêté ({service.cache.hits} réponses du cache, {service.cache.misses} calculées)")
+
+
+# ============================================================
+# EXÉCUTION — DAG DES BLOCS
+# Ex : python notebooks/pipeline_visualisations.py --only 4C,6F
+#      python notebooks/pipeline_visualisations.py --from 4A
+# ============================================================
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pipeline visualisations (blocs 0G … 10A).")
+    groupe = parser.add_mutually_exclusive_group()
+    groupe.add_argument("--only", help="blocs à exécuter, séparés par des virgules (ex: 4C,6F) + leur amont")
+    groupe.add_argument("--from", dest="depuis", help="exécute ce bloc et tous les suivants (ex: 4A) + leur amont")
+    parser.add_argument("--list", action="store_true", help="affiche le graphe des blocs sans rien exécuter")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="rendu des figures en parallèle sur N processus (0 = série, par défaut)")
+    parser.add_argument("--stream", action="store_true",
+                        help="lit le CSV par morceaux (mémoire bornée) ; seuls les blocs agrégables tournent (1A-1C, 6B, 6E, 9A)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="lignes par morceau en mode --stream")
+    parser.add_argument("--incremental", nargs="?", const=str(DATA_PATH), metavar="CSV",
+                        help="met à jour les personas avec les nouvelles réponses du CSV (après la dernière Date de saisie vue)")
+    parser.add_argument("--profil", choices=NIVEAUX, default=niveau_par_defaut(),
+                        help="mesures par bloc : leger (temps, lignes, écritures) ou memoire (+ pic tracemalloc) ; "
+                             "défaut : memoire si la variable CI est définie, sinon leger")
+    parser.add_argument("--cprofile", nargs="?", const="*", metavar="BLOCS",
+                        help="profil cProfile des blocs (ex: 4A,8A ; tous si vide) -> reports/profil/<bloc>.prof + piles")
+    parser.add_argument("--ingest", metavar="SOURCES",
+                        help=f"normalise les exports CSV d'un dossier ou motif glob (ex: 'exports/*.csv') en parallèle "
+                             f"vers l'entrepôt partitionné {ENTREPOT_DIR.as_posix()}/vague=<nom>/")
+    parser.add_argument("--vagues", nargs="?", const="", metavar="NOMS",
+                        help="lit ces vagues de l'entrepôt (séparées par des virgules ; toutes si vide) au lieu du CSV")
+    parser.add_argument("--serve", nargs="?", type=int, const=SERVICE_PORT, metavar="PORT",
+                        help=f"service JSON local (taux, adoption, Sankey) sur 127.0.0.1 (port {SERVICE_PORT} par défaut)")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="garde les types de la normalisation (objets, float64) au lieu du plan compact")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore le cache d'artefacts et du df normalisé (.cache/pipeline) et régénère tout")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print(TACHES.decrire())
+        return
+    if args.incremental:
+        personas_incrementales(Path(args.incremental))
+        ecrire_manifeste(["incremental"])
+        return
+    if args.ingest:
+        ingestion_vagues(args.ingest)
+        return
+    global CACHE_FRAME, VAGUES, TYPES_COMPACTS
+    CACHE_FRAME = not args.no_cache
+    TYPES_COMPACTS = not args.no_compact
+    if args.vagues is not None:
+        if args.stream:
+            parser.error("--stream lit un CSV par morceaux : incompatible avec --vagues")
+        VAGUES = [v.strip() for v in args.vagues.split(",") if v.strip()]
+    if args.serve is not None:
+        servir_agregats(args.serve)
+        return
+
+    only = args.only.split(",") if args.only else None
+    try:
+        selection = TACHES.selection(only=only, depuis=args.depuis)
+    except KeyError as e:
+        parser.error(str(e))
+
+    print(f"OK - Blocs sélectionnés : {', '.join(selection)}")
+    cache = None if (args.no_cache or args.stream) else CacheArtefacts()
+    profil = Profileur(args.profil, set(args.cprofile.split(",")) if args.cprofile else None)
+    if args.workers > 0:
+        demarrer_rendu_parallele(args.workers)
+    try:
+        if args.stream:
+            # pas de df complet : 0G (en-tête) puis une passe par morceaux pour les blocs streamables
+            # (0H–0K : préparation du df complet, pas des figures, donc ni exécutés ni signalés)
+            produits = TACHES.executer(["0G"], profil=profil)
+            mapping = produits["mapping"]
+            morceaux = lire_par_morceaux(
+                Path(produits["source"]["path"]), lambda m: normaliser(m, mapping), taille=args.chunksize,
+            )
+            ignores = TACHES.executer_flux([n for n in selection if n not in ("0G", "0H", "0I", "0J", "0K")], morceaux, profil=profil)
+            if ignores:
+                print(f"INFO - Mode flux : blocs non agrégables ignorés : {', '.join(ignores)}")
+        else:
+            TACHES.executer(selection, cache=cache, profil=profil)
+    finally:
+        faits = terminer_rendu_parallele()
+    if faits:
+        print(f"OK - Rendu parallèle : {len(faits)} figures ({args.workers} processus)")
+    if cache is not None:
+        cache.valider()
+        print(f"OK - Cache : {len(cache.hits)} blocs réutilisés, {len(cache.misses)} exécutés")
+    res = profil.exporter(OUT_DIR, ARTEFACTS)
+    lents = sorted(res["blocs"], key=lambda b: -b["duree_s"])[:3]
+    print(f"OK - Profil ({res['niveau']}) : reports/profil.json + reports/profil.folded — plus lents : "
+          + ", ".join(f"{b['bloc']} {b['duree_s']:.2f} s" for b in lents))
+    ecrire_manifeste(selection)
+
+
+if __name__ == "__main__":
+    main()
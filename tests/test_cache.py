@@ -0,0 +1,113 @@
+"""Cache d'artefacts : la clé d'un bloc suit les fonctions de rendu appelées indirectement."""
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_cache import CacheArtefacts  # noqa: E402
+
+RENDU = '''
+from pathlib import Path
+
+
+def _titre() -> str:
+    return "{titre}"
+
+
+def rendu_figure(path: Path) -> None:
+    path.write_text(_titre(), encoding="utf-8")
+'''
+
+BLOCS = '''
+from pathlib import Path
+
+from pipeline_taches import RegistreTaches
+from pipeline_essai_rendu import rendu_figure
+
+TACHES = RegistreTaches()
+SORTIE = Path({sortie!r})
+
+
+def _finaliser() -> None:
+    rendu_figure(SORTIE)
+
+
+@TACHES.tache("1A", sorties=(SORTIE,))
+def bloc_1a() -> None:
+    _finaliser()
+'''
+
+
+def _charger(dossier: Path, titre: str, sortie: Path):
+    (dossier / "pipeline_essai_rendu.py").write_text(RENDU.format(titre=titre), encoding="utf-8")
+    (dossier / "pipeline_essai_blocs.py").write_text(BLOCS.format(sortie=str(sortie)), encoding="utf-8")
+    for m in ("pipeline_essai_blocs", "pipeline_essai_rendu"):
+        sys.modules.pop(m, None)
+    importlib.invalidate_caches()
+    return importlib.import_module("pipeline_essai_blocs").TACHES
+
+
+def _executer(taches, cache: CacheArtefacts) -> None:
+    taches.executer(["1A"], cache=cache)
+    cache.valider()
+
+
+def test_modifier_un_rendu_indirect_invalide_le_bloc(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    sortie = tmp_path / "figure.txt"
+
+    cache = CacheArtefacts(tmp_path / "cache")
+    _executer(_charger(tmp_path, "Ancien titre", sortie), cache)
+    assert cache.misses == ["1A"]
+
+    cache = CacheArtefacts(tmp_path / "cache")
+    _executer(_charger(tmp_path, "Ancien titre", sortie), cache)
+    assert cache.hits == ["1A"]
+
+    # rendu_figure -> _titre : deux niveaux sous le bloc (bloc -> _finaliser -> rendu_figure)
+    cache = CacheArtefacts(tmp_path / "cache")
+    _executer(_charger(tmp_path, "Nouveau titre, plus long", sortie), cache)
+    assert cache.misses == ["1A"]
+    assert sortie.read_text(encoding="utf-8") == "Nouveau titre, plus long"
+
+
+def test_blocs_du_pipeline_suivent_leurs_finaliseurs(tmp_path, monkeypatch):
+    # blocs découpés en _agreger_* / _finaliser_* : les rendu_* sont deux niveaux sous le @tache
+    monkeypatch.chdir(tmp_path)
+    import pipeline_visualisations as pv
+    from pipeline_cache import dependances_code
+
+    attendus = {
+        "1A": ({"_finaliser_1a", "rendu_grand_paradoxe", "export_png"}, "pipeline_rendu"),
+        "6B": ({"_finaliser_6b", "export_png"}, "pipeline_rendu"),
+        "9A": ({"_finaliser_9a", "export_png"}, "pipeline_rendu"),
+        "4B": ({"rendu_waffle", "grille_waffle"}, "pipeline_rendu"),
+        "2A": ({"etapes_sankey", "flux_sankey"}, "pipeline_multichoix"),
+    }
+    for bloc, (noms, module) in attendus.items():
+        fonctions, modules = dependances_code(pv.TACHES.taches[bloc].fonction)
+        atteintes = {f.__name__ for f in fonctions}
+        assert noms <= atteintes, (bloc, noms - atteintes)
+        assert module in modules, (bloc, modules)
+
+
+def test_matrice_features_meme_cle_apres_aller_retour():
+    import pickle
+
+    import numpy as np
+    import pandas as pd
+
+    from pipeline_cache import hash_valeur
+    from pipeline_matrices import construire_matrice
+
+    df = pd.DataFrame({"a": [1.0, 2.0, np.nan, 4.0], "b": [3, 1, 2, 5]}, index=[10, 11, 12, 13])
+    matrice = construire_matrice(df, ["a", "b"])
+    relue = pickle.loads(pickle.dumps(matrice, protocol=4))
+    assert hash_valeur(relue) == hash_valeur(matrice)
+    autre = construire_matrice(df.assign(b=[3, 1, 2, 6]), ["a", "b"])
+    assert hash_valeur(autre) != hash_valeur(matrice)
@@ -0,0 +1,88 @@
+"""Cube d'agrégats : taux et moyennes lus dans les cuboïdes = crosstab / groupby sur les répondants."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_cube import construire_cube  # noqa: E402
+from pipeline_multichoix import encoder_multi  # noqa: E402
+
+
+def _repondants(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Cluster": rng.choice(["P1", "P2", "P3"], size=n),
+        "Frequence": rng.choice(["Annuelle", "Mensuelle", "Trimestrielle"], size=n),
+        "Age": rng.choice(["18-24", "25-34", "35+"], size=n),
+        "Canal": [";".join(rng.choice(["Internet", "Magasin", "Friperie"], size=rng.integers(1, 3), replace=False))
+                  for _ in range(n)],
+        "Budget": rng.normal(60, 20, size=n),
+        "Score": rng.integers(1, 6, size=n).astype(float),
+    })
+    # valeurs manquantes : dimension non renseignée, mesure absente, aucun canal coché
+    df.loc[rng.random(n) < 0.1, "Frequence"] = np.nan
+    df.loc[rng.random(n) < 0.15, "Budget"] = np.nan
+    df.loc[rng.random(n) < 0.1, "Canal"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def df_et_cube():
+    df = _repondants()
+    cube = construire_cube(df[["Cluster", "Frequence", "Age"]], df[["Budget", "Score"]],
+                           multiples={"Canal": encoder_multi(df["Canal"])}, ordre=2)
+    return df, cube
+
+
+@pytest.mark.parametrize("dimension, par", [("Frequence", ["Cluster"]), ("Cluster", ["Frequence", "Age"]),
+                                            ("Age", [])])
+def test_taux_egal_crosstab(df_et_cube, dimension, par):
+    df, cube = df_et_cube
+    obtenu = cube.taux(dimension, par=par)
+    if not par:
+        attendu = df[dimension].value_counts(normalize=True).sort_index()
+        pd.testing.assert_series_equal(obtenu, attendu, check_names=False, check_index_type=False)
+        return
+    attendu = pd.crosstab([df[p] for p in par], df[dimension], normalize="index")
+    obtenu = obtenu.reindex(index=attendu.index, columns=attendu.columns)
+    pd.testing.assert_frame_equal(obtenu, attendu, check_names=False)
+
+
+def test_taux_multiple_parmi_toutes_les_lignes_du_groupe(df_et_cube):
+    df, cube = df_et_cube
+    eclate = df.assign(Canal=df["Canal"].str.split(";")).explode("Canal")
+    comptes = pd.crosstab(eclate["Cluster"], eclate["Canal"])
+    attendu = comptes.div(df["Cluster"].value_counts(), axis=0)
+    obtenu = cube.taux("Canal", par=["Cluster"]).reindex(index=attendu.index, columns=attendu.columns)
+    pd.testing.assert_frame_equal(obtenu, attendu, check_names=False)
+    # parmi = seulement les lignes ayant coché au moins un canal
+    attendu_parmi = comptes.div(df.dropna(subset=["Canal"])["Cluster"].value_counts(), axis=0)
+    obtenu_parmi = cube.taux("Canal", par=["Cluster"], parmi="Canal").reindex(index=attendu.index,
+                                                                               columns=attendu.columns)
+    pd.testing.assert_frame_equal(obtenu_parmi, attendu_parmi, check_names=False)
+
+
+@pytest.mark.parametrize("par", [["Cluster"], ["Cluster", "Frequence"], ["Age", "Cluster", "Frequence"]])
+def test_moyennes_egales_groupby(df_et_cube, par):
+    df, cube = df_et_cube  # ordre 3 : roll-up depuis la base au-delà des cuboïdes précalculés
+    attendu = df.groupby(par)[["Budget", "Score"]].mean()
+    obtenu = cube.moyennes(["Budget", "Score"], par=par)
+    pd.testing.assert_frame_equal(obtenu.reindex(attendu.index), attendu, check_names=False)
+
+
+def test_effectifs_et_dimensions_multiples(df_et_cube):
+    df, cube = df_et_cube
+    assert cube.effectifs() == len(df)
+    assert cube.effectifs(parmi="Canal") == int(df["Canal"].notna().sum())
+    with pytest.raises(KeyError):
+        cube.taux("Revenu")
+    with pytest.raises(ValueError):
+        construire_cube(df[["Cluster"]], multiples={"A": encoder_multi(df["Canal"]),
+                                                    "B": encoder_multi(df["Canal"])}).effectifs(["A", "B"])
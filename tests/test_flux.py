@@ -0,0 +1,76 @@
+"""Mode --stream : agrégats fusionnés morceau par morceau = agrégats du df complet."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_donnees import Agregats, moments, moyenne, variance  # noqa: E402
+
+BLOCS = ("1A", "1B", "1C", "6B", "6E", "9A")
+
+
+def test_fusionner_additionne_aligne():
+    a = Agregats(n=3, comptes=pd.Series({"x": 2, "y": 1}))
+    b = Agregats(n=2, comptes=pd.Series({"y": 4, "z": 1}), nouveau=1)
+    f = a.fusionner(b).fusionner(None)
+    assert f["n"] == 5 and f["nouveau"] == 1
+    assert f["comptes"].to_dict() == {"x": 2, "y": 5, "z": 1}
+
+
+def test_moments_fusionnes_moyenne_et_variance_exactes():
+    rng = np.random.default_rng(0)
+    v = pd.Series(rng.normal(size=500)).mask(rng.random(500) < 0.1)
+    g = pd.Series(rng.choice(["a", "b", "c"], size=500))
+    morceaux = [Agregats(m=moments(v[i:i + 70], par=g[i:i + 70])) for i in range(0, 500, 70)]
+    total = morceaux[0]
+    for m in morceaux[1:]:
+        total.fusionner(m)
+    pd.testing.assert_series_equal(moyenne(total["m"]), v.groupby(g).mean(), check_names=False)
+    pd.testing.assert_series_equal(variance(total["m"]), v.groupby(g).var(), check_names=False)
+
+
+@pytest.fixture(scope="module")
+def pv_et_df(tmp_path_factory):
+    import os
+
+    dossier = tmp_path_factory.mktemp("flux")
+    avant = os.getcwd()
+    os.chdir(dossier)  # sorties éventuelles du module dans un dossier jetable
+    try:
+        import pipeline_visualisations as pv
+    finally:
+        os.chdir(avant)
+    brut = pd.read_csv(RACINE / "data" / "La mode - LaMode.csv")
+    return pv, pv.normaliser(brut, pv.SCHEMA.resoudre(brut.columns).mapping)
+
+
+@pytest.mark.parametrize("bloc", BLOCS)
+def test_agregats_par_morceaux_egaux_au_df_complet(pv_et_df, bloc):
+    pv, df = pv_et_df
+    agreger = pv.TACHES.taches[bloc].flux[0]
+    complet = agreger(df)
+    fusion = None
+    for debut in range(0, len(df), 97):  # morceaux de tailles inégales, modalités absentes de certains morceaux
+        a = agreger(df.iloc[debut:debut + 97])
+        fusion = a if fusion is None else fusion.fusionner(a)
+
+    assert complet is not None and set(fusion.valeurs) == set(complet.valeurs)
+    for nom, attendu in complet.valeurs.items():
+        obtenu = fusion[nom]
+        if isinstance(attendu, (pd.Series, pd.DataFrame)):
+            assert set(obtenu.index) <= set(attendu.index), nom
+        if isinstance(attendu, pd.DataFrame):
+            obtenu = obtenu.reindex(index=attendu.index, columns=attendu.columns, fill_value=0)
+            pd.testing.assert_frame_equal(obtenu, attendu, check_dtype=False)
+        elif isinstance(attendu, pd.Series):
+            obtenu = obtenu.reindex(attendu.index, fill_value=0)
+            pd.testing.assert_series_equal(obtenu, attendu, check_dtype=False, check_names=False)
+        else:
+            assert obtenu == attendu
@@ -0,0 +1,86 @@
+"""Encodage multi-hot : flux Sankey comparés à la version explode (une ligne par chemin), arêtes à la version dense."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_multichoix import encoder_multi, encoder_simple, flux_sankey  # noqa: E402
+
+
+def _reponses() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Canal": ["Internet;Magasin", "Magasin", "Internet", "Friperie;Internet;Magasin", "Magasin"],
+        "Frequence": ["Mensuelle", "Annuelle", "Mensuelle", "Mensuelle", "Trimestrielle"],
+        "Fin_Vie": ["Don", "Don;Revente", "Poubelle", "Revente", "Don;Poubelle"],
+    })
+
+
+def _liens_explode(df: pd.DataFrame, colonnes: list[str], pondere: bool) -> dict[tuple[str, str], float]:
+    """Référence : un chemin par combinaison des choix ; poids 1 / nombre de chemins du répondant si pondéré."""
+    chemins = df[colonnes].copy()
+    for c in colonnes:
+        chemins[c] = chemins[c].str.split(";")
+    for c in colonnes:
+        chemins = chemins.explode(c)
+    chemins["poids"] = 1.0 / chemins.groupby(level=0)[colonnes[0]].transform("size") if pondere else 1.0
+    liens = {}
+    for a, b in zip(colonnes, colonnes[1:]):
+        for (sa, sb), v in chemins.groupby([a, b])["poids"].sum().items():
+            liens[(f"{a}:{sa}", f"{b}:{sb}")] = v
+    return liens
+
+
+@pytest.mark.parametrize("pondere", [True, False])
+def test_flux_sankey_egal_explode(pondere):
+    df = _reponses()
+    colonnes = ["Canal", "Frequence", "Fin_Vie"]
+    etapes = [encoder_multi(df["Canal"]), encoder_simple(df["Frequence"]), encoder_multi(df["Fin_Vie"])]
+    labels, sources, targets, values = flux_sankey(etapes, pondere=pondere)
+
+    etape_du_noeud = np.repeat(colonnes, [len(e.vocabulaire) for e in etapes])
+    noms = [f"{c}:{m}" for c, m in zip(etape_du_noeud, labels)]
+    obtenus = {(noms[s], noms[t]): v for s, t, v in zip(sources, targets, values)}
+    attendus = _liens_explode(df, colonnes, pondere)
+    assert obtenus.keys() == attendus.keys()
+    for lien, v in attendus.items():
+        assert obtenus[lien] == pytest.approx(v)
+    if pondere:
+        # chaque répondant pèse 1 entre chaque paire d'étapes
+        assert sum(v for (s, _), v in obtenus.items() if s.startswith("Canal:")) == pytest.approx(len(df))
+
+
+def test_flux_sankey_refuse_une_ligne_sans_choix():
+    df = _reponses()
+    df.loc[2, "Canal"] = np.nan
+    with pytest.raises(ValueError):
+        flux_sankey([encoder_multi(df["Canal"]), encoder_simple(df["Frequence"])])
+    # avec_vide : la ligne passe par la modalité "Non spécifié"
+    labels, *_ = flux_sankey([encoder_multi(df["Canal"]).avec_vide("Non spécifié"), encoder_simple(df["Frequence"])])
+    assert "Non spécifié" in labels
+
+
+def test_aretes_phi_egal_corrcoef_dense():
+    rng = np.random.default_rng(0)
+    items = ["Campus", "Cargo", "Samba", "Sonny Angel", "Tote bag", "Uggs"]
+    reponses = pd.Series([";".join(rng.choice(items, size=rng.integers(1, 4), replace=False)) for _ in range(200)])
+    mh = encoder_multi(reponses)
+    dense = mh.matrice.toarray().astype(float)
+    attendu = np.corrcoef(dense, rowvar=False)
+
+    a = mh.aretes("phi")
+    assert len(a) > 0
+    np.testing.assert_allclose(a["poids"], attendu[a["source"], a["cible"]])
+    np.testing.assert_array_equal(a["cooc"], (dense.T @ dense)[a["source"], a["cible"]])
+    # seuil et top_k : mêmes paires que sur la matrice dense
+    i, j = np.triu_indices(len(items), k=1)
+    fortes = attendu[i, j] > 0
+    assert len(mh.aretes("phi", seuil=0)) == int(fortes.sum())
+    top = mh.aretes("phi", top_k=3)
+    assert sorted(top["poids"], reverse=True) == pytest.approx(sorted(attendu[i, j], reverse=True)[:3])
@@ -0,0 +1,74 @@
+"""Mode incrémental : identité des réponses (clé, filigrane, empreintes) et empreintes indépendantes des types."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_personas import EtatIncremental, ModelePersonas, empreintes_lignes  # noqa: E402
+
+
+def _lot() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Age": [21, 34, 21],
+        "Souci_Ethique": [7.0, np.nan, 7.0],
+        "Canal_Achat": ["Internet", "Magasin physique", "Internet"],
+    })
+
+
+def test_empreintes_independantes_du_plan_de_types():
+    brut = _lot()
+    compact = brut.astype({"Age": "int8", "Souci_Ethique": "Int8", "Canal_Achat": "category"})
+    colonnes = list(brut.columns)
+    assert (empreintes_lignes(brut, colonnes) == empreintes_lignes(compact, colonnes)).all()
+
+
+def _etat(lignes: pd.DataFrame, **options) -> EtatIncremental:
+    modele = ModelePersonas(["Age"], [21.0], [0.0], [1.0], [[20.0], [40.0]])
+    X = lignes[["Age"]].to_numpy(dtype=float)
+    return EtatIncremental.initialiser(modele, X, modele.affecter(X), lignes=lignes, **options)
+
+
+def test_memes_reponses_deux_repondants():
+    lot = _lot()
+    e = empreintes_lignes(lot, list(lot.columns))
+    assert e[0] == e[2] and e[0] != e[1]  # mêmes réponses : même empreinte...
+    lot["Clé"] = ["AAAA-0001", "AAAA-0002", "AAAA-0003"]
+    etat = _etat(lot.iloc[:2], colonnes_empreinte=list(_lot().columns), colonne_cle="Clé")
+    tri = etat.trier_lot(lot)
+    # ...mais deux répondants distincts : la clé fait l'identité
+    assert tri["regle"].tolist() == ["cle"] * 3
+    assert tri["nouvelle"].tolist() == [False, False, True]
+
+
+def test_trier_lot_date_puis_empreinte():
+    lot = _lot()
+    etat = _etat(lot.iloc[:2], colonnes_empreinte=list(lot.columns))
+    etat.filigrane = "2025-10-16T12:00:00"
+    dates = pd.Series(pd.to_datetime(["2030-01-01", "2025-01-01", None]), index=lot.index)
+    tri = etat.trier_lot(lot, dates)
+    # ligne 0 : réponses déjà vues mais date postérieure au filigrane -> nouveau répondant
+    assert tri["regle"].tolist() == ["date", "date", "empreinte"]
+    assert tri["nouvelle"].tolist() == [True, False, False]
+
+
+def test_identites_plafonnees(monkeypatch):
+    import pipeline_personas
+
+    monkeypatch.setattr(pipeline_personas, "IDENTITES_MAX", 2)
+    lot = _lot().assign(**{"Clé": ["A", "B", "C"]})
+    etat = _etat(lot, colonnes_empreinte=["Age"], colonne_cle="Clé")
+    assert etat.cles == ["B", "C"] and len(etat.empreintes) == 2
+
+
+def test_empreinte_colonne_absente():
+    lot = _lot()
+    e = empreintes_lignes(lot, list(lot.columns))
+    # colonne absente du lot : manquante, donc une autre identité
+    sans_canal = empreintes_lignes(lot.drop(columns="Canal_Achat"), list(lot.columns))
+    assert not np.isin(sans_canal, e).any()
@@ -0,0 +1,44 @@
+"""Silhouette à mémoire bornée : mêmes valeurs que sklearn, quelle que soit la taille des tuiles."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.metrics import silhouette_samples, silhouette_score
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_qualite import silhouette_echantillon, silhouette_lignes, silhouette_par_blocs  # noqa: E402
+
+
+def _nuages(n: int = 600, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 4, size=n)
+    X = rng.normal(size=(n, 5)) + labels[:, None] * 1.5
+    return X, labels
+
+
+@pytest.mark.parametrize("memoire_mo", [64, 0.01])  # une tuile / beaucoup de petites tuiles
+def test_silhouette_par_blocs_egale_sklearn(memoire_mo):
+    X, labels = _nuages()
+    assert silhouette_par_blocs(X, labels, memoire_mo) == pytest.approx(silhouette_score(X, labels), abs=1e-10)
+    np.testing.assert_allclose(silhouette_lignes(X, labels, memoire_mo=memoire_mo), silhouette_samples(X, labels),
+                               atol=1e-10)
+
+
+def test_silhouette_singleton_nulle_comme_sklearn():
+    X, labels = _nuages(50)
+    labels[7] = 9  # cluster à un seul point : s = 0
+    assert silhouette_lignes(X, labels)[7] == 0.0
+    assert silhouette_par_blocs(X, labels) == pytest.approx(silhouette_score(X, labels), abs=1e-10)
+
+
+def test_silhouette_echantillon_encadre_la_valeur_exacte():
+    X, labels = _nuages(3_000)
+    exacte = silhouette_score(X, labels)
+    est = silhouette_echantillon(X, labels, taille=600, references=300, random_state=0)
+    assert est["silhouette_ic_bas"] <= est["silhouette_estimee"] <= est["silhouette_ic_haut"]
+    assert est["silhouette_estimee"] == pytest.approx(exacte, abs=0.03)
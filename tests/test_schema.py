@@ -0,0 +1,65 @@
+"""Registre de schéma : résolution des noms canoniques et diagnostics (AMBIGU, NON TROUVÉ, CONFLIT, IGNORÉ)."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_schema import RegistreSchema, regle  # noqa: E402
+
+ENTETES = [
+    "N°Obs",
+    "En moyenne, à quelle fréquence achetez-vous des vêtements ?",
+    "À quelle fréquence achetez-vous des vêtements de seconde main ?",
+    "Quel est votre âge ?",
+    "Où achetez-vous le plus souvent ? (choix multiples)",
+    "Genre",
+]
+
+
+def test_regle_simple_sans_accents_ni_casse():
+    res = RegistreSchema([regle("Age", ["QUEL EST VOTRE AGE"])]).resoudre(ENTETES)
+    assert res.mapping == {"Quel est votre âge ?": "Age"}
+    assert res.rapport() == []
+
+
+def test_ambigu_premiere_colonne_retenue():
+    res = RegistreSchema([regle("Frequence_Achat", ["fréquence & achetez-vous"])]).resoudre(ENTETES)
+    assert res.choix["Frequence_Achat"] == ENTETES[1]
+    assert res.ambigus["Frequence_Achat"] == ENTETES[1:3]
+    assert res.rapport() == [f"- AMBIGU Frequence_Achat : 2 colonnes candidates, retenue : {ENTETES[1]}"]
+
+
+def test_exclusion_et_passes_successives():
+    registre = RegistreSchema([
+        regle("Frequence_Achat", ["fréquence & achetez-vous & !seconde main"]),
+        regle("Canal_Achat", ["=où achetez-vous ?"], ["où achetez-vous & choix multiples"]),
+    ])
+    res = registre.resoudre(ENTETES)
+    assert res.choix == {"Frequence_Achat": ENTETES[1], "Canal_Achat": ENTETES[4]}
+    assert not res.ambigus
+
+
+def test_non_trouve():
+    res = RegistreSchema([regle("Revenu", ["revenu mensuel"])]).resoudre(ENTETES)
+    assert res.mapping == {} and res.non_trouves == ["Revenu"]
+    assert res.rapport() == ["- NON TROUVÉ Revenu"]
+
+
+def test_conflit_derniere_regle_retenue():
+    res = RegistreSchema([regle("Age", ["votre âge"]), regle("Age_Repondant", ["âge"])]).resoudre(ENTETES)
+    assert res.conflits == {"Quel est votre âge ?": ["Age", "Age_Repondant"]}
+    assert res.mapping["Quel est votre âge ?"] == "Age_Repondant"
+    assert res.rapport() == ["- CONFLIT Quel est votre âge ? : réclamée par Age, Age_Repondant (retenu : Age_Repondant)"]
+
+
+def test_nom_deja_present_ignore_et_resolution_memorisee():
+    registre = RegistreSchema([regle("Genre", ["êtes-vous"])])
+    entetes = [*ENTETES, "Vous êtes-vous ?"]
+    res = registre.resoudre(entetes)
+    # "Genre" existe déjà : renommer "Vous êtes-vous ?" créerait un doublon
+    assert res.mapping == {} and res.ignores == {"Vous êtes-vous ?": "Genre"}
+    assert res.rapport() == ["- IGNORÉ Vous êtes-vous ? -> Genre : nom déjà présent dans l'en-tête"]
+    assert registre.resoudre(entetes) is res
@@ -0,0 +1,103 @@
+"""Service d'agrégats : codes HTTP (400 / 404 / 500 / 304), cache LRU et réponses JSON."""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_cube import construire_cube  # noqa: E402
+from pipeline_multichoix import encoder_multi, encoder_simple  # noqa: E402
+from pipeline_service import ServiceAgregats, creer_serveur  # noqa: E402
+
+
+def _etapes(df: pd.DataFrame, colonnes: list[str]):
+    return [encoder_multi(df[c]) if c == "Canal" else encoder_simple(df[c]) for c in colonnes]
+
+
+@pytest.fixture()
+def service() -> ServiceAgregats:
+    df = pd.DataFrame({
+        "Cluster": [0, 0, 1, 1, 2, 2],
+        "Genre": ["F", "H", "F", "F", "H", "F"],
+        "Canal": ["Internet;Magasin", "Magasin", "Internet", "Friperie", "Magasin", "Internet;Friperie"],
+        "Paradoxe": [1.0, 0.0, 1.0, np.nan, 0.0, 1.0],
+    })
+    lignes = df[["Cluster", "Genre"]]
+    cube = construire_cube(lignes, df[["Paradoxe"]], multiples={"Canal": encoder_multi(df["Canal"])})
+    return ServiceAgregats(cube, lignes, df, _etapes, ["Genre", "Canal", "Cluster"])
+
+
+def _corps(res) -> dict:
+    return json.loads(res[2].decode("utf-8"))
+
+
+def test_taux_et_cache(service):
+    statut, etag, corps, hit = service.repondre("/taux", {"mesure": "Paradoxe", "par": "Genre"})
+    assert statut == 200 and etag and not hit
+    lignes = {r["Genre"]: r for r in json.loads(corps)["lignes"]}
+    assert lignes["F"]["moyenne"] == pytest.approx(1.0) and lignes["F"]["n"] == 3
+    assert lignes["H"]["moyenne"] == pytest.approx(0.0) and lignes["H"]["n"] == 2
+    # mêmes paramètres, autre ordre et `par` dupliqué : même entrée de cache
+    assert service.repondre("/taux", {"par": "Genre", "mesure": "Paradoxe"}) == (200, etag, corps, True)
+    assert service.repondre("/taux", {"mesure": "Paradoxe", "par": "Genre,Genre"})[:3] == (200, etag, corps)
+
+
+@pytest.mark.parametrize("chemin, params", [
+    ("/taux", {"mesure": "Revenu"}),
+    ("/taux", {"mesure": "Paradoxe", "par": "Age"}),
+    ("/taux", {"mesure": "Paradoxe", "Genre": "X"}),
+    ("/adoption", {"question": "Inconnue"}),
+    ("/sankey", {"etapes": "Genre"}),
+    ("/sankey", {"etapes": "Genre,Canal", "Canal": "Internet"}),
+])
+def test_parametres_incorrects_400(service, chemin, params):
+    res = service.repondre(chemin, params)
+    assert res[0] == 400 and "erreur" in _corps(res)
+    assert not res[1] and len(service.cache) == 0  # erreurs jamais mémorisées
+
+
+def test_route_inconnue_404_et_erreur_interne_500(service):
+    assert service.repondre("/inconnue", {})[0] == 404
+
+    def casse(params):
+        raise ZeroDivisionError("division par zéro")
+
+    service.routes["/casse"] = casse
+    res = service.repondre("/casse", {})
+    assert res[0] == 500 and _corps(res) == {"erreur": "ZeroDivisionError : division par zéro"}
+
+
+def test_sankey_filtre(service):
+    res = _corps(service.repondre("/sankey", {"etapes": "Genre,Canal", "Genre": "F"}))
+    assert res["lignes"] == 4 and res["noeuds"][:1] == ["F"]
+    assert sum(res["liens"]["valeur"]) == pytest.approx(4)  # pondéré : chaque répondant pèse 1
+
+
+def test_serveur_304_si_etag_inchange(service):
+    serveur = creer_serveur(service, port=0)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{serveur.server_address[1]}/adoption?question=Canal&par=Cluster"
+    try:
+        with urllib.request.urlopen(url) as r:
+            etag = r.headers["ETag"]
+            assert r.status == 200 and r.headers["X-Cache"] == "miss" and etag
+            assert json.loads(r.read())["question"] == "Canal"
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(urllib.request.Request(url, headers={"If-None-Match": etag}))
+        assert e.value.code == 304 and e.value.headers["X-Cache"] == "hit"
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(url.replace("Cluster", "Age"))
+        assert e.value.code == 400 and "erreur" in json.loads(e.value.read())
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
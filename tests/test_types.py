@@ -0,0 +1,74 @@
+"""Plan de types compacts : les colonnes compactées relues par safe_to_numeric redonnent les mêmes valeurs."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RACINE / "notebooks"))
+
+from pipeline_donnees import safe_to_numeric  # noqa: E402
+from pipeline_types import compacter  # noqa: E402
+
+ECHELLES = ["Score", "Likert", "Note_Decimale"]
+
+
+def _repondants(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    manquant = lambda: rng.random(n) < 0.1  # noqa: E731
+    return pd.DataFrame({
+        "Score": pd.Series(rng.integers(1, 11, size=n), dtype=float).mask(manquant()),
+        "Likert": rng.integers(1, 6, size=n).astype(float),
+        "Note_Decimale": rng.choice([6.0, 7.5, 8.0], size=n),
+        "Paradoxe": pd.Series(rng.integers(0, 2, size=n), dtype=float).mask(manquant()),
+        "Achat_Seconde_Main": pd.Series(rng.choice(["Oui", "Non"], size=n)).mask(manquant()),
+        "Age": rng.integers(18, 70, size=n),
+        "Note_Texte": pd.Series(rng.choice(["7,5", "8", "9,25"], size=n)).mask(manquant()),
+        "Canal": rng.choice(["Internet", "Magasin", "Friperie"], size=n),
+        "Commentaire": [f"réponse libre {i}" for i in range(n)],
+    })
+
+
+@pytest.fixture(scope="module")
+def df_et_compact():
+    df = _repondants()
+    compact, rapport = compacter(df, ECHELLES, garder_texte=["Canal"])
+    return df, compact, rapport.set_index("colonne")
+
+
+def test_types_choisis(df_et_compact):
+    _, compact, rapport = df_et_compact
+    attendus = {
+        "Score": "Int8", "Likert": "Int8", "Note_Decimale": "float64", "Paradoxe": "boolean",
+        "Achat_Seconde_Main": "boolean", "Age": "int8", "Note_Texte": "category", "Canal": "category",
+        "Commentaire": "object",
+    }
+    assert compact.dtypes.astype(str).to_dict() == attendus
+    assert rapport.loc["Note_Decimale", "regle"] == "inchangée"  # décimales : float conservé
+    assert (rapport["octets_apres"] <= rapport["octets_avant"]).all()
+
+
+@pytest.mark.parametrize("colonne", ["Score", "Likert", "Note_Decimale", "Paradoxe", "Age", "Note_Texte", "Canal"])
+def test_aller_retour_safe_to_numeric(df_et_compact, colonne):
+    df, compact, _ = df_et_compact
+    attendu, obtenu = safe_to_numeric(df[colonne]), safe_to_numeric(compact[colonne])
+    assert obtenu.dtype.kind in "iuf" and not isinstance(obtenu.dtype, pd.api.extensions.ExtensionDtype)
+    pd.testing.assert_series_equal(obtenu, attendu, check_dtype=False)
+    if colonne in ("Score", "Paradoxe"):
+        assert obtenu.dtype == np.float64  # manquants : NaN, pas pd.NA
+
+
+def test_oui_non_relu_en_zero_un(df_et_compact):
+    df, compact, _ = df_et_compact
+    attendu = df["Achat_Seconde_Main"].map({"Oui": 1.0, "Non": 0.0})
+    pd.testing.assert_series_equal(safe_to_numeric(compact["Achat_Seconde_Main"]), attendu)
+
+
+def test_garder_texte_et_echelle_jamais_booleennes():
+    df = pd.DataFrame({"Reponse": ["Oui", "Non"] * 5, "Echelle": [0.0, 1.0] * 5})
+    compact, _ = compacter(df, echelles=["Echelle"], garder_texte=["Reponse"])
+    assert str(compact["Reponse"].dtype) == "category" and str(compact["Echelle"].dtype) == "Int8"